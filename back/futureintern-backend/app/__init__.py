@@ -22,6 +22,8 @@ from app.models.two_factor import TwoFactorCode  # noqa: F401
 # Import auth token models so SQLAlchemy creates the tables
 from app.models.password_reset import PasswordResetToken  # noqa: F401
 from app.models.email_verification import EmailVerificationToken  # noqa: F401
+# Import precomputed recommendation results so SQLAlchemy creates the table
+from app.models.recommendation import RecommendationResult  # noqa: F401
 
 def add_security_headers(response):
     """Add security headers to all responses"""
@@ -49,9 +51,11 @@ def add_security_headers(response):
     # Prevent browser from caching authenticated pages (back-button protection)
     # After logout the browser must re-fetch from the server instead of
     # showing a cached copy of the authenticated page.
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    # Public endpoints that set their own Cache-Control (e.g. ETag revalidation) keep it.
+    if 'Cache-Control' not in response.headers:
+        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '0'
     
     return response
 
@@ -118,34 +122,72 @@ def create_app():
                 # Detect database dialect
                 dialect = db.engine.dialect.name  # 'sqlite' or 'postgresql'
 
-                # Get existing columns in users table
-                if dialect == 'sqlite':
-                    result = conn.execute(sa.text("PRAGMA table_info(users)"))
-                    existing_columns = {row[1] for row in result.fetchall()}
-                else:
+                def existing_columns_of(table):
+                    if dialect == 'sqlite':
+                        result = conn.execute(sa.text(f"PRAGMA table_info({table})"))
+                        return {row[1] for row in result.fetchall()}
                     result = conn.execute(sa.text(
                         "SELECT column_name FROM information_schema.columns "
-                        "WHERE table_name = 'users'"
-                    ))
-                    existing_columns = {row[0] for row in result.fetchall()}
+                        "WHERE table_name = :table"
+                    ), {'table': table})
+                    return {row[0] for row in result.fetchall()}
 
-                # Migrations: column_name -> ALTER TABLE SQL
+                # Migrations: table -> column_name -> ALTER TABLE SQL
                 migrations = {
-                    'points': "ALTER TABLE users ADD COLUMN points INTEGER DEFAULT 0 NOT NULL",
-                    'last_login_date': "ALTER TABLE users ADD COLUMN last_login_date DATE",
-                    'login_streak': "ALTER TABLE users ADD COLUMN login_streak INTEGER DEFAULT 0",
-                    # Default TRUE so existing users are not locked out
-                    'email_verified': "ALTER TABLE users ADD COLUMN email_verified BOOLEAN DEFAULT 1",
+                    'users': {
+                        'points': "ALTER TABLE users ADD COLUMN points INTEGER DEFAULT 0 NOT NULL",
+                        'last_login_date': "ALTER TABLE users ADD COLUMN last_login_date DATE",
+                        'login_streak': "ALTER TABLE users ADD COLUMN login_streak INTEGER DEFAULT 0",
+                        # Default TRUE so existing users are not locked out
+                        'email_verified': "ALTER TABLE users ADD COLUMN email_verified BOOLEAN DEFAULT 1",
+                    },
+                    'internships': {
+                        # Filled by backfill_display_fields() below, then on every write
+                        'display_title': "ALTER TABLE internships ADD COLUMN display_title VARCHAR(200)",
+                        'work_type': "ALTER TABLE internships ADD COLUMN work_type VARCHAR(20)",
+                    },
                 }
 
-                for col, sql in migrations.items():
-                    if col not in existing_columns:
-                        print(f"🔧 Migration: adding column '{col}' to users table...")
-                        conn.execute(sa.text(sql))
-                        conn.commit()
-                        print(f"✅ Column '{col}' added.")
+                for table, columns in migrations.items():
+                    existing_columns = existing_columns_of(table)
+                    for col, sql in columns.items():
+                        if col not in existing_columns:
+                            print(f"🔧 Migration: adding column '{col}' to {table} table...")
+                            conn.execute(sa.text(sql))
+                            conn.commit()
+                            print(f"✅ Column '{col}' added.")
         except Exception as e:
             print(f"⚠️ Column migration skipped: {e}")
+
+        # Indexes declared on the models — create_all() only adds them to new tables
+        try:
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=db.engine, checkfirst=True)
+        except Exception as e:
+            print(f"⚠️ Index migration skipped: {e}")
+
+        try:
+            from app.models.intern import backfill_display_fields
+            filled = backfill_display_fields()
+            if filled:
+                print(f"✅ Backfilled display fields for {filled} internships")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Internship display-field backfill skipped: {e}")
+
+        try:
+            from app.internships.search import init_search
+            backend = init_search()
+            print(f"✅ Internship search index ready ({backend.name})")
+        except Exception as e:
+            print(f"⚠️ Search index setup skipped: {e}")
+
+        try:
+            from app.internships.facets import init_facets
+            init_facets()
+        except Exception as e:
+            print(f"⚠️ Facet counters setup skipped: {e}")
     
     # تهيئة CORS (للسماح بطلبات من المتصفح)
     # Allow frontend origin from environment variable or default to wildcard for development
@@ -153,7 +195,8 @@ def create_app():
     CORS(app, resources={r"/api/*": {"origins": cors_origins}},
          supports_credentials=False,
          allow_headers=["Content-Type", "Authorization"],
-         expose_headers=["Content-Type", "Authorization"])
+         expose_headers=["Content-Type", "Authorization",
+                         "X-Total-Count", "X-Page", "X-Per-Page", "X-Pages"])
     
     # تهيئة JWT
     jwt = JWTManager(app)
@@ -161,15 +204,21 @@ def create_app():
     # Initialize Mail
     mail.init_app(app)
     
-    # Register JWT token blacklist checker
+    # Register JWT token blacklist checker — answered from the in-process
+    # revocation cache (app/auth/revocation.py), not a query per request
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
+        from flask import g
+        from app.auth.revocation import is_token_revoked
+
         jti = jwt_payload.get('jti')
         if not jti:
             return False
-        return db.session.query(
-            TokenBlacklist.query.filter_by(jti=jti).exists()
-        ).scalar()
+        # The request logger verifies the token too — answer both from one check
+        checked = g.setdefault('_revocation_checked', {})
+        if jti not in checked:
+            checked[jti] = is_token_revoked(jti)
+        return checked[jti]
 
     # JWT Error Handlers
     @jwt.unauthorized_loader
@@ -360,13 +409,23 @@ def create_app():
     if BULK_UPLOAD_BP_AVAILABLE:
         app.register_blueprint(bulk_upload_bp, url_prefix="/api/admin")
 
-    # Pre-warm SBERT model in a background thread so the first
-    # recommendations request doesn't pay the cold-start penalty.
+    # Under gunicorn.conf.py (preload_app) this runs once in the master: load the
+    # embedding backend and fit the internship index now, before the workers fork,
+    # so they share those pages instead of each loading a copy.
+    if app.config.get('MATCHING_PRELOAD'):
+        from app.matching.preload import preload_matching
+        preload_matching(app)
+        return app
+
+    # Otherwise pre-warm the embedding backend (SBERT / ONNX / static, see
+    # EMBEDDING_BACKENDS) in a background thread so the first recommendations
+    # request doesn't pay the cold-start penalty.
     def _warm_sbert():
         try:
             from app.matching.service import _get_sbert_model
-            _get_sbert_model("all-MiniLM-L6-v2")
-            print("✅ SBERT model pre-warmed")
+            backend = _get_sbert_model("all-MiniLM-L6-v2")
+            if backend is not None:
+                print(f"✅ Embedding backend '{getattr(backend, 'name', 'custom')}' pre-warmed")
         except Exception as e:
             print(f"⚠️ SBERT warm-up skipped: {e}")
 
@@ -2,7 +2,7 @@
 Admin Dashboard APIs - Task 5.2
 Provides statistics and management endpoints for administrators
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.auth import role_required
 from app.models.user import User
@@ -10,9 +10,23 @@ from app.models.intern import Internship
 from app.models.application import Application
 from app.models import db
 from sqlalchemy import func
+from app.matching.index import notify_internship_changed, notify_internship_removed
+from app.utils.loaders import list_page, load_by_ids
+from app.admin import stats
+from app.users.directory import clear_directory_cache
 
 admin_bp = Blueprint('admin', __name__)
 
+
+@admin_bp.after_request
+def _invalidate_stats(response):
+    # Admin writes show up on the dashboard and in the company directory immediately;
+    # everything else within ADMIN_STATS_TTL
+    if request.method != 'GET' and response.status_code < 400:
+        stats.clear_stats_cache()
+        clear_directory_cache()
+    return response
+
 @admin_bp.route("/")
 def index():
     return jsonify({"message": "Admin API"})
@@ -104,96 +118,85 @@ def test_email():
 @jwt_required()
 @role_required('admin')
 def get_stats():
-    """Get system statistics - Admin only"""
+    """Get system statistics - Admin only (cached for ADMIN_STATS_TTL, ?fresh=1 to recompute)"""
     try:
-        # Count users by role
-        total_users = User.query.count()
-        total_students = User.query.filter_by(role='student').count()
-        total_companies = User.query.filter_by(role='company').count()
-        verified_companies = User.query.filter_by(role='company', is_verified=True).count()
-        
-        # Count internships
-        total_internships = Internship.query.count()
-        active_internships = Internship.query.filter_by(is_active=True).count()
-        
-        # Count applications by status
-        total_applications = Application.query.count()
-        pending_applications = Application.query.filter_by(status='pending').count()
-        accepted_applications = Application.query.filter_by(status='accepted').count()
-        rejected_applications = Application.query.filter_by(status='rejected').count()
-        
-        # Get top companies by internships posted
-        top_companies = db.session.query(
-            User.id,
-            User.company_name,
-            func.count(Internship.id).label('internship_count')
-        ).join(Internship, User.id == Internship.company_id)\
-         .filter(User.role == 'company')\
-         .group_by(User.id, User.company_name)\
-         .order_by(func.count(Internship.id).desc())\
-         .limit(5).all()
-        
-        # Get top students by applications
-        top_students = db.session.query(
-            User.id,
-            User.name,
-            User.email,
-            func.count(Application.id).label('application_count')
-        ).join(Application, User.id == Application.student_id)\
-         .filter(User.role == 'student')\
-         .group_by(User.id, User.name, User.email)\
-         .order_by(func.count(Application.id).desc())\
-         .limit(5).all()
-        
-        # Pending verifications count
-        pending_verifications = User.query.filter_by(role='company', is_verified=False).count()
-        
-        return jsonify({
-            # Flat fields for frontend Admin Dashboard compatibility
-            'total_users': total_users,
-            'total_internships': total_internships,
-            'total_applications': total_applications,
-            'pending_verifications': pending_verifications,
-            # Detailed breakdowns
-            'users': {
-                'total': total_users,
-                'students': total_students,
-                'companies': total_companies,
-                'verified_companies': verified_companies
-            },
-            'internships': {
-                'total': total_internships,
-                'active': active_internships,
-                'inactive': total_internships - active_internships
-            },
-            'applications': {
-                'total': total_applications,
-                'pending': pending_applications,
-                'accepted': accepted_applications,
-                'rejected': rejected_applications
-            },
-            'top_companies': [
-                {
-                    'id': company.id,
-                    'name': company.company_name,
-                    'internships_posted': company.internship_count
-                }
-                for company in top_companies
-            ],
-            'top_students': [
-                {
-                    'id': student.id,
-                    'name': student.name,
-                    'email': student.email,
-                    'applications_submitted': student.application_count
-                }
-                for student in top_students
-            ]
-        }), 200
+        return jsonify(stats.cached('stats', _compute_stats, fresh=_wants_fresh())), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+def _wants_fresh():
+    return request.args.get('fresh', '').lower() in ('1', 'true')
+
+
+def _compute_stats():
+    users = stats.user_counts()
+    internships = stats.internship_counts()
+    applications = stats.application_counts()
+
+    # Get top companies by internships posted
+    top_companies = db.session.query(
+        User.id,
+        User.company_name,
+        func.count(Internship.id).label('internship_count')
+    ).join(Internship, User.id == Internship.company_id)\
+     .filter(User.role == 'company')\
+     .group_by(User.id, User.company_name)\
+     .order_by(func.count(Internship.id).desc())\
+     .limit(5).all()
+
+    # Get top students by applications
+    top_students = db.session.query(
+        User.id,
+        User.name,
+        User.email,
+        func.count(Application.id).label('application_count')
+    ).join(Application, User.id == Application.student_id)\
+     .filter(User.role == 'student')\
+     .group_by(User.id, User.name, User.email)\
+     .order_by(func.count(Application.id).desc())\
+     .limit(5).all()
+
+    return {
+        # Flat fields for frontend Admin Dashboard compatibility
+        'total_users': users['total'],
+        'total_internships': internships['total'],
+        'total_applications': applications['total'],
+        'pending_verifications': users['unverified_companies'],
+        # Detailed breakdowns
+        'users': {
+            'total': users['total'],
+            'students': users['students'],
+            'companies': users['companies'],
+            'verified_companies': users['verified_companies']
+        },
+        'internships': internships,
+        'applications': {
+            'total': applications['total'],
+            'pending': applications['pending'],
+            'accepted': applications['accepted'],
+            'rejected': applications['rejected']
+        },
+        'top_companies': [
+            {
+                'id': company.id,
+                'name': company.company_name,
+                'internships_posted': company.internship_count
+            }
+            for company in top_companies
+        ],
+        'top_students': [
+            {
+                'id': student.id,
+                'name': student.name,
+                'email': student.email,
+                'applications_submitted': student.application_count
+            }
+            for student in top_students
+        ]
+    }
+
 @admin_bp.route("/companies/pending", methods=["GET"])
 @jwt_required()
 @role_required('admin')
@@ -406,6 +409,8 @@ def delete_user(user_id):
         # Finally delete the user
         db.session.execute(text('DELETE FROM users WHERE id = :uid'), {'uid': user_id})
         db.session.commit()
+        if deleted_role == 'company':
+            notify_internship_removed(*intern_ids)
 
         try:
             from flask_jwt_extended import get_jwt_identity
@@ -551,25 +556,27 @@ def create_user():
 @jwt_required()
 @role_required('admin')
 def list_all_internships():
-    """Get all internships - Admin only"""
+    """Get all internships - Admin only (?page=&per_page= to paginate, see list_page)"""
     try:
-        internships = Internship.query.all()
-        
+        internships, headers = list_page(Internship.query.order_by(Internship.id))
+        companies = load_by_ids(User, (i.company_id for i in internships), User.company_name)
+
         return jsonify([
             {
                 'id': internship.id,
                 'title': internship.title,
                 'company_id': internship.company_id,
-                'company_name': User.query.get(internship.company_id).company_name if User.query.get(internship.company_id) else 'Unknown',
+                'company_name': companies[internship.company_id].company_name
+                if internship.company_id in companies else 'Unknown',
                 'location': internship.location,
                 'description': internship.description,
                 'requirements': internship.requirements,
                 'status': 'Active' if internship.is_active else 'Inactive',
                 'is_active': internship.is_active,
-                'created_at': internship.created_at.isoformat() if hasattr(internship, 'created_at') and internship.created_at else None
+                'created_at': internship.created_at.isoformat() if internship.created_at else None
             }
             for internship in internships
-        ]), 200
+        ]), 200, headers
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -586,6 +593,7 @@ def delete_internship(internship_id):
         
         db.session.delete(internship)
         db.session.commit()
+        notify_internship_removed(internship_id)
 
         try:
             from flask_jwt_extended import get_jwt_identity
@@ -639,6 +647,7 @@ def update_internship(internship_id):
             internship.is_active = data['is_open']
 
         db.session.commit()
+        notify_internship_changed(internship)
 
         company = User.query.get(internship.company_id)
         return jsonify({
@@ -669,6 +678,7 @@ def get_security_stats():
     """Get security monitoring stats - Admin only"""
     try:
         from datetime import datetime, timedelta
+        from app.utils.audit_writer import get_audit_writer
 
         # Active sessions: count users who have logged in recently (approximation)
         active_sessions = User.query.count()  # Simplified
@@ -712,33 +722,55 @@ def get_security_stats():
             'login_failures_24h': login_failures_24h,
             'system_health': 'Healthy',
             'system_uptime': '99.9%',
-            'top_admin_actions': top_admin_actions
+            'top_admin_actions': top_admin_actions,
+            'audit_writer': get_audit_writer().stats(),
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route("/rate-limits", methods=["GET"])
+@jwt_required()
+@role_required('admin')
+def get_rate_limit_metrics():
+    """Allowed / limited requests per rate-limited route (this worker) - Admin only"""
+    try:
+        from app.utils.rate_limiter import limiter_metrics
+        return jsonify(limiter_metrics()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route("/applications", methods=["GET"])
 @jwt_required()
 @role_required('admin')
 def list_all_applications():
-    """Get all applications - Admin only"""
+    """Get all applications - Admin only (?page=&per_page= to paginate, see list_page)"""
     try:
-        applications = Application.query.all()
-        
-        return jsonify([
-            {
+        applications, headers = list_page(Application.query.order_by(Application.id))
+        internships = load_by_ids(Internship, (a.internship_id for a in applications),
+                                  Internship.title, Internship.company_id)
+        users = load_by_ids(
+            User,
+            [a.student_id for a in applications] + [i.company_id for i in internships.values()],
+            User.name, User.email, User.company_name,
+        )
+
+        def row(app):
+            student = users.get(app.student_id)
+            internship = internships.get(app.internship_id)
+            company = users.get(internship.company_id) if internship else None
+            return {
                 'id': app.id,
                 'student_id': app.student_id,
-                'student_name': User.query.get(app.student_id).name if User.query.get(app.student_id) else 'Unknown',
-                'student_email': User.query.get(app.student_id).email if User.query.get(app.student_id) else 'Unknown',
+                'student_name': student.name if student else 'Unknown',
+                'student_email': student.email if student else 'Unknown',
                 'internship_id': app.internship_id,
-                'internship_title': Internship.query.get(app.internship_id).title if Internship.query.get(app.internship_id) else 'Unknown',
-                'company_name': User.query.get(Internship.query.get(app.internship_id).company_id).company_name if Internship.query.get(app.internship_id) and User.query.get(Internship.query.get(app.internship_id).company_id) else 'Unknown',
+                'internship_title': internship.title if internship else 'Unknown',
+                'company_name': company.company_name if company else 'Unknown',
                 'status': app.status,
-                'created_at': app.created_at.isoformat() if hasattr(app, 'created_at') and app.created_at else None
+                'created_at': app.applied_at.isoformat() if app.applied_at else None
             }
-            for app in applications
-        ]), 200
+
+        return jsonify([row(app) for app in applications]), 200, headers
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -808,9 +840,9 @@ def get_analytics():
     - Applications per internship with acceptance rate
     - Overall acceptance rate
     """
-    try:
-        from sqlalchemy import case
+    from sqlalchemy import case
 
+    def compute():
         # Per-internship stats
         per_internship = db.session.query(
             Internship.id,
@@ -843,22 +875,27 @@ def get_analytics():
             })
 
         # Overall acceptance rate
-        total_apps = Application.query.count()
-        total_accepted = Application.query.filter_by(status='accepted').count()
-        overall_rate = round((total_accepted / total_apps * 100), 1) if total_apps > 0 else 0.0
+        users = stats.user_counts()
+        internships = stats.internship_counts()
+        applications = stats.application_counts()
+        total_apps = applications['total']
+        overall_rate = round((applications['accepted'] / total_apps * 100), 1) if total_apps > 0 else 0.0
 
-        return jsonify({
+        return {
             'overview': {
-                'total_users': User.query.count(),
-                'total_students': User.query.filter_by(role='student').count(),
-                'total_companies': User.query.filter_by(role='company').count(),
-                'total_internships': Internship.query.count(),
-                'active_internships': Internship.query.filter_by(is_active=True).count(),
+                'total_users': users['total'],
+                'total_students': users['students'],
+                'total_companies': users['companies'],
+                'total_internships': internships['total'],
+                'active_internships': internships['active'],
                 'total_applications': total_apps,
                 'overall_acceptance_rate_pct': overall_rate,
             },
             'per_internship': internship_stats,
-        }), 200
+        }
+
+    try:
+        return jsonify(stats.cached('analytics', compute, fresh=_wants_fresh())), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -871,10 +908,14 @@ def get_audit_logs():
     """View audit trail - Admin only"""
     try:
         from app.models.audit_log import AuditLog
+        from app.utils.audit_writer import flush_audit_log
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 50, type=int)
         action_filter = request.args.get('action')  # optional filter
 
+        # Include entries still queued in this worker's audit writer
+        flush_audit_log(timeout=1.0)
+
         query = AuditLog.query.order_by(AuditLog.created_at.desc())
         if action_filter:
             query = query.filter(AuditLog.action == action_filter)
@@ -914,6 +955,7 @@ def deactivate_expired_internships():
             internship.is_active = False
 
         db.session.commit()
+        notify_internship_changed(*expired)
 
         return jsonify({
             'message': f'Deactivated {count} expired internship(s)',
@@ -926,6 +968,78 @@ def deactivate_expired_internships():
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route("/tokens/prune", methods=["POST"])
+@jwt_required()
+@role_required('admin')
+def prune_revoked_tokens():
+    """
+    Delete blacklist rows of tokens that have expired anyway.
+    Also runs automatically about once an hour (app/auth/revocation.py).
+    """
+    try:
+        from app.auth.revocation import prune_expired
+        count = prune_expired()
+        return jsonify({
+            'message': f'Pruned {count} expired revoked token(s)',
+            'pruned_count': count,
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route("/recommendations/precompute", methods=["POST"])
+@jwt_required()
+@role_required('admin')
+def precompute_recommendations():
+    """
+    Recompute AI recommendations for every student in one batch and store them,
+    so /api/recommendations can serve them without running the matcher.
+    Runs as a background job (app/matching/jobs.py); poll the returned status_url.
+    If a precompute is already running, its job is returned instead.
+    Body (optional): {"top_k": 10}
+    """
+    try:
+        from app.matching.jobs import start_precompute_job
+
+        data = request.get_json(silent=True) or {}
+        top_k = max(1, min(int(data.get('top_k', 10)), 50))
+        admin_id = int(get_jwt_identity())
+        job = start_precompute_job(current_app._get_current_object(), admin_id, top_k)
+
+        try:
+            from app.utils.logger import log_audit
+            log_audit('admin_precompute_recommendations', resource='recommendations',
+                      details={'job_id': job['job_id'], 'top_k': top_k}, user_id=admin_id)
+        except Exception:
+            pass
+
+        return jsonify({
+            'message': 'Recommendation precompute started',
+            'job_id': job['job_id'],
+            'status': job['status'],
+            'status_url': url_for('admin.get_precompute_job', job_id=job['job_id']),
+        }), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_bp.route("/recommendations/precompute/<job_id>", methods=["GET"])
+@jwt_required()
+@role_required('admin')
+def get_precompute_job(job_id):
+    """Progress of a precompute job; includes the batch summary once status is 'done'."""
+    try:
+        from app.matching.jobs import get_job, public_job
+
+        job = get_job(job_id)
+        if not job or job.get('kind') != 'precompute':
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(public_job(job)), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 # ========== Points System Management ==========
 
 @admin_bp.route("/points/packages", methods=["GET"])
@@ -1116,37 +1230,26 @@ def grant_points():
 @jwt_required()
 @role_required('admin')
 def points_stats():
-    """Get points system statistics - Admin only"""
-    try:
-        from app.models.points import PointsTransaction, PointsPackage
-
-        total_points_in_circulation = db.session.query(
-            db.func.coalesce(db.func.sum(User.points), 0)
-        ).filter(User.role == 'student').scalar()
-
-        total_purchases = PointsTransaction.query.filter_by(transaction_type='purchase').count()
-        total_service_charges = PointsTransaction.query.filter_by(transaction_type='service_charge').count()
-        total_granted = PointsTransaction.query.filter_by(transaction_type='admin_grant').count()
-
-        # Points purchased total
-        purchased_points = db.session.query(
-            db.func.coalesce(db.func.sum(PointsTransaction.amount), 0)
-        ).filter(PointsTransaction.transaction_type == 'purchase').scalar()
-
-        # Points spent total
-        spent_points = db.session.query(
-            db.func.coalesce(db.func.sum(PointsTransaction.amount), 0)
-        ).filter(PointsTransaction.transaction_type == 'service_charge').scalar()
-
-        return jsonify({
-            'total_points_in_circulation': int(total_points_in_circulation),
-            'total_purchases': total_purchases,
-            'total_purchased_points': int(purchased_points),
-            'total_service_charges': total_service_charges,
-            'total_spent_points': abs(int(spent_points)),
-            'total_admin_grants': total_granted,
+    """Get points system statistics - Admin only (cached, ?fresh=1 to recompute)"""
+    from app.models.points import PointsPackage
+
+    def compute():
+        transactions = stats.transaction_counts()
+        empty = {'count': 0, 'amount': 0}
+        purchases = transactions.get('purchase', empty)
+        charges = transactions.get('service_charge', empty)
+        return {
+            'total_points_in_circulation': stats.user_counts()['student_points'],
+            'total_purchases': purchases['count'],
+            'total_purchased_points': purchases['amount'],
+            'total_service_charges': charges['count'],
+            'total_spent_points': abs(charges['amount']),
+            'total_admin_grants': transactions.get('admin_grant', empty)['count'],
             'active_packages': PointsPackage.query.filter_by(is_active=True).count(),
-        }), 200
+        }
+
+    try:
+        return jsonify(stats.cached('points', compute, fresh=_wants_fresh())), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
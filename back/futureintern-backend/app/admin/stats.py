@@ -0,0 +1,92 @@
+"""
+Admin dashboard statistics
+Each table is summarised by ONE grouped query (users by role/verified,
+internships by is_active, applications by status, points transactions by
+type) instead of a COUNT(*) per number, and the assembled payloads are kept in
+the shared cache (app/utils/cache.py, namespace 'admin_stats') for
+ADMIN_STATS_TTL seconds, so all workers share one computation per window.
+Pass fresh=True (?fresh=1 on the endpoints) to bypass the cache.
+"""
+from typing import Callable, Dict
+
+from sqlalchemy import func
+
+from app.models import db
+from app.utils.cache import get_cache
+
+
+def _ttl() -> int:
+    from config import Config
+    return int(getattr(Config, 'ADMIN_STATS_TTL', 30))
+
+
+def cached(name: str, compute: Callable[[], Dict], fresh: bool = False) -> Dict:
+    cache = get_cache('admin_stats')
+    if not fresh:
+        hit = cache.get(name)
+        if hit is not None:
+            return hit
+    value = compute()
+    if _ttl() > 0:
+        cache.set(name, value, ttl=_ttl())
+    return value
+
+
+def clear_stats_cache() -> None:
+    get_cache('admin_stats').clear()
+
+
+# ── One grouped query per table ──────────────────────────────────────────────
+
+def user_counts() -> Dict:
+    from app.models.user import User
+
+    rows = db.session.query(
+        User.role, User.is_verified, func.count(User.id), func.coalesce(func.sum(User.points), 0)
+    ).group_by(User.role, User.is_verified).all()
+    counts = {'total': 0, 'students': 0, 'companies': 0, 'verified_companies': 0,
+              'unverified_companies': 0, 'student_points': 0}
+    for role, verified, count, points in rows:
+        counts['total'] += count
+        if role == 'student':
+            counts['students'] += count
+            counts['student_points'] += int(points)
+        elif role == 'company':
+            counts['companies'] += count
+            counts['verified_companies' if verified else 'unverified_companies'] += count
+    return counts
+
+
+def internship_counts() -> Dict:
+    from app.models.intern import Internship
+
+    rows = db.session.query(Internship.is_active, func.count(Internship.id))\
+        .group_by(Internship.is_active).all()
+    active = sum(c for is_active, c in rows if is_active)
+    total = sum(c for _, c in rows)
+    return {'total': total, 'active': active, 'inactive': total - active}
+
+
+def application_counts() -> Dict:
+    from app.models.application import Application
+
+    by_status = {status or 'unknown': count for status, count in
+                 db.session.query(Application.status, func.count(Application.id)).group_by(Application.status)}
+    return {
+        'total': sum(by_status.values()),
+        'pending': by_status.get('pending', 0),
+        'accepted': by_status.get('accepted', 0),
+        'rejected': by_status.get('rejected', 0),
+        'by_status': by_status,
+    }
+
+
+def transaction_counts() -> Dict:
+    """{transaction_type: {'count', 'amount'}}"""
+    from app.models.points import PointsTransaction
+
+    rows = db.session.query(
+        PointsTransaction.transaction_type, func.count(PointsTransaction.id),
+        func.coalesce(func.sum(PointsTransaction.amount), 0)
+    ).group_by(PointsTransaction.transaction_type).all()
+    return {t: {'count': c, 'amount': int(a)} for t, c, a in rows}
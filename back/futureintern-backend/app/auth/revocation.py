@@ -0,0 +1,221 @@
+"""
+JWT revocation cache
+====================
+Process-wide set of revoked JTIs in front of the token_blacklist table, so
+checking a token on the hot path costs no database round-trip.
+
+  • each jti is kept until its token's expires_at (after that the signature
+    check rejects the token anyway), so the set only holds live revocations;
+  • the set is filled incrementally: a sync reads only the rows revoked since
+    the last one (revoked_at watermark, with a small overlap for clock skew);
+  • write paths call notify_token_revoked() right after commit, which updates
+    this worker and bumps a 'generation' key in the shared cache
+    (app/utils/cache.py). Each worker reads that key at most once per
+    SIGNAL_INTERVAL (1 s) and reuses the value in between, so another worker
+    honours a logout within about a second, without a cache read per request;
+  • every SYNC_INTERVAL seconds a sync runs regardless, as a safety net for
+    rows written without the notify hook;
+  • once per PRUNE_INTERVAL, one worker (claimed through cache.add) deletes
+    expired rows from token_blacklist — see prune_expired().
+
+If more than MAX_ENTRIES revocations are live, the set stops growing and
+tokens missing from it are looked up in the table, so a revoked token is
+never accepted because of the bound.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def token_expiry(jwt_payload: Dict) -> Optional[datetime]:
+    """Naive UTC expiry of a decoded token (matches the utcnow() columns)."""
+    exp = jwt_payload.get('exp')
+    if exp is None:
+        return None
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+def _max_lifetime() -> timedelta:
+    """Upper bound for tokens revoked without an expires_at."""
+    from config import Config
+    lifetimes = [Config.JWT_ACCESS_TOKEN_EXPIRES, Config.JWT_REFRESH_TOKEN_EXPIRES]
+    return max((t for t in lifetimes if isinstance(t, timedelta)), default=timedelta(days=30))
+
+
+def _signal():
+    from app.utils.cache import get_cache
+    return get_cache('jwt_revocation')
+
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationCache:
+    """Revoked JTIs of this worker, kept in sync with token_blacklist."""
+
+    SYNC_INTERVAL = 60       # seconds between unconditional syncs
+    SIGNAL_INTERVAL = 1.0    # seconds between reads of the shared generation key
+    OVERLAP = 5              # seconds of revoked_at re-read on each sync
+    PRUNE_INTERVAL = 3600    # seconds between cleanup runs (across workers)
+    MAX_ENTRIES = 100_000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._revoked: Dict[str, float] = {}      # jti -> expires_at (epoch)
+        self._watermark: Optional[datetime] = None
+        self._generation = None
+        self._last_sync = 0.0
+        self._overflow = False
+        self._signal_generation = None
+        self._signal_read = 0.0
+
+    # ── Lookup ───────────────────────────────────────────────────────────────
+
+    def is_revoked(self, jti: str) -> bool:
+        self.refresh()
+        with self._lock:
+            if jti in self._revoked:
+                return True
+            overflow = self._overflow
+        if overflow:
+            from app.models.token_blacklist import TokenBlacklist
+            return bool(TokenBlacklist.is_revoked(jti))
+        return False
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+
+    def refresh(self, force: bool = False) -> None:
+        """Sync if another worker revoked a token, or SYNC_INTERVAL has passed."""
+        generation = self._read_signal(force)
+        with self._lock:
+            if (not force and self._watermark is not None and generation == self._generation
+                    and time.time() - self._last_sync < self.SYNC_INTERVAL):
+                return
+            self._sync(generation)
+        self._maybe_prune()
+
+    def _read_signal(self, force: bool = False):
+        """The shared generation, read at most once per SIGNAL_INTERVAL."""
+        now = time.time()
+        if force or now - self._signal_read >= self.SIGNAL_INTERVAL:
+            self._signal_generation = _signal().get('generation')
+            self._signal_read = now
+        return self._signal_generation
+
+    def _sync(self, generation) -> None:
+        from sqlalchemy import or_
+        from app.models import db
+        from app.models.token_blacklist import TokenBlacklist
+
+        now = datetime.utcnow()
+        self._expire(_epoch(now))
+        if self._overflow and len(self._revoked) < self.MAX_ENTRIES:
+            # Room again — reload everything so nothing is only in the table
+            self._revoked.clear()
+            self._watermark = None
+            self._overflow = False
+
+        query = db.session.query(TokenBlacklist.jti, TokenBlacklist.revoked_at, TokenBlacklist.expires_at)\
+            .filter(or_(TokenBlacklist.expires_at.is_(None), TokenBlacklist.expires_at > now))
+        if self._watermark is not None:
+            query = query.filter(TokenBlacklist.revoked_at >= self._watermark - timedelta(seconds=self.OVERLAP))
+
+        watermark = self._watermark
+        for jti, revoked_at, expires_at in query:
+            if expires_at is None:
+                expires_at = (revoked_at or now) + _max_lifetime()
+            self._add(jti, _epoch(expires_at))
+            if revoked_at is not None and (watermark is None or revoked_at > watermark):
+                watermark = revoked_at
+        self._watermark = watermark or now - timedelta(seconds=self.OVERLAP)
+        self._generation = generation
+        self._last_sync = time.time()
+
+    def _add(self, jti: str, expires_at: float) -> None:
+        if jti in self._revoked or len(self._revoked) < self.MAX_ENTRIES:
+            self._revoked[jti] = expires_at
+        elif not self._overflow:
+            self._overflow = True
+            logger.warning(f"More than {self.MAX_ENTRIES} live revoked tokens — checking misses in the DB")
+
+    def _expire(self, now: float) -> None:
+        expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+        for jti in expired:
+            del self._revoked[jti]
+
+    def _maybe_prune(self) -> None:
+        try:
+            if _signal().add('prune', True, ttl=self.PRUNE_INTERVAL):
+                prune_expired()
+        except Exception as e:
+            logger.warning(f"Revoked token cleanup failed: {e}")
+
+    # ── Write-path hook ──────────────────────────────────────────────────────
+
+    def add(self, jti: str, expires_at: Optional[datetime]) -> None:
+        expires_at = expires_at or datetime.utcnow() + _max_lifetime()
+        with self._lock:
+            self._add(jti, _epoch(expires_at))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._watermark = None
+            self._generation = None
+            self._overflow = False
+            self._signal_generation = None
+            self._signal_read = 0.0
+
+
+def prune_expired() -> int:
+    """Delete token_blacklist rows whose token has expired; returns the count.
+
+    Runs on its own connection so it never commits a request's session.
+    """
+    from sqlalchemy import and_, delete, or_
+    from app.models import db
+    from app.models.token_blacklist import TokenBlacklist
+
+    now = datetime.utcnow()
+    with db.engine.begin() as conn:
+        deleted = conn.execute(delete(TokenBlacklist).where(or_(
+            TokenBlacklist.expires_at <= now,
+            and_(TokenBlacklist.expires_at.is_(None), TokenBlacklist.revoked_at <= now - _max_lifetime()),
+        ))).rowcount
+    if deleted:
+        logger.info(f"Pruned {deleted} expired revoked tokens")
+    return deleted
+
+
+# ─────────────────────────────────────────────
+# SINGLETON + write-path hook
+# ─────────────────────────────────────────────
+
+_cache = RevocationCache()
+
+
+def get_revocation_cache() -> RevocationCache:
+    return _cache
+
+
+def is_token_revoked(jti: str) -> bool:
+    return _cache.is_revoked(jti)
+
+
+def notify_token_revoked(jti: str, expires_at: Optional[datetime] = None) -> None:
+    """Call after committing a token_blacklist row."""
+    _cache.add(jti, expires_at)
+    try:
+        _signal().set('generation', f'{time.time():.6f}:{jti}', ttl=_max_lifetime().total_seconds())
+    except Exception as e:
+        # Other workers still pick the row up within SYNC_INTERVAL
+        logger.warning(f"Revocation signal failed: {e}")
@@ -175,6 +175,9 @@ def verify_email():
         # Clean up pending record
         db.session.delete(pending)
         db.session.commit()
+        if user.role == 'company':
+            from app.users.directory import clear_directory_cache
+            clear_directory_cache()
 
         log_audit('email_verified', resource='user', resource_id=user.id, user_id=user.id)
         return jsonify({'message': 'Email verified successfully. You can now log in.'}), 200
@@ -589,6 +592,7 @@ def logout():
     """Blacklist the current access token so it cannot be reused after logout."""
     try:
         from app.models.token_blacklist import TokenBlacklist
+        from app.auth.revocation import notify_token_revoked, token_expiry
         jwt_data = get_jwt()
         jti = jwt_data.get('jti')
         user_id = get_jwt_identity()
@@ -598,9 +602,11 @@ def logout():
                 jti=jti,
                 token_type='access',
                 user_id=int(user_id) if user_id else None,
+                expires_at=token_expiry(jwt_data),
             )
             db.session.add(entry)
             db.session.commit()
+            notify_token_revoked(jti, entry.expires_at)
 
         log_audit('logout', resource='user', resource_id=int(user_id) if user_id else None,
                   user_id=int(user_id) if user_id else None)
@@ -617,6 +623,7 @@ def refresh():
     """Refresh token rotation — blacklist old refresh token, issue new pair"""
     try:
         from app.models.token_blacklist import TokenBlacklist
+        from app.auth.revocation import notify_token_revoked, token_expiry
 
         current_user_id = int(get_jwt_identity())
         user = db.session.get(User, current_user_id)
@@ -632,6 +639,7 @@ def refresh():
                 jti=old_jti,
                 token_type='refresh',
                 user_id=current_user_id,
+                expires_at=token_expiry(jwt_data),
             )
             db.session.add(entry)
 
@@ -643,6 +651,8 @@ def refresh():
         refresh_token = create_refresh_token(identity=str(user.id))
 
         db.session.commit()
+        if old_jti:
+            notify_token_revoked(old_jti, token_expiry(jwt_data))
         log_audit('token_refresh', resource='user', resource_id=user.id, user_id=user.id)
 
         return jsonify({
@@ -14,6 +14,7 @@ from flask_jwt_extended import (
 from app.models import db
 from app.models.user import User
 from app.models.token_blacklist import TokenBlacklist
+from app.auth.revocation import notify_token_revoked, token_expiry
 from app.models.two_factor import TwoFactorCode
 from app.utils.validators import validate_email, sanitize_string
 from app.utils.rate_limiter import rate_limit_auth
@@ -40,9 +41,11 @@ def logout():
         jti=jti,
         token_type='access',
         user_id=user_id,
+        expires_at=token_expiry(jwt_data),
     )
     db.session.add(entry)
     db.session.commit()
+    notify_token_revoked(jti, entry.expires_at)
 
     log_audit('logout', resource='user', user_id=int(user_id) if user_id else None)
     return jsonify({'message': 'Logged out successfully'}), 200
@@ -9,6 +9,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import db
 from app.models.cv import CV, CVSection
 from app.models.user import User
+from app.matching.query_cache import invalidate_student_query
 
 cv_bp = Blueprint('cv', __name__)
 
@@ -67,6 +68,7 @@ def create_or_update_cv():
             setattr(cv, field, str(data[field])[:300] if data[field] else None)
 
     db.session.commit()
+    invalidate_student_query(user.id)
     return jsonify({'message': 'CV saved', 'cv': cv.to_dict()}), 200
 
 
@@ -118,6 +120,7 @@ def add_section():
     )
     db.session.add(section)
     db.session.commit()
+    invalidate_student_query(user.id)
 
     return jsonify({
         'message': 'Section added',
@@ -160,6 +163,7 @@ def update_section(section_id):
         section.order_index = int(data['order_index'])
 
     db.session.commit()
+    invalidate_student_query(user.id)
     return jsonify({'message': 'Section updated', 'section': section.to_dict()}), 200
 
 
@@ -182,6 +186,7 @@ def delete_section(section_id):
 
     db.session.delete(section)
     db.session.commit()
+    invalidate_student_query(user.id)
     return jsonify({'message': 'Section deleted'}), 200
 
 
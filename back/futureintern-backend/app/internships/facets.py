@@ -0,0 +1,185 @@
+"""
+Internship facet counts
+Active internships per location / major / type / stipend / company, for the
+browse UI. Counts live in the internship_facets table (InternshipFacetCount)
+and are maintained by triggers on internships (+1 / -1 per row, in the writing
+transaction), so reading them never scans internships and every write path —
+ORM, raw SQL, bulk imports — keeps them right. SQLite and PostgreSQL get the
+triggers; on any other database counts fall back to a GROUP BY per request.
+
+When filters are selected, counts are computed over the filtered rows through
+the facet column indexes, each facet ignoring its own filter so the UI can
+still show the alternatives ("disjunctive" facets).
+"""
+import logging
+from typing import Dict, List, Optional
+
+import sqlalchemy as sa
+
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+# facet name (API) -> internships column
+FACETS = {
+    'location': 'location',
+    'major': 'major',
+    'type': 'work_type',
+    'stipend': 'stipend',
+    'company': 'company_id',
+}
+TABLE = 'internship_facets'
+TRIGGER = 'internship_facets_sync'
+
+_maintained = False   # True once the triggers are known to exist
+
+
+def _value_rows(ref: str) -> str:
+    """One (facet, value) row per facet of the internships row `ref` (new / old / internships)."""
+    return ' UNION ALL '.join(
+        f"SELECT '{facet}' AS facet, CAST({ref}.{col} AS VARCHAR(200)) AS value, {ref}.is_active AS active"
+        + (f" FROM {ref}" if ref == 'internships' else '')
+        for facet, col in FACETS.items()
+    )
+
+
+def _increment(ref: str) -> str:
+    return (
+        f"INSERT INTO {TABLE} (facet, value, count) SELECT facet, value, 1 FROM ({_value_rows(ref)}) AS t "
+        f"WHERE value IS NOT NULL AND value <> '' AND active "
+        f"ON CONFLICT (facet, value) DO UPDATE SET count = {TABLE}.count + 1;"
+    )
+
+
+def _decrement(ref: str) -> str:
+    match = ' OR '.join(
+        f"(facet = '{facet}' AND value = CAST({ref}.{col} AS VARCHAR(200)))" for facet, col in FACETS.items()
+    )
+    return (
+        f"UPDATE {TABLE} SET count = count - 1 WHERE {ref}.is_active AND ({match}); "
+        f"DELETE FROM {TABLE} WHERE count <= 0;"
+    )
+
+
+def _rebuild(conn) -> None:
+    conn.execute(sa.text(f"DELETE FROM {TABLE}"))
+    conn.execute(sa.text(
+        f"INSERT INTO {TABLE} (facet, value, count) SELECT facet, value, COUNT(*) "
+        f"FROM ({_value_rows('internships')}) AS t "
+        f"WHERE value IS NOT NULL AND value <> '' AND active GROUP BY facet, value"
+    ))
+
+
+def _setup_sqlite(conn) -> bool:
+    columns = ', '.join(list(FACETS.values()) + ['is_active'])
+    triggers = {
+        f'{TRIGGER}_ai': f"AFTER INSERT ON internships BEGIN {_increment('new')} END",
+        f'{TRIGGER}_ad': f"AFTER DELETE ON internships BEGIN {_decrement('old')} END",
+        f'{TRIGGER}_au': f"AFTER UPDATE OF {columns} ON internships BEGIN "
+                         f"{_decrement('old')} {_increment('new')} END",
+    }
+    present = {r[0] for r in conn.execute(sa.text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE :p"
+    ), {'p': f'{TRIGGER}%'})}
+    if all(t in present for t in triggers):
+        return False
+    for name, body in triggers.items():
+        conn.execute(sa.text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+    return True
+
+
+def _setup_postgres(conn) -> bool:
+    if conn.execute(sa.text("SELECT 1 FROM pg_trigger WHERE tgname = :t"), {'t': TRIGGER}).first():
+        return False
+    columns = ', '.join(list(FACETS.values()) + ['is_active'])
+    conn.execute(sa.text(
+        f"CREATE OR REPLACE FUNCTION {TRIGGER}() RETURNS trigger AS $$ BEGIN "
+        f"IF TG_OP <> 'INSERT' THEN {_decrement('OLD')} END IF; "
+        f"IF TG_OP <> 'DELETE' THEN {_increment('NEW')} END IF; "
+        f"RETURN NULL; END $$ LANGUAGE plpgsql"
+    ))
+    # No writes between creating the trigger and the rebuild below
+    conn.execute(sa.text("LOCK TABLE internships IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(sa.text(
+        f"CREATE TRIGGER {TRIGGER} AFTER INSERT OR DELETE OR UPDATE OF {columns} "
+        f"ON internships FOR EACH ROW EXECUTE FUNCTION {TRIGGER}()"
+    ))
+    return True
+
+
+def init_facets() -> None:
+    """Create the facet triggers; rebuild the counts when the triggers are new."""
+    global _maintained
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as conn:
+        if dialect == 'sqlite':
+            created = _setup_sqlite(conn)
+        elif dialect == 'postgresql':
+            created = _setup_postgres(conn)
+        else:
+            logger.info(f"No facet triggers for {dialect} — counting facets per request")
+            _maintained = False
+            return
+        if created:
+            _rebuild(conn)
+            logger.info("Internship facet counts rebuilt")
+    _maintained = True
+
+
+def apply_facet_filters(query, filters: Dict[str, List[str]], skip: Optional[str] = None):
+    """Restrict an Internship query to rows matching every selected facet (values OR-ed)."""
+    from app.models.intern import Internship
+
+    for facet, values in filters.items():
+        if facet == skip or not values:
+            continue
+        column = getattr(Internship, FACETS[facet])
+        if facet == 'company':
+            values = [int(v) for v in values]
+        query = query.filter(column.in_(values))
+    return query
+
+
+def _live_counts(facet: str, filters: Dict[str, List[str]]) -> Dict[str, int]:
+    from app.models.intern import Internship
+
+    column = getattr(Internship, FACETS[facet])
+    query = db.session.query(column, sa.func.count(Internship.id))\
+        .filter(Internship.is_active == True, column.isnot(None))  # noqa: E712
+    query = apply_facet_filters(query, filters, skip=facet)
+    return {str(value): count for value, count in query.group_by(column) if str(value) != ''}
+
+
+def facet_counts(filters: Optional[Dict[str, List[str]]] = None, limit: int = 50) -> Dict:
+    """{facet: [{'value', 'count'[, 'label']}] most common first} plus the active total."""
+    from app.models.intern import InternshipFacetCount
+    from app.models.user import User
+
+    filters = {f: v for f, v in (filters or {}).items() if v}
+    counts: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+    if _maintained and not filters:
+        for row in InternshipFacetCount.query.all():
+            if row.facet in counts:
+                counts[row.facet][row.value] = row.count
+    else:
+        for facet in FACETS:
+            counts[facet] = _live_counts(facet, filters)
+
+    result = {}
+    for facet, values in counts.items():
+        ranked = sorted(values.items(), key=lambda kv: (-kv[1], kv[0]))
+        result[facet] = [{'value': v, 'count': c} for v, c in (ranked[:limit] if limit else ranked)]
+
+    # Every active row has a work type, so the type counts add up to the (filtered) total
+    total = sum(counts['type'].values())
+    if filters.get('type'):
+        total = sum(c for v, c in counts['type'].items() if v in filters['type'])
+
+    company_ids = [int(item['value']) for item in result['company']]
+    if company_ids:
+        names = {u.id: u.company_name or u.name or '' for u in
+                 User.query.with_entities(User.id, User.company_name, User.name).filter(User.id.in_(company_ids))}
+        for item in result['company']:
+            item['label'] = names.get(int(item['value']), '')
+
+    return {'facets': result, 'total': total}
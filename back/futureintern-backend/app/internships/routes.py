@@ -1,3 +1,5 @@
+import base64
+
 from flask import Blueprint, jsonify, request
 from app.models import db
 from app.models.intern import Internship
@@ -5,22 +7,75 @@ from app.models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.auth import role_required, get_current_user_role
 from datetime import datetime
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, load_only
+from app.matching.index import notify_internship_changed, notify_internship_removed
+from app.users.directory import clear_directory_cache
+from app.internships.facets import FACETS, apply_facet_filters, facet_counts
+from app.internships.search import search_internships
 
 internships_bp = Blueprint('internships', __name__)
 
 # ========== Task 3.3: Internship CRUD APIs ==========
 
+MAX_PER_PAGE = 100
+
+
+def _encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return int(base64.urlsafe_b64decode(padded.encode()).decode())
+
+
+def _requested_fields():
+    """?fields=a,b → (list, None); no param → (None, None); unknown name → (None, 400 response)."""
+    if not request.args.get('fields'):
+        return None, None
+    fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+    unknown = [f for f in fields if f not in Internship.FIELD_COLUMNS]
+    if unknown:
+        return None, (jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400)
+    return fields, None
+
+
+def _facet_filters():
+    """Selected facet values: ?location=Cairo&location=Remote&type=Remote → {facet: [values]}."""
+    return {facet: request.args.getlist(facet) for facet in FACETS if request.args.getlist(facet)}
+
+
 @internships_bp.route("/", methods=["GET"])
 def get_internships():
-    """Get all active internships with pagination"""
+    """
+    Get all active internships, in id order.
+
+    Pagination:
+      ?page=N&per_page=M      offset pages with total/pages (default)
+      ?cursor=&per_page=M     keyset pages: pass back `next_cursor` until it is null;
+                              no COUNT and no OFFSET, so deep pages cost the same as the first
+    ?fields=id,title,type,company,...  only these keys per internship (Internship.FIELD_COLUMNS)
+    ?location=&major=&type=&stipend=&company=  facet filters (exact values from /facets;
+                              repeat a parameter to OR values, different facets are AND-ed)
+    """
     try:
-        # Pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 100, type=int)
-        
-        # Query active internships and eager-load company to ensure we can serialize company data reliably
-        query = Internship.query.options(joinedload(Internship.company)).filter_by(is_active=True)
+        per_page = max(1, min(request.args.get('per_page', 100, type=int), MAX_PER_PAGE))
+
+        fields, error = _requested_fields()
+        if error:
+            return error
+
+        query = Internship.query.filter_by(is_active=True)
+        try:
+            query = apply_facet_filters(query, _facet_filters())
+        except ValueError:
+            return jsonify({'error': 'company must be a company id'}), 400
+        if fields is None or 'company' in fields:
+            # Eager-load company to ensure we can serialize company data reliably
+            query = query.options(joinedload(Internship.company))
+        if fields is not None:
+            columns = {c for f in fields for c in Internship.FIELD_COLUMNS[f]}
+            query = query.options(load_only(*(getattr(Internship, c) for c in columns)))
 
         # Auto-filter expired internships (deadline passed) — uncomment when data is updated
         # from datetime import date
@@ -32,21 +87,30 @@ def get_internships():
         #     )
         # )
 
-        
-        # Pagination
+        query = query.order_by(Internship.id)
+
+        if 'cursor' in request.args:
+            cursor = request.args['cursor']
+            if cursor:
+                try:
+                    query = query.filter(Internship.id > _decode_cursor(cursor))
+                except (ValueError, UnicodeDecodeError):
+                    return jsonify({'error': 'Invalid cursor'}), 400
+            rows = query.limit(per_page + 1).all()
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+            return jsonify({
+                'internships': [i.to_dict(fields=fields) for i in rows],
+                'per_page': per_page,
+                'has_more': has_more,
+                'next_cursor': _encode_cursor(rows[-1].id) if has_more else None,
+            }), 200
+
+        page = request.args.get('page', 1, type=int)
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        internships = [internship.to_dict() for internship in pagination.items]
 
-        # Debug log to help diagnosis in dev — shows whether company names are present
-        try:
-            companies_present = sum(1 for it in internships if it.get('company') and it['company'].get('name'))
-            print(f"Returning {len(internships)} internships (companies with names: {companies_present})")
-        except Exception:
-            pass
-        
         return jsonify({
-            'internships': internships,
+            'internships': [i.to_dict(fields=fields) for i in pagination.items],
             'total': pagination.total,
             'page': page,
             'per_page': per_page,
@@ -56,6 +120,65 @@ def get_internships():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@internships_bp.route("/facets", methods=["GET"])
+def get_internship_facets():
+    """
+    Active-internship counts per location / major / type / stipend / company
+    (app/internships/facets.py). Pass the same facet filters as the listing to
+    get drill-down counts; ?limit=N values per facet (default 50, 0 = all).
+    """
+    try:
+        limit = max(0, request.args.get('limit', 50, type=int))
+        try:
+            return jsonify(facet_counts(_facet_filters(), limit=limit)), 200
+        except ValueError:
+            return jsonify({'error': 'company must be a company id'}), 400
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@internships_bp.route("/search", methods=["GET"])
+def search_internships_route():
+    """
+    Ranked keyword search over active internships (app/internships/search.py).
+
+    ?q=python developer      every word must match (prefix), best matches first
+    ?location=&major=&type=&company_id=   optional filters
+    ?page=N&per_page=M&fields=...         as for the listing
+    """
+    try:
+        q = (request.args.get('q') or '').strip()
+        if not q:
+            return jsonify({'error': 'q is required'}), 400
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 20, type=int), MAX_PER_PAGE))
+        fields, error = _requested_fields()
+        if error:
+            return error
+
+        filters = {k: request.args.get(k) for k in ('location', 'major', 'type')}
+        filters['company_id'] = request.args.get('company_id', type=int)
+        internships, scores, total = search_internships(q, filters, page=page, per_page=per_page)
+
+        results = []
+        for internship in internships:
+            item = internship.to_dict(fields=fields)
+            item['score'] = round(scores.get(internship.id, 0.0), 4)
+            results.append(item)
+
+        return jsonify({
+            'internships': results,
+            'query': q,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total + per_page - 1) // per_page,
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @internships_bp.route("/<int:id>", methods=["GET"])
 def get_internship(id):
     """Get single internship by ID"""
@@ -122,6 +245,8 @@ def create_internship():
         
         db.session.add(internship)
         db.session.commit()
+        notify_internship_changed(internship)
+        clear_directory_cache()
         
         return jsonify({
             'message': 'Internship created successfully',
@@ -182,6 +307,8 @@ def update_internship(id):
                 pass
         
         db.session.commit()
+        notify_internship_changed(internship)
+        clear_directory_cache()
         
         return jsonify({
             'message': 'Internship updated successfully',
@@ -220,6 +347,8 @@ def delete_internship(id):
         
         db.session.delete(internship)
         db.session.commit()
+        notify_internship_removed(id)
+        clear_directory_cache()
         
         return jsonify({
             'message': 'Internship deleted successfully'
@@ -0,0 +1,300 @@
+"""
+Internship full-text search
+Ranked keyword search over title / required_skills / requirements / description
+of active internships. Backends (selected by Config.SEARCH_BACKEND, `auto` picks
+by database dialect):
+  • fts5     – SQLite FTS5 external-content table, kept in sync by triggers
+  • postgres – generated, weighted tsvector column with a GIN index
+  • python   – in-process inverted index with BM25 (no DB support needed)
+The SQL backends are maintained by the database itself, so every write path
+(API, admin tools, bulk imports, raw SQL) stays searchable without app hooks.
+The python backend re-syncs from a cheap (count, max(updated_at)) signature,
+like app/matching/index.py, so each worker sees the others' writes.
+
+Query words are AND-ed prefix matches ("pyth dev" finds "Python Developer").
+Field weights: title 10, skills 5, requirements 2, description 1.
+"""
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import sqlalchemy as sa
+
+from app.models import db
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ('title', 'required_skills', 'requirements', 'description')
+FIELD_WEIGHTS = {'title': 10.0, 'required_skills': 5.0, 'requirements': 2.0, 'description': 1.0}
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+class FTS5Search:
+    """SQLite FTS5 over the internships table (content='internships')."""
+
+    name = 'fts5'
+    TABLE = 'internships_fts'
+
+    def setup(self) -> None:
+        cols = ', '.join(SEARCH_FIELDS)
+        new_cols = ', '.join(f'new.{c}' for c in SEARCH_FIELDS)
+        old_cols = ', '.join(f'old.{c}' for c in SEARCH_FIELDS)
+        delete_old = (f"INSERT INTO {self.TABLE}({self.TABLE}, rowid, {cols}) "
+                      f"VALUES ('delete', old.id, {old_cols});")
+        insert_new = f"INSERT INTO {self.TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});"
+        triggers = {
+            f'{self.TABLE}_ai': f"AFTER INSERT ON internships BEGIN {insert_new} END",
+            f'{self.TABLE}_ad': f"AFTER DELETE ON internships BEGIN {delete_old} END",
+            f'{self.TABLE}_au': f"AFTER UPDATE OF {cols} ON internships BEGIN {delete_old} {insert_new} END",
+        }
+        with db.engine.begin() as conn:
+            present = {r[0] for r in conn.execute(sa.text(
+                "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE :p"
+            ), {'p': f'{self.TABLE}%'})}
+            if self.TABLE in present and all(t in present for t in triggers):
+                return
+            conn.execute(sa.text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5("
+                f"{cols}, content='internships', content_rowid='id', tokenize='porter unicode61')"
+            ))
+            for name, body in triggers.items():
+                conn.execute(sa.text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+            # Index rows written before (or while) the triggers were missing
+            conn.execute(sa.text(f"INSERT INTO {self.TABLE}({self.TABLE}) VALUES ('rebuild')"))
+        logger.info("FTS5 internship search index (re)built")
+
+    def ranked(self, words: List[str]):
+        """Selectable of (id, score) for every match; higher score is better."""
+        match = ' '.join(f'"{w}"*' for w in words)
+        weights = ', '.join(str(FIELD_WEIGHTS[f]) for f in SEARCH_FIELDS)
+        return sa.text(
+            f"SELECT rowid AS id, -bm25({self.TABLE}, {weights}) AS score "
+            f"FROM {self.TABLE} WHERE {self.TABLE} MATCH :match"
+        ).bindparams(match=match).columns(id=sa.Integer, score=sa.Float).subquery('search')
+
+
+class PostgresSearch:
+    """Generated tsvector column (weights A–D by field) with a GIN index."""
+
+    name = 'postgres'
+    WEIGHT_LETTERS = ('A', 'B', 'C', 'D')   # same order as SEARCH_FIELDS
+
+    def setup(self) -> None:
+        vector = ' || '.join(
+            f"setweight(to_tsvector('english', coalesce({f}, '')), '{w}')"
+            for f, w in zip(SEARCH_FIELDS, self.WEIGHT_LETTERS)
+        )
+        with db.engine.begin() as conn:
+            conn.execute(sa.text(
+                f"ALTER TABLE internships ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            conn.execute(sa.text(
+                "CREATE INDEX IF NOT EXISTS ix_internships_search_vector "
+                "ON internships USING GIN (search_vector)"
+            ))
+
+    def ranked(self, words: List[str]):
+        query = ' & '.join(f'{w}:*' for w in words)
+        # ts_rank weight array is {D, C, B, A}
+        weights = '{' + ', '.join(str(FIELD_WEIGHTS[f] / 10) for f in reversed(SEARCH_FIELDS)) + '}'
+        return sa.text(
+            "SELECT id, ts_rank(CAST(:weights AS float4[]), search_vector, q) AS score "
+            "FROM internships, to_tsquery('english', :query) q WHERE search_vector @@ q"
+        ).bindparams(query=query, weights=weights).columns(id=sa.Integer, score=sa.Float).subquery('search')
+
+
+class PythonSearch:
+    """In-process inverted index (term -> {internship_id: weighted tf}) scored with BM25."""
+
+    name = 'python'
+    SYNC_INTERVAL = 5    # seconds between DB signature checks
+    K1, B = 1.2, 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._terms: List[str] = []          # sorted vocabulary, for prefix lookups
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_len: Dict[int, float] = {}
+        self._versions: Dict[int, Optional[float]] = {}
+        self._signature = None
+        self._last_sync = 0.0
+
+    def setup(self) -> None:
+        pass   # built lazily on the first search
+
+    # ── Index maintenance ────────────────────────────────────────────────────
+
+    def _add(self, internship) -> None:
+        weighted: Dict[str, float] = defaultdict(float)
+        for field in SEARCH_FIELDS:
+            for term in tokenize(getattr(internship, field)):
+                weighted[term] += FIELD_WEIGHTS[field]
+        for term, tf in weighted.items():
+            if term not in self._postings:
+                bisect.insort(self._terms, term)
+            self._postings[term][internship.id] = tf
+        self._doc_terms[internship.id] = dict(weighted)
+        self._doc_len[internship.id] = sum(weighted.values())
+
+    def _remove(self, internship_id: int) -> None:
+        for term in self._doc_terms.pop(internship_id, {}):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(internship_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._terms.pop(bisect.bisect_left(self._terms, term))
+        self._doc_len.pop(internship_id, None)
+
+    def sync(self, force: bool = False) -> None:
+        from app.models.intern import Internship
+
+        with self._lock:
+            now = time.time()
+            if not force and self._signature is not None and now - self._last_sync < self.SYNC_INTERVAL:
+                return
+            self._last_sync = now
+            signature = db.session.query(
+                sa.func.count(Internship.id), sa.func.max(Internship.updated_at)
+            ).filter(Internship.is_active == True).one()  # noqa: E712
+            if signature == self._signature:
+                return
+
+            rows = db.session.query(Internship.id, Internship.updated_at)\
+                .filter(Internship.is_active == True).all()  # noqa: E712
+            current = {r.id: r.updated_at for r in rows}
+            for internship_id in set(self._versions) - set(current):
+                self._remove(internship_id)
+                del self._versions[internship_id]
+            changed = [i for i, v in current.items() if i not in self._versions or self._versions[i] != v]
+            for start in range(0, len(changed), 500):
+                for internship in Internship.query.filter(Internship.id.in_(changed[start:start + 500])):
+                    self._remove(internship.id)
+                    self._add(internship)
+                    self._versions[internship.id] = current[internship.id]
+            self._signature = signature
+
+    # ── Scoring ──────────────────────────────────────────────────────────────
+
+    def _expand(self, word: str) -> List[str]:
+        start = bisect.bisect_left(self._terms, word)
+        end = bisect.bisect_left(self._terms, word + '\uffff')
+        return self._terms[start:end]
+
+    def scores(self, words: List[str]) -> Dict[int, float]:
+        """BM25 score per matching internship (every word must match as a prefix)."""
+        self.sync()
+        with self._lock:
+            n = len(self._doc_len)
+            if not n:
+                return {}
+            avg_len = sum(self._doc_len.values()) / n
+            total: Optional[Dict[int, float]] = None
+            for word in words:
+                word_scores: Dict[int, float] = defaultdict(float)
+                for term in self._expand(word):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for doc, tf in postings.items():
+                        norm = tf + self.K1 * (1 - self.B + self.B * self._doc_len[doc] / avg_len)
+                        word_scores[doc] += idf * tf * (self.K1 + 1) / norm
+                if total is None:
+                    total = dict(word_scores)
+                else:
+                    total = {d: s + word_scores[d] for d, s in total.items() if d in word_scores}
+                if not total:
+                    return {}
+            return total or {}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _make_backend(name: str):
+    if name == 'fts5':
+        return FTS5Search()
+    if name == 'postgres':
+        return PostgresSearch()
+    if name == 'python':
+        return PythonSearch()
+    raise ValueError(f"Unknown search backend: {name}")
+
+
+def init_search():
+    """Create/verify the search index for the configured backend (call in an app context)."""
+    global _backend
+    from config import Config
+
+    name = getattr(Config, 'SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = {'sqlite': 'fts5', 'postgresql': 'postgres'}.get(db.engine.dialect.name, 'python')
+    with _backend_lock:
+        try:
+            backend = _make_backend(name)
+            backend.setup()
+        except Exception as e:
+            logger.warning(f"Search backend '{name}' unavailable ({e}) — using the in-process index")
+            backend = PythonSearch()
+        _backend = backend
+        return backend
+
+
+def get_search_backend():
+    return _backend if _backend is not None else init_search()
+
+
+def search_internships(query: str, filters: Optional[Dict] = None, page: int = 1,
+                       per_page: int = 20) -> Tuple[List, Dict[int, float], int]:
+    """
+    Ranked active internships matching every word of `query`.
+    filters: location / major (substring, case-insensitive), type (work_type), company_id.
+    Returns (internships on this page, {id: score}, total matches).
+    """
+    from app.models.intern import Internship
+
+    words = tokenize(query)
+    if not words:
+        return [], {}, 0
+    backend = get_search_backend()
+
+    q = Internship.query.filter(Internship.is_active == True)  # noqa: E712
+    filters = filters or {}
+    if filters.get('location'):
+        q = q.filter(Internship.location.ilike(f"%{filters['location']}%"))
+    if filters.get('major'):
+        q = q.filter(Internship.major.ilike(f"%{filters['major']}%"))
+    if filters.get('type'):
+        q = q.filter(Internship.work_type == filters['type'])
+    if filters.get('company_id'):
+        q = q.filter(Internship.company_id == filters['company_id'])
+
+    offset = (page - 1) * per_page
+    if isinstance(backend, PythonSearch):
+        scores = backend.scores(words)
+        if not scores:
+            return [], {}, 0
+        ids = [r.id for r in q.with_entities(Internship.id).filter(Internship.id.in_(list(scores)))]
+        ids.sort(key=lambda i: (-scores[i], i))
+        page_ids = ids[offset:offset + per_page]
+        rows = {i.id: i for i in Internship.query.filter(Internship.id.in_(page_ids))} if page_ids else {}
+        return [rows[i] for i in page_ids if i in rows], {i: scores[i] for i in page_ids}, len(ids)
+
+    ranked = backend.ranked(words)
+    q = q.join(ranked, ranked.c.id == Internship.id)
+    total = q.count()
+    rows = q.add_columns(ranked.c.score)\
+        .order_by(ranked.c.score.desc(), Internship.id).offset(offset).limit(per_page).all()
+    return [r[0] for r in rows], {r[0].id: float(r[1]) for r in rows}, total
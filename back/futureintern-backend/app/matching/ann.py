@@ -0,0 +1,91 @@
+"""
+Approximate Nearest-Neighbour Index (IVF)
+=========================================
+Pure-NumPy inverted-file index for L2-normalised embeddings, used by
+TransformerMatcher once the catalogue is large enough that an exact
+`q @ corpus.T` over every posting dominates request latency.
+
+Build: spherical k-means splits the corpus into ~sqrt(n) lists.
+Search: score the query against the centroids, scan only the `n_probe`
+closest lists exactly. Raising n_probe trades latency for recall
+(n_probe == n_lists is exact search).
+
+See benchmarks/bench_ann.py for recall/latency numbers against exact search.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """Inverted-file ANN index over unit vectors (inner product == cosine)."""
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, n_iter: int = 10, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+        self.n_rows = 0
+
+    def build(self, vectors: np.ndarray) -> "IVFIndex":
+        n = vectors.shape[0]
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+        rng = np.random.default_rng(self.seed)
+
+        # Spherical k-means on a sample is plenty for coarse partitioning
+        sample = vectors[rng.choice(n, size=min(n, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+        self.centroids = centroids.astype(vectors.dtype, copy=False)
+        self.n_lists = n_lists
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self.n_rows = 0
+        self.add(vectors)
+        logger.info(f"IVF index built: {n} vectors in {n_lists} lists")
+        return self
+
+    def add(self, vectors: np.ndarray) -> None:
+        """Assign new rows (numbered after the existing ones) to their nearest list."""
+        if self.centroids is None:
+            raise RuntimeError("Call build() before add()")
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        rows = np.arange(self.n_rows, self.n_rows + vectors.shape[0])
+        for c in np.unique(assign):
+            self.lists[c] = np.concatenate([self.lists[c], rows[assign == c]])
+        self.n_rows += vectors.shape[0]
+
+    def candidates(self, query: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """Row ids in the n_probe lists whose centroids are closest to the query."""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        if n_probe < self.n_lists:
+            probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            probe = np.arange(self.n_lists)
+        return np.concatenate([self.lists[c] for c in probe])
+
+    def search(self, query: np.ndarray, corpus: np.ndarray, top_k: int,
+               n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top_k (row ids, scores), best first."""
+        rows = self.candidates(query, n_probe)
+        scores = corpus[rows] @ query
+        k = min(top_k, len(rows))
+        if k <= 0:
+            return rows[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top], scores[top]
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from .service import HybridMatcher
 
 class RecommendationAPI:
@@ -6,13 +6,16 @@ class RecommendationAPI:
         self,
         student: Dict,
         internships: List[Dict],
-        filters: Dict = {},
+        filters: Optional[Dict] = None,
         top_k: int = 10,
     ) -> List[Dict]:
         """
-        Return recommended internships with optional post-filters.
+        Return recommended internships with optional pre-filters.
         Uses HybridMatcher (TF-IDF 30% + SBERT 70%).
 
+        filters: {"major": str, "location": str, "skills": List[str]} —
+        applied before ranking, so up to top_k matching internships are returned.
+
         Each result dict includes:
           - match_score   : float 0-100
           - match_rank    : int
@@ -29,25 +32,4 @@ class RecommendationAPI:
         """
         matcher = HybridMatcher()
         matcher.fit(internships)
-        results = matcher.match(student, top_k=top_k)
-
-        if filters:
-            internship_map = {i['id']: i for i in internships}
-
-            def passes_filters(match):
-                intern = internship_map.get(match['id'])
-                if not intern:
-                    return False
-                if 'skills' in filters and not set(filters['skills']).intersection(
-                    set(intern.get('skills', '').split())
-                ):
-                    return False
-                if 'major' in filters and intern.get('major') != filters['major']:
-                    return False
-                if 'location' in filters and intern.get('location') != filters['location']:
-                    return False
-                return True
-
-            results = [r for r in results if passes_filters(r)]
-
-        return results
+        return matcher.match(student, top_k=top_k, filters=filters)
@@ -0,0 +1,169 @@
+"""
+Batch Recommendation Engine
+===========================
+Precomputes recommendations for every student in one pass over the
+internship index: all student queries are scored together (one TF-IDF
+sparse matmul + batched SBERT encoding per chunk, argpartition top-k) and
+the results are written to the recommendation_results table, optionally
+also to a CSV shaped like app/matching/data/final_matching_results.csv
+(internship_title instead of its internship_category track codes, which
+internships do not carry).
+
+Entry points:
+  • POST /api/admin/recommendations/precompute   (queued as a background job,
+    app/matching/jobs.py; poll GET .../precompute/<job_id>)
+  • python precompute_recommendations.py   (e.g. from a nightly cron)
+"""
+
+import csv
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import selectinload
+
+from app.matching.index import get_index
+from app.matching.profiles import build_student_profile, has_profile_content, profile_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = ['student_email', 'company', 'internship_title', 'match_score', 'application_link', 'rank']
+
+
+def precompute_recommendations(
+    top_k: int = 10,
+    chunk_size: int = 256,
+    csv_path: Optional[str] = None,
+    progress: Optional[Callable[[int, str], None]] = None,
+) -> Dict:
+    """
+    Recompute and store top_k recommendations for every student with a profile.
+    Replaces all previously stored results. Returns a summary dict.
+    `progress(percent, stage)` is called after each chunk of students.
+    """
+    from app.models import db
+    from app.models.cv import CV
+    from app.models.intern import Internship
+    from app.models.recommendation import RecommendationResult
+    from app.models.user import User
+
+    started = time.time()
+    index = get_index()
+    index.sync(force=True)
+    # Every chunk is scored against this one copy; writes served meanwhile land in the live index
+    matcher = index.snapshot()
+
+    students = [s for s in User.query.filter_by(role='student').all() if has_profile_content(s)]
+    cvs = {
+        cv.student_id: cv
+        for cv in CV.query.options(selectinload(CV.sections))
+        .filter(CV.student_id.in_([s.id for s in students])).all()
+    } if students else {}
+    profiles = [build_student_profile(s, cvs.get(s.id), load_cv=False) for s in students]
+
+    if matcher is None or not students:
+        results: List[List[Dict]] = [[] for _ in students]
+    else:
+        results = []
+        for start in range(0, len(profiles), chunk_size):
+            results += matcher.match_batch(profiles[start:start + chunk_size], top_k=top_k,
+                                                 chunk_size=chunk_size, explain=True)
+            if progress:
+                progress(10 + 70 * len(results) // len(profiles), 'scoring')
+    scored_at = time.time()
+    if progress:
+        progress(80, 'writing')
+
+    computed_at = datetime.utcnow()
+    rows = []
+    for student, profile, matches in zip(students, profiles, results):
+        fingerprint = profile_fingerprint(profile)
+        for match in matches:
+            rows.append({
+                'student_id': student.id,
+                'internship_id': match['id'],
+                'rank': match['match_rank'],
+                'match_score': match['match_score'],
+                'tfidf_score': match['tfidf_score'],
+                'sbert_score': match['sbert_score'],
+                'explanation': json.dumps(match.get('explanation', {})),
+                'profile_hash': fingerprint,
+                'computed_at': computed_at,
+            })
+
+    try:
+        RecommendationResult.query.delete()
+        if rows:
+            db.session.bulk_insert_mappings(RecommendationResult, rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if csv_path:
+        internships = {
+            i.id: i for i in Internship.query.options(selectinload(Internship.company))
+            .filter(Internship.id.in_({r['internship_id'] for r in rows})).all()
+        } if rows else {}
+        emails = {s.id: s.email for s in students}
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            for r in rows:
+                intern = internships.get(r['internship_id'])
+                company = intern.company if intern else None
+                writer.writerow({
+                    'student_email': emails[r['student_id']],
+                    'company': (company.company_name or company.name) if company else '',
+                    'internship_title': intern.title if intern else '',
+                    'match_score': r['match_score'],
+                    'application_link': (intern.application_link or '') if intern else '',
+                    'rank': r['rank'],
+                })
+
+    summary = {
+        'students': len(students),
+        'internships': matcher.live_rows if matcher is not None else 0,
+        'results_written': len(rows),
+        'top_k': top_k,
+        'scoring_seconds': round(scored_at - started, 3),
+        'total_seconds': round(time.time() - started, 3),
+        'computed_at': computed_at.isoformat(),
+        'csv_path': csv_path,
+    }
+    logger.info(f"Precomputed recommendations: {summary}")
+    return summary
+
+
+def load_stored_matches(student_id: int, profile: Dict, limit: int) -> Optional[List[Dict]]:
+    """
+    Return stored matches for a student if they are still valid: computed for the
+    same profile fingerprint, no internship changed since, at least `limit` rows,
+    and every one of those still an active internship (a delete leaves
+    max(updated_at) unchanged). Returns None when the caller must run the matcher.
+    """
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.recommendation import RecommendationResult
+    from sqlalchemy import func
+
+    stored = RecommendationResult.query.filter_by(student_id=student_id)\
+        .order_by(RecommendationResult.rank.asc()).all()
+    if not stored or len(stored) < limit:
+        return None
+    if stored[0].profile_hash != profile_fingerprint(profile):
+        return None
+
+    latest_change = db.session.query(func.max(Internship.updated_at)).scalar()
+    if latest_change and latest_change > stored[0].computed_at:
+        return None
+
+    ids = [r.internship_id for r in stored[:limit]]
+    live = db.session.query(func.count(Internship.id))\
+        .filter(Internship.id.in_(ids), Internship.is_active == True).scalar()  # noqa: E712
+    if live < len(ids):
+        return None
+
+    return [r.to_match() for r in stored[:limit]]
@@ -0,0 +1,239 @@
+"""
+On-disk SBERT Embedding Store
+=============================
+Append-only cache of normalised corpus embeddings, shared by every worker
+process and kept across restarts, so each internship text is encoded once.
+
+Layout (one set of files per model, inside EMBEDDING_CACHE_DIR):
+  <model>[.g<N>].f32    raw float32 rows, memory-mapped read-only by readers
+  <model>[.g<N>].keys   one content hash per line; line N describes row N
+  <model>.meta          JSON {"dim", "model", "generation"}, written with the
+                        first row and replaced atomically on compaction
+  <model>.lock          advisory lock taken while appending or compacting
+
+Rows are written before their keys, so a crash mid-append leaves at most
+some orphan rows that are never referenced.
+
+Appending never reclaims rows of texts that were edited or deleted, so once
+more than COMPACT_RATIO of the rows are outside the corpus being fitted,
+maybe_compact() (called on every full fit) copies the live rows into the
+next generation's files and then switches .meta to them. Readers notice the
+new .meta on their next refresh and re-open; the previous generation is kept
+until the one after, so a reader that is mid-refresh never loses its files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single process, no locking needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """Content-hash → embedding row cache backed by a memory-mapped float32 file."""
+
+    COMPACT_RATIO = 0.5       # compact once this share of rows is not in the fitted corpus
+    COMPACT_MIN_ROWS = 1000   # ...and at least this many rows would be dropped
+    COPY_ROWS = 4096          # rows copied per write while compacting
+
+    def __init__(self, directory: str, model_name: str):
+        os.makedirs(directory, exist_ok=True)
+        self.model_name = model_name
+        self._base = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self._meta_path = self._base + ".meta"
+        self._lock_path = self._base + ".lock"
+        self._meta_version = None   # (inode, mtime) of the .meta the state below belongs to
+        self.generation = 0
+        self._matrix_path, self._keys_path = self._paths(0)
+        self._reset()
+        self.dim: Optional[int] = None
+        self._mutex = threading.Lock()
+
+    def _paths(self, generation: int):
+        base = f"{self._base}.g{generation}" if generation else self._base
+        return base + ".f32", base + ".keys"
+
+    def _reset(self) -> None:
+        self._rows: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._n_keys = 0
+        self._matrix: Optional[np.ndarray] = None
+
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        with self._mutex:
+            self._refresh()
+            return len(self._rows)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return {key: embedding} for every key already in the store."""
+        with self._mutex:
+            self._refresh()
+            if self._matrix is None:
+                return {}
+            return {
+                k: np.array(self._matrix[self._rows[k]])
+                for k in keys if k in self._rows
+            }
+
+    def _refresh(self, locked: bool = False) -> None:
+        """Pick up rows appended by this or any other process since the last read."""
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return
+        if (stat.st_ino, stat.st_mtime_ns) != self._meta_version:
+            # First read, or the store was compacted: start over on the current generation
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim = int(meta["dim"])
+            self.generation = int(meta.get("generation", 0))
+            self._matrix_path, self._keys_path = self._paths(self.generation)
+            self._reset()
+            self._meta_version = (stat.st_ino, stat.st_mtime_ns)
+        if not os.path.exists(self._keys_path):
+            return
+        if os.path.getsize(self._keys_path) == self._keys_offset:
+            return
+
+        with self._file_lock(exclusive=False, held=locked):
+            with open(self._keys_path, "rb") as f:
+                f.seek(self._keys_offset)
+                chunk = f.read()
+            # Ignore a trailing partial line from a writer that is mid-append
+            complete = chunk[:chunk.rfind(b"\n") + 1]
+            for line in complete.decode("ascii").splitlines():
+                self._rows.setdefault(line, self._n_keys)
+                self._n_keys += 1
+            self._keys_offset += len(complete)
+
+        if self._n_keys:
+            self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r",
+                                     shape=(self._n_keys, self.dim))
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def put_many(self, keys: List[str], embeddings: np.ndarray) -> None:
+        """Append embeddings for keys that are not stored yet."""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._mutex, self._file_lock(exclusive=True):
+            self._refresh(locked=True)
+            if self.dim is None:
+                self.dim = int(embeddings.shape[1])
+                self._write_meta(0)
+
+            seen = set(self._rows)
+            fresh = []
+            for i, k in enumerate(keys):
+                if k not in seen:
+                    seen.add(k)
+                    fresh.append(i)
+            if not fresh:
+                return
+
+            # Rows first, keys second: a key is only ever visible once its row is on disk.
+            # Truncate any orphan rows left by an interrupted writer so row N == key line N.
+            with open(self._matrix_path, "ab") as f:
+                f.truncate(self._n_keys * 4 * self.dim)
+                f.write(embeddings[fresh].tobytes())
+            with open(self._keys_path, "a") as f:
+                f.write("".join(keys[i] + "\n" for i in fresh))
+            self._refresh(locked=True)
+
+    def _write_meta(self, generation: int) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "model": self.model_name, "generation": generation}, f)
+        os.replace(tmp, self._meta_path)
+
+    # ── Compaction ───────────────────────────────────────────────────────────
+
+    def maybe_compact(self, live_keys: List[str]) -> int:
+        """Compact if enough rows are outside `live_keys` (the corpus just fitted)."""
+        with self._mutex:
+            self._refresh()
+            total = self._n_keys
+            stale = total - len(self._rows.keys() & set(live_keys))
+        if stale < self.COMPACT_MIN_ROWS or stale <= self.COMPACT_RATIO * total:
+            return 0
+        return self.compact(live_keys)
+
+    def compact(self, live_keys: List[str]) -> int:
+        """Rewrite the store with only the rows of `live_keys`; returns the rows dropped."""
+        live = set(live_keys)
+        with self._mutex, self._file_lock(exclusive=True):
+            self._refresh(locked=True)
+            if self._matrix is None:
+                return 0
+            kept = [k for k in self._rows if k in live]
+            generation = self.generation + 1
+            matrix_path, keys_path = self._paths(generation)
+            with open(matrix_path, "wb") as f:
+                for start in range(0, len(kept), self.COPY_ROWS):
+                    rows = [self._rows[k] for k in kept[start:start + self.COPY_ROWS]]
+                    f.write(np.ascontiguousarray(self._matrix[rows]).tobytes())
+            with open(keys_path, "w") as f:
+                f.write("".join(k + "\n" for k in kept))
+            # The new generation only becomes visible here
+            self._write_meta(generation)
+            dropped = self._n_keys - len(kept)
+            if generation >= 2:
+                for path in self._paths(generation - 2):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            self._refresh(locked=True)
+        logger.info(f"Compacted embedding store {self.model_name}: dropped {dropped} rows, kept {len(kept)}")
+        return dropped
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool, held: bool = False):
+        if fcntl is None or held:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# ─────────────────────────────────────────────
+# Per-model store cache
+# ─────────────────────────────────────────────
+
+_stores: Dict[str, EmbeddingStore] = {}
+
+
+def get_embedding_store(model_name: str) -> Optional[EmbeddingStore]:
+    """Return the shared store for model_name, or None if caching is disabled."""
+    from config import Config
+
+    directory = getattr(Config, "EMBEDDING_CACHE_DIR", "")
+    if not directory:
+        return None
+    if model_name not in _stores:
+        try:
+            _stores[model_name] = EmbeddingStore(directory, model_name)
+        except OSError as e:
+            logger.warning(f"Embedding cache disabled ({e})")
+            return None
+    return _stores[model_name]
@@ -0,0 +1,64 @@
+"""
+Offline ranking-quality metrics for the matcher.
+
+Historical results (final_matching_results.csv, via MatchingLoader) are
+student → company scores, so a matcher ranking of internships is collapsed to
+a ranking of companies (first occurrence wins) before it is compared.
+Relevance is graded by the historical match_score for NDCG and binary for
+recall@k and MRR.
+"""
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+def companies_in_rank_order(matches: Sequence[Dict], company_of: Dict) -> List[str]:
+    """Collapse ranked internship matches to distinct lower-case company names."""
+    seen, ranked = set(), []
+    for match in matches:
+        company = str(company_of.get(match['id'], '')).strip().lower()
+        if company and company not in seen:
+            seen.add(company)
+            ranked.append(company)
+    return ranked
+
+
+def recall_at_k(ranked: Sequence[str], relevant: Iterable[str], k: int) -> float:
+    relevant = set(relevant)
+    if not relevant:
+        return 0.0
+    return len(relevant.intersection(ranked[:k])) / len(relevant)
+
+
+def ndcg_at_k(ranked: Sequence[str], gains: Dict[str, float], k: int) -> float:
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = sum(gains.get(item, 0.0) * d for item, d in zip(ranked[:k], discounts))
+    ideal = sorted(gains.values(), reverse=True)[:k]
+    idcg = sum(g * d for g, d in zip(ideal, discounts))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def reciprocal_rank(ranked: Sequence[str], relevant: Iterable[str]) -> float:
+    relevant = set(relevant)
+    for position, item in enumerate(ranked, 1):
+        if item in relevant:
+            return 1.0 / position
+    return 0.0
+
+
+def evaluate_rankings(
+    rankings: Dict[str, List[str]],
+    truth: Dict[str, Dict[str, float]],
+    ks: Sequence[int] = (1, 3, 5),
+) -> Dict[str, float]:
+    """Mean recall@k, NDCG@k and MRR over every student present in both dicts."""
+    students = [s for s in rankings if truth.get(s)]
+    if not students:
+        return {}
+    metrics: Dict[str, float] = {}
+    for k in ks:
+        metrics[f'recall@{k}'] = float(np.mean([recall_at_k(rankings[s], truth[s], k) for s in students]))
+        metrics[f'ndcg@{k}'] = float(np.mean([ndcg_at_k(rankings[s], truth[s], k) for s in students]))
+    metrics['mrr'] = float(np.mean([reciprocal_rank(rankings[s], truth[s]) for s in students]))
+    metrics['students'] = len(students)
+    return metrics
@@ -0,0 +1,223 @@
+"""
+Internship Index
+================
+Process-wide, incrementally maintained HybridMatcher over active internships.
+
+The matcher is fitted once per worker (lazily, on the first recommendation
+request) and then kept current in two ways:
+  • write paths call notify_internship_changed / notify_internship_removed
+    right after commit, so the worker that served the write updates in place;
+  • every SYNC_INTERVAL seconds a cheap (count, max(updated_at)) signature is
+    compared against the DB so other gunicorn workers pick up those writes.
+
+Once too many rows have been touched since the last fit (IDF drift), the
+next query triggers a full re-fit instead of another incremental update.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.matching.service import HybridMatcher, get_matcher, reset_matcher
+
+logger = logging.getLogger(__name__)
+
+
+def internship_to_document(internship) -> Dict:
+    """Convert an Internship row into the dict shape HybridMatcher expects."""
+    required_skills_list = []
+    if internship.required_skills:
+        try:
+            required_skills_list = json.loads(internship.required_skills)
+        except Exception:
+            required_skills_list = [s.strip() for s in str(internship.required_skills).split(',') if s.strip()]
+    elif internship.requirements:
+        required_skills_list = [s.strip() for s in internship.requirements.split(',') if s.strip()]
+
+    return {
+        'id': internship.id,
+        'title': internship.title or '',
+        'description': internship.description or '',
+        'skills': ' '.join(str(s) for s in required_skills_list),
+        'requirements': internship.requirements or '',
+        'major': internship.major or '',
+        'location': internship.location or '',
+    }
+
+
+class InternshipIndex:
+    """Long-lived matcher over active internships, kept in sync with the DB."""
+
+    SYNC_INTERVAL = 30      # seconds between DB signature checks
+    REBUILD_RATIO = 0.25    # full re-fit once this share of rows has changed
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._versions: Dict[int, Optional[float]] = {}   # id -> updated_at timestamp
+        self._signature = None
+        self._last_sync = 0.0
+
+    # ── Build / sync ─────────────────────────────────────────────────────────
+
+    @property
+    def matcher(self) -> HybridMatcher:
+        return get_matcher()
+
+    def build(self) -> HybridMatcher:
+        """(Re)fit the matcher on every active internship."""
+        from app.models.intern import Internship
+
+        with self._lock:
+            internships = Internship.query.filter_by(is_active=True).all()
+            reset_matcher()
+            matcher = get_matcher()
+            if internships:
+                matcher.fit([internship_to_document(i) for i in internships])
+            self._versions = {i.id: _ts(i.updated_at) for i in internships}
+            self._signature = self._db_signature()
+            self._last_sync = time.time()
+            logger.info(f"Internship index built with {len(internships)} internships")
+            return matcher
+
+    def sync(self, force: bool = False) -> None:
+        """Apply writes made by other workers since the last check."""
+        from app.models.intern import Internship
+        from app.models import db
+
+        with self._lock:
+            if self._signature is None or (self._versions and not self.matcher.fitted):
+                self.build()
+                return
+            now = time.time()
+            if not force and now - self._last_sync < self.SYNC_INTERVAL:
+                return
+            self._last_sync = now
+
+            signature = self._db_signature()
+            if signature == self._signature:
+                return
+            if not self.matcher.fitted:
+                # Catalogue was empty at build time — nothing to patch
+                self.build()
+                return
+
+            rows = db.session.query(Internship.id, Internship.updated_at)\
+                .filter(Internship.is_active == True).all()  # noqa: E712
+            current = {r.id: _ts(r.updated_at) for r in rows}
+
+            for internship_id in set(self._versions) - set(current):
+                self._remove(internship_id)
+
+            changed = [i for i, v in current.items() if self._versions.get(i, -1.0) != v]
+            if changed:
+                for internship in Internship.query.filter(Internship.id.in_(changed)).all():
+                    self._upsert(internship)
+
+            self._signature = signature
+
+    def _db_signature(self):
+        from app.models.intern import Internship
+        from app.models import db
+        from sqlalchemy import func
+
+        count, latest = db.session.query(
+            func.count(Internship.id), func.max(Internship.updated_at)
+        ).filter(Internship.is_active == True).one()  # noqa: E712
+        return count, _ts(latest)
+
+    # ── Incremental updates ──────────────────────────────────────────────────
+
+    def _upsert(self, internship) -> None:
+        if not internship.is_active:
+            self._remove(internship.id)
+            return
+        self.matcher.upsert(internship_to_document(internship))
+        self._versions[internship.id] = _ts(internship.updated_at)
+
+    def _remove(self, internship_id: int) -> None:
+        self.matcher.remove(internship_id)
+        self._versions.pop(internship_id, None)
+
+    def upsert(self, internship) -> None:
+        """Add/refresh one internship. No-op until the index has been built."""
+        with self._lock:
+            if not self.matcher.fitted:
+                return
+            self._upsert(internship)
+
+    def remove(self, internship_id: int) -> None:
+        with self._lock:
+            if not self.matcher.fitted:
+                return
+            self._remove(internship_id)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self.matcher) if self.matcher.fitted else 0
+
+    def match(
+        self,
+        student_profile: Dict,
+        top_k: int = 10,
+        filters: Optional[Dict] = None,
+        min_score: Optional[float] = None,
+        cache_owner=None,
+    ) -> List[Dict]:
+        """Top-k matches; filters and min_score are applied before ranking (see HybridMatcher.match)."""
+        matcher = self.snapshot()
+        if matcher is None:
+            return []
+        return matcher.match(student_profile, top_k=top_k, filters=filters, min_score=min_score,
+                             cache_owner=cache_owner)
+
+    def snapshot(self) -> Optional[HybridMatcher]:
+        """
+        Synced point-in-time copy of the matcher (None while the catalogue is empty).
+        Callers score against it outside the lock, so concurrent matches and
+        writes don't queue behind them and writes can't change rows mid-scoring.
+        """
+        with self._lock:
+            if self.matcher.fitted and self.matcher.staleness > self.REBUILD_RATIO:
+                self.build()
+            else:
+                self.sync()
+            if not self.matcher.fitted or len(self.matcher) == 0:
+                return None
+            return self.matcher.snapshot()
+
+
+def _ts(value) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+# ─────────────────────────────────────────────
+# SINGLETON + write-path hooks
+# ─────────────────────────────────────────────
+
+_index = InternshipIndex()
+
+
+def get_index() -> InternshipIndex:
+    return _index
+
+
+def notify_internship_changed(*internships) -> None:
+    """Call after committing a create/update/(de)activation of internships."""
+    try:
+        for internship in internships:
+            _index.upsert(internship)
+    except Exception as e:
+        # Never let index maintenance break the write; the next sync() repairs it
+        logger.warning(f"Internship index update failed: {e}")
+
+
+def notify_internship_removed(*internship_ids: int) -> None:
+    """Call after committing the deletion of internships."""
+    try:
+        for internship_id in internship_ids:
+            _index.remove(internship_id)
+    except Exception as e:
+        logger.warning(f"Internship index removal failed: {e}")
@@ -0,0 +1,277 @@
+"""
+Recommendation Jobs
+===================
+Runs charged recommendation requests on a small background thread pool so
+web workers return immediately instead of blocking on SBERT inference.
+
+Job state lives in the shared cache (app/utils/cache.py), so the POST that
+starts a job and the GET polls for it may be served by different gunicorn
+workers. State: {job_id, student_id, status, progress, stage, result | error}
+with status one of queued → running → done | failed.
+A failed job refunds its points and releases the student's pending claim.
+
+The pool lives in one worker's memory, so a job can be lost with its worker.
+Every state change stamps updated_at (the job's heartbeat); a queued/running
+job not updated for MATCHING_JOB_TIMEOUT seconds is abandoned, and the next
+get_job() for it fails it, refunds its points and releases the claim.
+Exactly one of finishing, failing or expiring "settles" a job (cache.add),
+so points are never refunded twice and a late result is not stored.
+On worker exit, shutdown_jobs() cancels queued jobs, gives running ones a
+few seconds, and expires whatever is left the same way.
+
+The admin batch precompute (app/matching/batch.py) runs on the same pool as
+a job of kind 'precompute' (no student, no points); at most one runs at a
+time, claimed under the PRECOMPUTE_CLAIM key.
+"""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Tuple
+
+from app.utils.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL = 3600   # finished jobs can be polled for an hour
+ACTIVE = ('queued', 'running')
+LOST_ERROR = 'Your recommendation job was interrupted. Your points have been refunded. Please try again.'
+PRECOMPUTE_CLAIM = 'precompute'
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending: Dict[Future, Tuple] = {}   # future -> (app, job) until it finishes
+
+
+def _jobs():
+    return get_cache('recommendation_jobs')
+
+
+def job_timeout() -> float:
+    """Seconds without a heartbeat after which a queued/running job is abandoned."""
+    from config import Config
+    return float(getattr(Config, 'MATCHING_JOB_TIMEOUT', 300))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from config import Config
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(Config, 'MATCHING_JOB_WORKERS', 2),
+                thread_name_prefix='recommendation-job',
+            )
+        return _executor
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    """Current job state; an abandoned job is expired (refunded) first."""
+    job = _jobs().get(job_id)
+    if job is not None and job['status'] in ACTIVE and time.time() - job['updated_at'] > job_timeout():
+        job = expire_job(job)
+    return job
+
+
+def _update_job(job: Dict, **fields) -> None:
+    job.update(fields, updated_at=time.time())
+    _jobs().set(job['job_id'], job, JOB_TTL)
+
+
+def _settle(job_id: str) -> bool:
+    """True for the first of finish / fail / expire to reach this job."""
+    return _jobs().add(f'{job_id}:settled', True, JOB_TTL)
+
+
+def _release_claim(job: Dict) -> None:
+    """Drop the student's pending claim (or the precompute claim) if it still belongs to this job."""
+    if job.get('kind') == 'precompute':
+        if _jobs().get(PRECOMPUTE_CLAIM) == job['job_id']:
+            _jobs().delete(PRECOMPUTE_CLAIM)
+        return
+    rec_cache = get_cache('recommendations')
+    claim = rec_cache.get(job['student_id'])
+    if claim and claim.get('pending') and claim.get('job_id') == job['job_id']:
+        rec_cache.delete(job['student_id'])
+
+
+def expire_job(job: Dict, error: str = LOST_ERROR) -> Dict:
+    """Fail a job whose worker is gone: refund its points and release the claim."""
+    from app.matching.recommendations import refund_points
+    from app.models import db
+    from app.models.user import User
+
+    if not _settle(job['job_id']):
+        # Settled meanwhile (finished, failed or expired elsewhere)
+        return _jobs().get(job['job_id']) or job
+    logger.warning(f"Recommendation job {job['job_id']} abandoned in state '{job['status']}'")
+    _release_claim(job)
+    if job.get('kind') == 'precompute':
+        _update_job(job, status='failed', stage='failed', error='Precompute was interrupted. Please start it again.')
+        return job
+    student = db.session.get(User, job['student_id'])
+    if student is not None:
+        refund_points(student, job.get('cost', 0))
+    _update_job(job, status='failed', stage='failed', refunded=student is not None, error=error)
+    return job
+
+
+def start_job(app, job_id: str, student_id: int, cost: int, limit: int, min_score: Optional[float]) -> Dict:
+    """Record a queued job and hand it to the pool. Points must already be charged."""
+    job = {
+        'job_id': job_id,
+        'student_id': student_id,
+        'cost': cost,
+        'status': 'queued',
+        'progress': 0,
+        'stage': 'queued',
+        'created_at': time.time(),
+    }
+    _update_job(job)
+    _submit(app, job, _run_job, limit, min_score)
+    return job
+
+
+def start_precompute_job(app, admin_id: int, top_k: int) -> Dict:
+    """Queue a batch precompute; returns the one already running instead, if any."""
+    cache = _jobs()
+    running_id = cache.get(PRECOMPUTE_CLAIM)
+    if running_id:
+        running = get_job(running_id)   # expires a run lost with its worker
+        if running is not None and running['status'] in ACTIVE:
+            return running
+        if cache.get(PRECOMPUTE_CLAIM) == running_id:
+            cache.delete(PRECOMPUTE_CLAIM)
+
+    job_id = new_job_id()
+    if not cache.add(PRECOMPUTE_CLAIM, job_id, JOB_TTL):
+        # Another request started one just now
+        other = cache.get(PRECOMPUTE_CLAIM)
+        return get_job(other) or {'job_id': other, 'kind': 'precompute', 'status': 'queued'}
+    job = {
+        'job_id': job_id,
+        'kind': 'precompute',
+        'admin_id': admin_id,
+        'status': 'queued',
+        'progress': 0,
+        'stage': 'queued',
+        'created_at': time.time(),
+    }
+    _update_job(job)
+    _submit(app, job, _run_precompute, top_k)
+    return job
+
+
+def _submit(app, job: Dict, fn, *args) -> None:
+    future = _get_executor().submit(fn, app, job, *args)
+    _pending[future] = (app, job)
+    future.add_done_callback(lambda f: _pending.pop(f, None))
+
+
+def shutdown_jobs(timeout: float = 10.0) -> None:
+    """Stop this worker's pool (gunicorn worker_exit); jobs that cannot finish are expired."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return
+    pending = dict(_pending)
+    executor.shutdown(wait=False, cancel_futures=True)
+    wait(list(pending), timeout=timeout)
+    for future, (app, job) in pending.items():
+        if future.done() and not future.cancelled():
+            continue
+        from app.models import db
+        with app.app_context():
+            try:
+                expire_job(job)
+            except Exception as e:
+                logger.warning(f"Could not expire recommendation job {job['job_id']}: {e}")
+            finally:
+                db.session.remove()
+
+
+def _run_job(app, job: Dict, limit: int, min_score: Optional[float]) -> None:
+    from app.matching.profiles import build_student_profile
+    from app.matching.recommendations import (
+        REC_CACHE_TTL, compute_recommendations, refund_points, student_summary,
+    )
+    from app.models import db
+    from app.models.user import User
+
+    if _jobs().get(f"{job['job_id']}:settled"):
+        return   # expired while it was queued
+    with app.app_context():
+        student_id = job['student_id']
+        rec_cache = get_cache('recommendations')
+        student = None
+        try:
+            _update_job(job, status='running', progress=10, stage='building_profile')
+            student = db.session.get(User, student_id)
+            profile = build_student_profile(student)
+
+            _update_job(job, progress=30, stage='matching')
+            recommendations, catalogue_empty = compute_recommendations(
+                student_id, profile, limit, min_score,
+                progress=lambda percent, stage: _update_job(job, progress=percent, stage=stage),
+            )
+            if not _settle(job['job_id']):
+                return   # expired (and refunded) while it ran
+            rec_cache.set(student_id, {'result': recommendations}, REC_CACHE_TTL)
+            _update_job(job, status='done', progress=100, stage='done', result={
+                'message': 'No active internships available' if catalogue_empty
+                else 'Recommendations generated successfully',
+                'total': len(recommendations),
+                'student': student_summary(student, profile),
+                'recommendations': recommendations,
+            })
+        except Exception:
+            logger.exception(f"Recommendation job {job['job_id']} failed")
+            if not _settle(job['job_id']):
+                return
+            _release_claim(job)
+            if student is not None:
+                refund_points(student, job['cost'])
+            _update_job(job, status='failed', stage='failed', refunded=student is not None,
+                        error='AI matching failed. Your points have been refunded. Please try again in a moment.')
+        finally:
+            db.session.remove()
+
+
+def _run_precompute(app, job: Dict, top_k: int) -> None:
+    from app.matching.batch import precompute_recommendations
+    from app.models import db
+
+    if _jobs().get(f"{job['job_id']}:settled"):
+        return   # expired while it was queued
+    with app.app_context():
+        try:
+            _update_job(job, status='running', progress=5, stage='loading_students')
+            summary = precompute_recommendations(
+                top_k=top_k,
+                progress=lambda percent, stage: _update_job(job, progress=percent, stage=stage),
+            )
+            if not _settle(job['job_id']):
+                return
+            _release_claim(job)
+            _update_job(job, status='done', progress=100, stage='done', result=summary)
+        except Exception as e:
+            logger.exception(f"Precompute job {job['job_id']} failed")
+            db.session.rollback()
+            if not _settle(job['job_id']):
+                return
+            _release_claim(job)
+            _update_job(job, status='failed', stage='failed', error=str(e))
+        finally:
+            db.session.remove()
+
+
+def public_job(job: Dict) -> Dict:
+    """Job state as returned to the client."""
+    keys = ('job_id', 'status', 'progress', 'stage', 'created_at', 'updated_at', 'result', 'error', 'refunded')
+    return {k: job[k] for k in keys if k in job}
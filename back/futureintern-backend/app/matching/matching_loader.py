@@ -1,13 +1,30 @@
+import os
+
 import pandas as pd
 
+DEFAULT_RESULTS_PATH = os.path.join(os.path.dirname(__file__), "data", "final_matching_results.csv")
+
+
 class MatchingLoader:
-    def __init__(self, path=r"C:\Users\HP\Downloads\final_matching_results.csv"):
+    def __init__(self, path=DEFAULT_RESULTS_PATH):
         self.path = path
         self.df = pd.read_csv(self.path)
+        # Emails/companies in the export carry stray whitespace ("WEINTERN ", "x@y.com ")
+        self.df['student_email'] = self.df['student_email'].astype(str).str.strip().str.lower()
+        self.df['company'] = self.df['company'].astype(str).str.strip()
 
     def get_student_matches(self, student_email, min_score=0, limit=10):
         # تصفية الـ matches الخاصة بالطالب
-        matches = self.df[self.df['student_email'] == student_email]
+        matches = self.df[self.df['student_email'] == student_email.strip().lower()]
         matches = matches[matches['match_score'] >= min_score]
         matches = matches.sort_values(by='match_score', ascending=False)
         return matches.head(limit).to_dict(orient='records')
+
+    def ground_truth(self):
+        """{student_email: {company (lower-case): best historical match_score}}"""
+        truth = {}
+        for row in self.df.itertuples(index=False):
+            companies = truth.setdefault(row.student_email, {})
+            company = row.company.lower()
+            companies[company] = max(companies.get(company, 0.0), float(row.match_score))
+        return truth
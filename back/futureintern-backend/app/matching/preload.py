@@ -0,0 +1,132 @@
+"""
+Pre-fork Model Sharing
+======================
+With `gunicorn -w N` every worker used to build its own app, load its own
+embedding model and fit its own internship index: N copies of the same weights.
+
+gunicorn.conf.py turns on `preload_app` and sets MATCHING_PRELOAD, so
+create_app() runs once in the master and calls preload_matching() instead of
+starting the warm-up thread:
+  • the embedding backend is loaded and the internship index is fitted
+    (weights and corpus matrices are large contiguous numpy / torch buffers);
+  • DB connections are disposed so no socket is shared across fork();
+  • gc.freeze() moves every object that exists now into the permanent
+    generation, so the collector never writes to their pages and they stay
+    shared copy-on-write with the workers.
+Each worker then only runs after_fork() (thread pools, cache connections) and
+keeps its copy of the index current through the usual InternshipIndex.sync().
+
+memory_report() backs GET /api/matching/health: per-worker RSS split into
+shared and private pages, so the saving is visible per process.
+"""
+
+import gc
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_preloaded_pid: Optional[int] = None   # pid of the process that ran preload_matching()
+_preload_seconds = 0.0
+
+
+def preload_matching(app) -> None:
+    """Load the embedding backend and fit the internship index before the workers fork."""
+    global _preloaded_pid, _preload_seconds
+    from app.models import db
+    from app.matching.index import get_index
+    from app.matching.service import TransformerMatcher, _get_sbert_model
+
+    started = time.perf_counter()
+    with app.app_context():
+        backend = _get_sbert_model(TransformerMatcher.DEFAULT_MODEL)
+        if backend is not None and hasattr(backend, "prepare_fork"):
+            backend.prepare_fork()
+        try:
+            get_index().build()
+        except Exception as e:
+            logger.warning(f"Internship index not preloaded ({e}) — workers will build it on first use")
+        db.session.remove()
+        db.engine.dispose()
+
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    _preloaded_pid = os.getpid()
+    _preload_seconds = time.perf_counter() - started
+    logger.info(f"Matching models preloaded in {_preload_seconds:.2f}s (pid {_preloaded_pid})")
+
+
+def after_fork() -> None:
+    """Per-worker fix-ups once forked from a preloaded master (gunicorn post_fork)."""
+    from app.matching.service import _cached_sbert_model
+    from app.utils.cache import reset_caches
+
+    if _preloaded_pid is None or _preloaded_pid == os.getpid():
+        return
+    reset_caches()   # per-thread SQLite connections must not cross fork()
+    if _cached_sbert_model is not None and hasattr(_cached_sbert_model, "after_fork"):
+        _cached_sbert_model.after_fork()
+
+
+def is_preloaded() -> bool:
+    """True in a worker forked from a master that ran preload_matching()."""
+    return _preloaded_pid is not None and _preloaded_pid != os.getpid()
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """RSS of this process split into shared/private bytes (Linux smaps_rollup)."""
+    fields = {
+        "Rss": "rss", "Pss": "pss",
+        "Shared_Clean": "shared_clean", "Shared_Dirty": "shared_dirty",
+        "Private_Clean": "private_clean", "Private_Dirty": "private_dirty",
+    }
+    usage: Dict[str, Optional[int]] = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    usage[fields[key]] = int(value.split()[0]) * 1024
+    except OSError:
+        import resource
+        # ru_maxrss is KiB on Linux, bytes on macOS; peak rather than current
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    if "shared_clean" in usage:
+        usage["shared"] = usage["shared_clean"] + usage.get("shared_dirty", 0)
+        usage["private"] = usage.get("private_clean", 0) + usage.get("private_dirty", 0)
+    return usage
+
+
+def _nbytes(matrix) -> int:
+    if matrix is None:
+        return 0
+    if hasattr(matrix, "nbytes"):
+        return int(matrix.nbytes)
+    # scipy CSR
+    return int(sum(getattr(matrix, part).nbytes for part in ("data", "indices", "indptr")))
+
+
+def memory_report() -> Dict:
+    from app.matching.service import _cached_sbert_model, get_matcher
+
+    matcher = get_matcher()
+    backend = _cached_sbert_model
+    mb = 1024 * 1024
+    return {
+        "pid": os.getpid(),
+        "preloaded": is_preloaded(),
+        "master_pid": _preloaded_pid,
+        "preload_seconds": round(_preload_seconds, 2) if _preloaded_pid else None,
+        "gc_frozen_objects": gc.get_freeze_count() if hasattr(gc, "get_freeze_count") else None,
+        "memory_mb": {k: round(v / mb, 1) for k, v in process_memory().items() if v is not None},
+        "embedding_backend": backend.stats() if hasattr(backend, "stats") else None,
+        "model_weights_mb": round(backend.weights_nbytes() / mb, 1) if hasattr(backend, "weights_nbytes") else None,
+        "index": {
+            "internships": len(matcher),
+            "tfidf_mb": round(_nbytes(matcher.tfidf.corpus_matrix) / mb, 2),
+            "embeddings_mb": round(_nbytes(matcher.transformer.corpus_embeddings) / mb, 2),
+        },
+    }
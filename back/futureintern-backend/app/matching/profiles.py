@@ -0,0 +1,74 @@
+"""
+Student profile helpers for the AI matcher.
+Turns a User row (plus their CV builder data) into the profile dict that
+HybridMatcher expects, and fingerprints it so stored results can be reused
+until the profile changes.
+"""
+import hashlib
+import json
+from typing import Dict, List
+
+
+def parse_profile_field(val) -> List:
+    """Skills/interests are stored as a JSON list or a comma-separated string."""
+    if not val:
+        return []
+    if isinstance(val, list):
+        return val
+    if isinstance(val, str):
+        try:
+            if val.startswith('['):
+                return json.loads(val)
+        except Exception:
+            pass
+        return [s.strip() for s in val.split(',') if s.strip()]
+    return []
+
+
+def cv_text(cv) -> str:
+    """Flatten CV builder data (headline, summary, section texts) into one string."""
+    if not cv:
+        return ''
+    parts = []
+    if cv.headline:
+        parts.append(cv.headline)
+    if cv.summary:
+        parts.append(cv.summary)
+    for section in (cv.sections or []):
+        if section.title:
+            parts.append(section.title)
+        if section.subtitle:
+            parts.append(section.subtitle)
+        if section.description:
+            parts.append(section.description)
+    return ' '.join(parts)
+
+
+def build_student_profile(student, cv=None, load_cv=True) -> Dict:
+    """
+    Build the matcher profile for a student.
+    Batch jobs pass the preloaded `cv` (or None) with load_cv=False to skip the query.
+    """
+    if cv is None and load_cv:
+        from app.models.cv import CV
+        cv = CV.query.filter_by(student_id=student.id).first()
+
+    return {
+        'skills': parse_profile_field(student.skills),
+        'interests': parse_profile_field(student.interests),
+        'bio': student.bio or '',
+        'major': student.major or '',
+        'cv_text': cv_text(cv),
+    }
+
+
+def has_profile_content(student) -> bool:
+    """At least one of skills/interests/bio/major is filled in."""
+    fields = [student.skills, student.interests, student.bio, student.major]
+    return any(bool(str(f).strip()) for f in fields if f)
+
+
+def profile_fingerprint(profile: Dict) -> str:
+    """Stable hash of everything the matcher reads from a profile."""
+    payload = json.dumps(profile, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
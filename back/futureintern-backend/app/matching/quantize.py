@@ -0,0 +1,113 @@
+"""
+Quantised Embedding Matrix
+==========================
+Stores corpus embeddings as float16 (2 bytes/value) or int8 with one float32
+scale per row (≈1 byte/value), instead of float32, to cut per-worker memory.
+
+QuantizedMatrix behaves like the float32 matrix where TransformerMatcher and
+IVFIndex use it: `m @ q` (vector or matrix), `m[rows]` (dequantised float32
+rows), `.shape`, `.dtype`. Products are computed block by block: each block is
+widened into one reused float32 buffer (BLOCK_ROWS × dim) and multiplied with
+BLAS, so the temporary stays small.
+
+Quantised storage trades query latency for memory. NumPy has no integer or
+float16 BLAS, so widening the blocks is still the fastest way to multiply them,
+and that copy costs more than it saves in bandwidth: at 20000 × 384 one query
+takes ~1.5 ms against float32, ~3 ms against int8 and ~17 ms against float16
+(float16 → float32 conversion is not vectorised). float32 therefore stays the
+default (MATCHING_EMBEDDING_DTYPE); pick int8 only when the corpus would not
+fit in worker memory otherwise, and float16 only if int8's accuracy is not
+enough. See benchmarks/bench_quantization.py for accuracy and latency.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+
+
+class QuantizedMatrix:
+    """Row-quantised (n × dim) matrix; results are always float32."""
+
+    BLOCK_ROWS = 1024
+    dtype = np.dtype(np.float32)   # dtype of everything it returns
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.data = data
+        self.scales = scales        # int8 only: (n,) float32, value = data * scale
+
+    @classmethod
+    def from_float(cls, embeddings: np.ndarray, dtype: str) -> "QuantizedMatrix":
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if dtype == "float16":
+            return cls(embeddings.astype(np.float16))
+        if dtype == "int8":
+            scales = np.abs(embeddings).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            data = np.rint(embeddings / scales[:, None]).astype(np.int8)
+            return cls(data, scales.astype(np.float32))
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    @property
+    def storage_dtype(self) -> str:
+        return self.data.dtype.name
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    def __getitem__(self, rows) -> np.ndarray:
+        block = self.data[rows].astype(np.float32)
+        if self.scales is not None:
+            scale = self.scales[rows]
+            block *= scale[..., None] if np.ndim(scale) else scale
+        return block
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        """self @ other for a (dim,) vector or a (dim, m) matrix."""
+        other = np.asarray(other, dtype=np.float32)
+        n, dim = self.data.shape
+        out = np.empty((n,) + other.shape[1:], dtype=np.float32)
+        # One buffer per call (matchers are shared between threads), not per block
+        buffer = np.empty((min(self.BLOCK_ROWS, n), dim), dtype=np.float32)
+        for start in range(0, n, self.BLOCK_ROWS):
+            stop = min(start + self.BLOCK_ROWS, n)
+            block = buffer[:stop - start]
+            np.copyto(block, self.data[start:stop], casting="unsafe")
+            np.matmul(block, other, out=out[start:stop])
+        if self.scales is not None:
+            out *= self.scales.reshape((n,) + (1,) * (out.ndim - 1))
+        return out
+
+    def append(self, embeddings: np.ndarray) -> "QuantizedMatrix":
+        """New matrix with `embeddings` (float32) quantised and added as the last rows."""
+        extra = QuantizedMatrix.from_float(embeddings, self.storage_dtype)
+        scales = None
+        if self.scales is not None:
+            scales = np.concatenate([self.scales, extra.scales])
+        return QuantizedMatrix(np.vstack([self.data, extra.data]), scales)
+
+    def to_float(self) -> np.ndarray:
+        return self[np.arange(len(self))]
+
+
+def quantize(embeddings: np.ndarray, dtype: str):
+    """Return embeddings unchanged for float32, else as a QuantizedMatrix."""
+    if dtype == "float32":
+        return embeddings
+    return QuantizedMatrix.from_float(embeddings, dtype)
+
+
+def append_rows(matrix, embeddings: np.ndarray):
+    """vstack that works for both plain float32 arrays and QuantizedMatrix."""
+    if isinstance(matrix, QuantizedMatrix):
+        return matrix.append(embeddings)
+    return np.vstack([matrix, embeddings])
@@ -0,0 +1,105 @@
+"""
+Student Query Vector Cache
+==========================
+LRU cache of encoded student queries (TF-IDF row + SBERT embedding), keyed
+by a hash of the query text built from the profile, so repeated
+recommendations for an unchanged profile skip model inference entirely.
+
+Because the key is the content hash, an edited profile can never hit a stale
+entry. Profile/CV write paths still call invalidate_student_query() so the
+worker that served the edit frees the old vectors straight away; other
+workers simply let them age out of the LRU.
+
+TF-IDF rows are tagged with the fit they were produced by (a re-fit changes
+the vocabulary); SBERT embeddings with the model name, so they survive re-fits.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+
+class QueryVectorCache:
+    """Thread-safe LRU: query hash -> {"tfidf": (fit_id, row), "sbert": (model, vector)}."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._owners: Dict = {}    # student id -> key of their latest query
+        self._key_owners: Dict[str, Set] = {}   # key -> student ids pointing at it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str) -> str:
+        return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, part: str, tag) -> Optional[object]:
+        """Cached vector for one part ("tfidf" / "sbert") if it was stored under the same tag."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or part not in entry or entry[part][0] != tag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[part][1]
+
+    def put(self, key: str, part: str, tag, vector, owner=None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries.setdefault(key, {})[part] = (tag, vector)
+            self._entries.move_to_end(key)
+            if owner is not None:
+                previous = self._owners.get(owner)
+                if previous is not None and previous != key:
+                    self._drop(previous)
+                self._owners[owner] = key
+                self._key_owners.setdefault(key, set()).add(owner)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        """Remove an entry and every owner link to it, so _owners stays as bounded as the LRU."""
+        self._entries.pop(key, None)
+        for owner in self._key_owners.pop(key, ()):
+            if self._owners.get(owner) == key:
+                del self._owners[owner]
+
+    def invalidate_owner(self, owner) -> None:
+        with self._lock:
+            key = self._owners.get(owner)
+            if key is not None:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+            self._key_owners.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ─────────────────────────────────────────────
+# SINGLETON + invalidation hook
+# ─────────────────────────────────────────────
+
+_cache: Optional[QueryVectorCache] = None
+
+
+def get_query_cache() -> QueryVectorCache:
+    global _cache
+    if _cache is None:
+        from config import Config
+        _cache = QueryVectorCache(getattr(Config, "MATCHING_QUERY_CACHE_SIZE", 2048))
+    return _cache
+
+
+def invalidate_student_query(student_id) -> None:
+    """Call after committing a change to a student's profile or CV."""
+    get_query_cache().invalidate_owner(int(student_id))
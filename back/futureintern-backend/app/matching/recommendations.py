@@ -0,0 +1,88 @@
+"""
+Recommendation pipeline shared by the synchronous endpoint and background jobs:
+stored batch results or live index match → enrichment with internship details.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.matching.batch import load_stored_matches
+from app.matching.index import get_index
+
+# Recommendation results are cached per student for this long (free retries)
+REC_CACHE_TTL = 300   # 5 minutes
+
+
+def compute_recommendations(
+    student_id: int,
+    student_profile: Dict,
+    limit: int = 10,
+    min_score: Optional[float] = None,
+    progress: Optional[Callable[[int, str], None]] = None,
+) -> Tuple[List[Dict], bool]:
+    """
+    Return (enriched recommendations, catalogue_empty).
+    Results precomputed by the batch job are used while still valid; otherwise
+    the long-lived index only has to encode the student query. min_score is
+    applied inside the index before top-k so `limit` qualifying results come
+    back whenever they exist. `progress(percent, stage)` is called between steps.
+    """
+    from sqlalchemy.orm import joinedload
+    from app.models.intern import Internship
+
+    index = get_index()
+    matches = load_stored_matches(student_id, student_profile, limit)
+    if matches is not None and min_score is not None:
+        # Stored rows are the global top-N, so anything below them scores lower still
+        matches = [m for m in matches if m['match_score'] >= min_score]
+    if matches is None:
+        matches = index.match(student_profile, top_k=limit, min_score=min_score,
+                              cache_owner=student_id)
+
+    if not matches and len(index) == 0:
+        return [], True
+
+    if progress:
+        progress(80, 'enriching')
+    matched_ids = [m['id'] for m in matches]
+    internship_map = {
+        i.id: i for i in Internship.query.options(joinedload(Internship.company))
+        .filter(Internship.id.in_(matched_ids)).all()
+    } if matched_ids else {}
+
+    enriched = []
+    for match in matches:
+        intern_obj = internship_map.get(match['id'])
+        if intern_obj:
+            enriched.append({
+                'score': match['match_score'],
+                'match_details': {
+                    'tfidf_score': match['tfidf_score'],
+                    'sbert_score': match['sbert_score'],
+                    'rank': match['match_rank'],
+                    'explanation': match.get('explanation', {}),
+                },
+                'internship': intern_obj.to_dict(include_company=True)
+            })
+    return enriched, False
+
+
+def student_summary(student, student_profile: Optional[Dict] = None) -> Dict:
+    summary = {
+        'id': student.id,
+        'name': student.name,
+        'major': student.major,
+    }
+    if student_profile is not None:
+        summary['skills'] = student_profile['skills']
+        summary['interests'] = student_profile['interests']
+    return summary
+
+
+def refund_points(student, cost: int) -> None:
+    """Give back the points charged for a failed run (best effort)."""
+    from app.models import db
+
+    try:
+        student.points = (student.points or 0) + cost
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
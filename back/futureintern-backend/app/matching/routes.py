@@ -1,21 +1,117 @@
-import json
 import time
-from flask import Blueprint, jsonify, request  # type: ignore[import]
+from flask import Blueprint, jsonify, request, current_app, url_for  # type: ignore[import]
 from flask_jwt_extended import jwt_required  # type: ignore[import]
 from app.utils.auth import role_required, get_current_user_id
+from app.models import db
 from app.models.user import User
-from app.models.intern import Internship
-from app.matching.service import HybridMatcher
+from app.matching.jobs import ACTIVE, get_job, job_timeout, new_job_id, public_job, start_job
+from app.matching.profiles import build_student_profile, has_profile_content
+from app.matching.recommendations import (
+    REC_CACHE_TTL, compute_recommendations, refund_points, student_summary,
+)
+from app.utils.cache import get_cache
 
 matching_bp = Blueprint('matching', __name__)
 
 # ── Per-student result cache ──────────────────────────────────────────────────
-# Keyed by student_id → { 'ts': epoch_float, 'result': list }
+# Shared by all workers (app/utils/cache.py), keyed by student_id →
+#   { 'pending': True, 'claimed_at': float[, 'job_id': str] }
+#                                         while a charged run is in progress (claimed atomically)
+#   { 'result': list }                    once it finished
+# A claim whose run was lost with its worker is released (and a job's points
+# refunded) once it is older than the job timeout — see _live_claim().
 # Cached results are returned FREE within the TTL window so that:
-#  • client-side timeouts don't cost an extra charge on retry
+#  • client-side timeouts don't cost an extra charge on retry (on any worker)
 #  • page refreshes / state resets don't charge a second time
-_rec_cache: dict = {}
-_REC_CACHE_TTL = 300   # 5 minutes
+
+
+def _rec_cache():
+    return get_cache('recommendations')
+
+
+def _load_student_or_error():
+    """Return (student, None) or (None, error response) for the current student."""
+    student = db.session.get(User, get_current_user_id())
+    if not student:
+        return None, (jsonify({'error': 'Student not found'}), 404)
+
+    # Require at least one profile field before spending points
+    if not has_profile_content(student):
+        return None, (jsonify({
+            'error': 'Please complete your profile (add skills, interests, major, or bio) before requesting AI recommendations.'
+        }), 422)
+    return student, None
+
+
+def _live_claim(student_id, cached):
+    """`cached`, or None if it is a pending claim whose run is gone (released here)."""
+    if not cached or not cached.get('pending'):
+        return cached
+    job = get_job(cached['job_id']) if cached.get('job_id') else None   # expires + refunds a lost job
+    if job is not None:
+        return cached if job['status'] in ACTIVE else None
+    if time.time() - cached.get('claimed_at', 0) <= job_timeout():
+        return cached   # still running (or its job is about to be recorded)
+    _rec_cache().delete(student_id)
+    return None
+
+
+def _claim_or_cached_response(student, claim: dict):
+    """
+    Return a cached/pending response, or None once `claim` has been stored
+    atomically for this student (the caller then charges and runs matching).
+    """
+    cache = _rec_cache()
+    claim = dict(claim, claimed_at=time.time())
+    cached = _live_claim(student.id, cache.get(student.id))
+    if cached is None and not cache.add(student.id, claim, REC_CACHE_TTL):
+        cached = cache.get(student.id) or {'pending': True}
+    if cached is None:
+        return None
+
+    if cached.get('pending'):
+        if cached.get('job_id'):
+            # A background job is already running for this student — poll it
+            return jsonify({
+                'message': 'Your recommendations are being generated',
+                'job_id': cached['job_id'],
+                'status_url': url_for('matching.get_recommendation_job', job_id=cached['job_id']),
+            }), 202
+        # Points already charged but matching is still in progress in another request.
+        # Tell the client to retry in a moment — they will NOT be charged again.
+        return jsonify({
+            'error': 'Your request is still being processed. Please wait a moment and try again — you will not be charged again.',
+            'retry_after': 15,
+        }), 503
+    return jsonify({
+        'message': 'Recommendations generated successfully',
+        'total': len(cached['result']),
+        'cached': True,
+        'student': student_summary(student),
+        'recommendations': cached['result']
+    }), 200
+
+
+def _charge_or_error(student):
+    """Charge the AI matching fee. Returns (cost, None) or (None, 402 response); releases the claim on failure."""
+    from app.utils.points import check_and_charge
+    from app.models import db
+
+    cache = _rec_cache()
+    try:
+        success, msg, cost = check_and_charge(student, 'ai_matching')
+        if success:
+            db.session.commit()
+    except Exception:
+        cache.delete(student.id)
+        raise
+    if not success:
+        cache.delete(student.id)
+        return None, (jsonify({
+            'error': 'Insufficient points',
+            'message': msg
+        }), 402)  # Payment Required
+    return cost, None
 
 
 @matching_bp.route("/recommendations", methods=["GET"])
@@ -28,198 +124,128 @@ def get_recommendations():
     """
     try:
         # 1️⃣ Get current student
-        student_id = get_current_user_id()
-        student = User.query.get(student_id)
-
-        if not student:
-            return jsonify({'error': 'Student not found'}), 404
+        student, err = _load_student_or_error()
+        if err:
+            return err
+        student_id = student.id
 
-        # Require at least one profile field before spending points
-        _profile_fields = [student.skills, student.interests, student.bio, student.major]
-        if not any(bool(str(f).strip()) for f in _profile_fields if f):
-            return jsonify({
-                'error': 'Please complete your profile (add skills, interests, major, or bio) before requesting AI recommendations.'
-            }), 422
-
-        # 2️⃣ Return cached result for free if within TTL
-        now = time.time()
-        cached = _rec_cache.get(student_id)
-        if cached and (now - cached['ts']) < _REC_CACHE_TTL:
-            if cached.get('pending'):
-                # Points already charged but matching is still in progress in another request.
-                # Tell the client to retry in a moment — they will NOT be charged again.
-                return jsonify({
-                    'error': 'Your request is still being processed. Please wait a moment and try again — you will not be charged again.',
-                    'retry_after': 15,
-                }), 503
-            return jsonify({
-                'message': 'Recommendations generated successfully',
-                'total': len(cached['result']),
-                'cached': True,
-                'student': {
-                    'id': student.id,
-                    'name': student.name,
-                    'major': student.major,
-                },
-                'recommendations': cached['result']
-            }), 200
+        # 2️⃣ Return cached result for free if within TTL; otherwise atomically
+        #    claim the run so concurrent/retry requests on any worker are not
+        #    charged a second time.
+        response = _claim_or_cached_response(student, {'pending': True})
+        if response is not None:
+            return response
 
         # 3️⃣ Check Points Balance and charge via utility
-        from app.utils.points import check_and_charge
-        from app.models import db
-        success, msg, cost = check_and_charge(student, 'ai_matching')
-        if not success:
-            return jsonify({
-                'error': 'Insufficient points',
-                'message': msg
-            }), 402  # Payment Required
-        db.session.commit()
-
-        # Mark this student as "charged, matching in-progress" so concurrent/retry
-        # requests within the TTL window are not charged a second time.
-        _rec_cache[student_id] = {'ts': now, 'pending': True}
-
-        # 2️⃣ Get all active internships
-        internships = Internship.query.filter_by(is_active=True).all()
-
-        if not internships:
-            return jsonify({
-                'message': 'No active internships available',
-                'recommendations': []
-            }), 200
-
-        # 3️⃣ Parse student skills, interests and bio
-        def parse_field(val):
-            if not val:
-                return []
-            if isinstance(val, list):
-                return val
-            if isinstance(val, str):
-                try:
-                    if val.startswith('['):
-                        return json.loads(val)
-                except Exception:
-                    pass
-                return [s.strip() for s in val.split(',') if s.strip()]
-            return []
-
-        student_skills = parse_field(student.skills)
-        student_interests = parse_field(student.interests)
+        cost, err = _charge_or_error(student)
+        if err:
+            return err
 
         # 4️⃣ Build student profile for the AI matcher
-        # Include CV builder data (summary, headline, section descriptions)
-        from app.models.cv import CV
-        cv = CV.query.filter_by(student_id=student.id).first()
-        cv_text_parts = []
-        if cv:
-            if cv.headline:
-                cv_text_parts.append(cv.headline)
-            if cv.summary:
-                cv_text_parts.append(cv.summary)
-            for section in (cv.sections or []):
-                if section.title:
-                    cv_text_parts.append(section.title)
-                if section.subtitle:
-                    cv_text_parts.append(section.subtitle)
-                if section.description:
-                    cv_text_parts.append(section.description)
-
-        student_profile = {
-            'skills': student_skills,
-            'interests': student_interests,
-            'bio': student.bio or '',
-            'major': student.major or '',
-            'cv_text': ' '.join(cv_text_parts),
-        }
-
-        # 5️⃣ Prepare internship dicts for the AI matcher
-        internships_for_matcher = []
-        for internship in internships:
-            required_skills_list = []
-            if internship.required_skills:
-                try:
-                    required_skills_list = json.loads(internship.required_skills)
-                except Exception:
-                    required_skills_list = [s.strip() for s in str(internship.required_skills).split(',') if s.strip()]
-            elif internship.requirements:
-                required_skills_list = [s.strip() for s in internship.requirements.split(',') if s.strip()]
-
-            internships_for_matcher.append({
-                'id': internship.id,
-                'title': internship.title or '',
-                'description': internship.description or '',
-                'skills': ' '.join(required_skills_list),
-                'requirements': internship.requirements or '',
-                'major': internship.major or '',
-                'location': internship.location or '',
-            })
-
-        # 6️⃣ Run AI matching (TF-IDF + SBERT)
+        #    (skills, interests, bio, major + CV builder headline/summary/sections)
+        student_profile = build_student_profile(student)
+
+        # 5️⃣ Run AI matching (TF-IDF + SBERT) and enrich with internship details
         #    Wrap in its own try/except so we can refund points on failure
         limit = request.args.get('limit', 10, type=int)
+        min_score = request.args.get('min_score', type=float)
+        cache = _rec_cache()
         try:
-            matcher = HybridMatcher()
-            matcher.fit(internships_for_matcher)
-            matches = matcher.match(student_profile, top_k=limit)
-        except Exception as match_err:
-            # Matching failed after points were already charged → refund + clear pending lock
-            _rec_cache.pop(student_id, None)
-            try:
-                from app.models import db as _db
-                student.points = (student.points or 0) + cost
-                _db.session.commit()
-            except Exception:
-                pass
+            recommendations, catalogue_empty = compute_recommendations(
+                student_id, student_profile, limit, min_score
+            )
+        except Exception:
+            # Matching failed after points were already charged → refund + clear pending claim
+            cache.delete(student_id)
+            refund_points(student, cost)
             return jsonify({
                 'error': 'AI matching failed. Your points have been refunded. Please try again in a moment.',
                 'refunded': True,
             }), 500
 
-        # 7️⃣ Enrich results with full internship details from DB
-        internship_map = {i.id: i for i in internships}
-        enriched_recommendations = []
-        for match in matches:
-            intern_obj = internship_map.get(match['id'])
-            if intern_obj:
-                enriched_recommendations.append({
-                    'score': match['match_score'],
-                    'match_details': {
-                        'tfidf_score': match['tfidf_score'],
-                        'sbert_score': match['sbert_score'],
-                        'rank': match['match_rank'],
-                        'explanation': match.get('explanation', {}),
-                    },
-                    'internship': intern_obj.to_dict(include_company=True)
-                })
-
-        # 8️⃣ Optional min_score filter
-        min_score = request.args.get('min_score', type=float)
-        if min_score is not None:
-            enriched_recommendations = [
-                r for r in enriched_recommendations if r['score'] >= min_score
-            ]
+        # 6️⃣ Cache the result so retries within TTL are free
+        cache.set(student_id, {'result': recommendations}, REC_CACHE_TTL)
 
-        # 9️⃣ Cache the result so retries within TTL are free
-        _rec_cache[student_id] = {'ts': now, 'result': enriched_recommendations}
+        if catalogue_empty:
+            return jsonify({
+                'message': 'No active internships available',
+                'recommendations': []
+            }), 200
 
-        # 🔟 Final response
+        # 7️⃣ Final response
         return jsonify({
             'message': 'Recommendations generated successfully',
-            'total': len(enriched_recommendations),
-            'student': {
-                'id': student.id,
-                'name': student.name,
-                'major': student.major,
-                'skills': student_skills,
-                'interests': student_interests,
-            },
-            'recommendations': enriched_recommendations
+            'total': len(recommendations),
+            'student': student_summary(student, student_profile),
+            'recommendations': recommendations
         }), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@matching_bp.route("/recommendations/jobs", methods=["POST"])
+@jwt_required()
+@role_required('student')
+def create_recommendation_job():
+    """
+    Start recommendations as a background job and return its id immediately.
+    Poll GET /api/recommendations/jobs/<job_id> for progress and results.
+    Query/body params: limit, min_score (same as GET /api/recommendations).
+    """
+    try:
+        student, err = _load_student_or_error()
+        if err:
+            return err
+
+        # Cached result → free and immediate; running job → its id; else claim
+        job_id = new_job_id()
+        response = _claim_or_cached_response(student, {'pending': True, 'job_id': job_id})
+        if response is not None:
+            return response
+
+        cost, err = _charge_or_error(student)
+        if err:
+            return err
+
+        data = request.get_json(silent=True) or {}
+        limit = int(data.get('limit', request.args.get('limit', 10, type=int)))
+        min_score = data.get('min_score', request.args.get('min_score', type=float))
+        min_score = float(min_score) if min_score is not None else None
+
+        try:
+            job = start_job(current_app._get_current_object(), job_id, student.id, cost, limit, min_score)
+        except Exception:
+            _rec_cache().delete(student.id)
+            refund_points(student, cost)
+            raise
+
+        return jsonify({
+            'message': 'Recommendation job started',
+            'job_id': job_id,
+            'status': job['status'],
+            'status_url': url_for('matching.get_recommendation_job', job_id=job_id),
+        }), 202
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route("/recommendations/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+@role_required('student')
+def get_recommendation_job(job_id):
+    """Progress of a recommendation job; includes the results once status is 'done'."""
+    try:
+        job = get_job(job_id)
+        if not job or job.get('student_id') != get_current_user_id():
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(public_job(job)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @matching_bp.route("/recommendations/test", methods=["GET"])
 @jwt_required()
 @role_required('student')
@@ -229,13 +255,32 @@ def test_recommendations():
     """
     try:
         student_id = get_current_user_id()
-        student = User.query.get(student_id)
+        student = db.session.get(User, student_id)
+
+        from app.matching.service import _get_sbert_model, TransformerMatcher
+        backend = _get_sbert_model(TransformerMatcher.DEFAULT_MODEL)
 
         return jsonify({
             'message': 'AI matching system (TF-IDF + SBERT) is working',
             'student': student.to_dict() if student else None,
-            'engine': 'HybridMatcher (TF-IDF 30% + SBERT 70%)'
+            'engine': 'HybridMatcher (TF-IDF 30% + SBERT 70%)',
+            'embedding_backend': backend.stats() if hasattr(backend, 'stats') else None,
         }), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@matching_bp.route("/matching/health", methods=["GET"])
+def matching_health():
+    """
+    Per-worker matching memory: model weights, index size and how much of the
+    process RSS is shared with the gunicorn master (see gunicorn.conf.py).
+    Each call is answered by whichever worker accepted it.
+    """
+    try:
+        from app.matching.preload import memory_report
+        return jsonify(memory_report()), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -6,35 +6,267 @@ Replaces rule-based matching with semantic similarity scoring.
 
 Architecture:
   Student Profile Text → TF-IDF (30%) + SBERT (70%) → Cosine Similarity → Match Score
-  Falls back to 100% TF-IDF if sentence-transformers is not installed.
+  The semantic side runs on a pluggable embedding backend (SBERT / ONNX / static vectors);
+  falls back to 100% TF-IDF if none of them is available.
 """
 
+import copy
 import re
+import itertools
 import logging
+import time
 import numpy as np
 from typing import List, Dict, Tuple, Optional
+from scipy import sparse  # type: ignore[import-untyped]
 from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore[import-untyped]
 from sklearn.metrics.pairwise import cosine_similarity  # type: ignore[import-untyped]
 
 logger = logging.getLogger(__name__)
 
+_fit_ids = itertools.count(1)   # tags TF-IDF fits so cached query rows can be validated
+
 # ─────────────────────────────────────────────
-# SBERT MODEL CACHE (loaded once, reused across requests)
+# EMBEDDING BACKENDS (loaded once, reused across requests)
 # ─────────────────────────────────────────────
+# Every backend exposes SentenceTransformer.encode's signature, so
+# TransformerMatcher does not care which one it got:
+#   • sbert  — sentence-transformers + PyTorch (reference quality, heaviest)
+#   • onnx   — ONNX Runtime export of the same model + HF tokenizers (no torch)
+#   • static — averaged static word vectors (.npz / GloVe-style .txt), numpy only
+# Config.EMBEDDING_BACKENDS lists them in order of preference; the first one
+# that loads wins, and if none does matching falls back to TF-IDF only.
+
+class EmbeddingBackend:
+    """Base class: load() once, then encode(); keeps load time and throughput stats."""
+
+    name = "base"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.load_seconds = 0.0
+        self.encoded_texts = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def cache_key(self) -> str:
+        """Name under which embeddings are cached; differs per backend since vectors differ."""
+        return f"{self.model_name}@{self.name}"
+
+    def load(self) -> "EmbeddingBackend":
+        started = time.perf_counter()
+        self._load()
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Embedding backend '{self.name}' loaded in {self.load_seconds:.2f}s")
+        return self
+
+    def _load(self) -> None:
+        raise NotImplementedError
+
+    def encode(self, texts, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        started = time.perf_counter()
+        out = np.asarray(self._encode(list(texts), batch_size), dtype=np.float32)
+        if normalize_embeddings and len(out):
+            out /= np.linalg.norm(out, axis=1, keepdims=True) + 1e-12
+        self.encode_seconds += time.perf_counter() - started
+        self.encoded_texts += len(out)
+        return out
+
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        raise NotImplementedError
+
+    # Pre-fork hooks (app/matching/preload.py): the gunicorn master loads the
+    # backend, calls prepare_fork() before encoding the corpus, and every worker
+    # calls after_fork() once. Thread pools do not survive fork(), so backends
+    # that own one must not start it in the master.
+    def prepare_fork(self) -> None:
+        pass
+
+    def after_fork(self) -> None:
+        pass
+
+    def weights_nbytes(self) -> int:
+        return 0
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.name,
+            "model": self.model_name,
+            "load_seconds": round(self.load_seconds, 3),
+            "encoded_texts": self.encoded_texts,
+            "texts_per_second": round(self.encoded_texts / self.encode_seconds, 1) if self.encode_seconds else None,
+        }
+
+
+class SBERTBackend(EmbeddingBackend):
+    name = "sbert"
 
-_cached_sbert_model = None
+    @property
+    def cache_key(self) -> str:
+        return self.model_name   # keeps embedding caches written before backends existed
+
+    def _load(self) -> None:
+        from sentence_transformers import SentenceTransformer  # type: ignore[import]
+        self.model = SentenceTransformer(self.model_name)
+        self.model.eval()   # inference only, so the shared weight pages are never written
+
+    def _encode(self, texts, batch_size):
+        return self.model.encode(texts, batch_size=batch_size, show_progress_bar=False,
+                                 convert_to_numpy=True, normalize_embeddings=False)
+
+    def prepare_fork(self) -> None:
+        # Encode single-threaded in the master: an OpenMP pool started before
+        # fork() can deadlock the first parallel region in every worker.
+        import torch  # type: ignore[import]
+        self._torch_threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+
+    def after_fork(self) -> None:
+        import torch  # type: ignore[import]
+        torch.set_num_threads(getattr(self, "_torch_threads", torch.get_num_threads()))
+
+    def weights_nbytes(self) -> int:
+        return sum(p.numel() * p.element_size() for p in self.model.parameters())
+
+
+class ONNXBackend(EmbeddingBackend):
+    """
+    ONNX Runtime export of the sentence-transformers model with mean pooling.
+    EMBEDDING_ONNX_DIR must hold model.onnx and tokenizer.json, e.g. from
+    `optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 <dir>`.
+    """
+    name = "onnx"
+    MAX_LENGTH = 256
+
+    def __init__(self, model_name: str, model_dir: str):
+        super().__init__(model_name)
+        self.model_dir = model_dir
+
+    def _load(self) -> None:
+        import importlib.util
+        import os
+
+        # Fail before reading the tokenizer if the runtime is missing
+        if importlib.util.find_spec("onnxruntime") is None:
+            raise ModuleNotFoundError("No module named 'onnxruntime'")
+        from tokenizers import Tokenizer  # type: ignore[import]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.MAX_LENGTH)
+        self.tokenizer.enable_padding()
+        self._start_session()
+
+    def _start_session(self) -> None:
+        import os
+        import onnxruntime  # type: ignore[import]
+
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(self.model_dir, "model.onnx"), providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def after_fork(self) -> None:
+        # The session's intra-op thread pool stays behind in the master, so each
+        # worker opens its own session (model.onnx is read through the page cache).
+        self._start_session()
+
+    def weights_nbytes(self) -> int:
+        import os
+        return os.path.getsize(os.path.join(self.model_dir, "model.onnx"))
+
+    def _encode(self, texts, batch_size):
+        chunks = []
+        for start in range(0, len(texts), batch_size):
+            batch = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            ids = np.array([e.ids for e in batch], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+            feed = {"input_ids": ids, "attention_mask": mask,
+                    "token_type_ids": np.array([e.type_ids for e in batch], dtype=np.int64)}
+            output = self.session.run(None, {k: v for k, v in feed.items() if k in self.input_names})[0]
+            if output.ndim == 3:   # token embeddings → mean pooling over real tokens
+                weights = mask[..., None].astype(np.float32)
+                output = (output * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+            chunks.append(output)
+        return np.vstack(chunks) if chunks else np.zeros((0, 0), dtype=np.float32)
+
+
+class StaticBackend(EmbeddingBackend):
+    """
+    Average of static word vectors. EMBEDDING_STATIC_PATH is an .npz with
+    `words` and `vectors` arrays, or a GloVe/fastText-style text file.
+    """
+    name = "static"
+
+    def __init__(self, model_name: str, path: str):
+        super().__init__(model_name)
+        self.path = path
+
+    @property
+    def cache_key(self) -> str:
+        import os
+        return f"static-{os.path.splitext(os.path.basename(self.path))[0]}"
+
+    def _load(self) -> None:
+        if self.path.endswith(".npz"):
+            data = np.load(self.path, allow_pickle=False)
+            words, self.vectors = list(data["words"]), data["vectors"].astype(np.float32)
+        else:
+            words, rows = [], []
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip().split(" ")
+                    if len(parts) <= 2:   # fastText header "<count> <dim>"
+                        continue
+                    words.append(parts[0])
+                    rows.append(np.asarray(parts[1:], dtype=np.float32))
+            self.vectors = np.vstack(rows)
+        self.vocab = {str(w): i for i, w in enumerate(words)}
+
+    def weights_nbytes(self) -> int:
+        return self.vectors.nbytes
+
+    def _encode(self, texts, batch_size):
+        out = np.zeros((len(texts), self.vectors.shape[1]), dtype=np.float32)
+        for i, text in enumerate(texts):
+            ids = [self.vocab[t] for t in preprocess_text(text).split() if t in self.vocab]
+            if ids:
+                out[i] = self.vectors[ids].mean(axis=0)
+        return out
+
+
+def _make_backend(name: str, model_name: str) -> EmbeddingBackend:
+    from config import Config
+
+    if name == "sbert":
+        return SBERTBackend(model_name)
+    if name == "onnx":
+        return ONNXBackend(model_name, getattr(Config, "EMBEDDING_ONNX_DIR", ""))
+    if name == "static":
+        return StaticBackend(model_name, getattr(Config, "EMBEDDING_STATIC_PATH", ""))
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+
+def load_embedding_backend(name: str, model_name: str) -> EmbeddingBackend:
+    """Load one backend by name (raises if its dependencies or files are missing)."""
+    return _make_backend(name, model_name).load()
+
+
+_cached_sbert_model = None   # the active backend (name kept for the app's warm-up hook)
 
 def _get_sbert_model(model_name: str):
-    """Load SentenceTransformer once and cache it for the process lifetime."""
+    """Load the first available embedding backend once and cache it for the process lifetime."""
     global _cached_sbert_model
     if _cached_sbert_model is None:
-        try:
-            from sentence_transformers import SentenceTransformer  # type: ignore[import]
-            logger.info(f"Loading SBERT model: {model_name}")
-            _cached_sbert_model = SentenceTransformer(model_name)
-            logger.info("SBERT model loaded and cached")
-        except Exception as e:
-            logger.warning(f"SBERT unavailable ({type(e).__name__}: {e}) — falling back to TF-IDF only")
+        from config import Config
+        chain = [b.strip() for b in getattr(Config, "EMBEDDING_BACKENDS", "sbert").split(",") if b.strip()]
+        for name in chain:
+            try:
+                _cached_sbert_model = load_embedding_backend(name, model_name)
+                break
+            except Exception as e:
+                logger.warning(f"Embedding backend '{name}' unavailable ({type(e).__name__}: {e})")
+        else:
+            logger.warning(f"No embedding backend available ({', '.join(chain)}) — falling back to TF-IDF only")
     return _cached_sbert_model
 
 
@@ -61,6 +293,33 @@ def preprocess_text(text: str) -> str:
     return " ".join(tokens)
 
 
+def _to_str(val) -> str:
+    if isinstance(val, list):
+        return " ".join(str(v) for v in val if v)
+    return str(val) if val else ""
+
+
+def normalize_words(text: str) -> set:
+    """Loose word set used by match explanations (keeps tokens longer than 2 chars)."""
+    return {
+        w.lower().strip(".,;:()[]\"'")
+        for w in re.split(r"[\s,/|+\-]+", text)
+        if len(w) > 2
+    }
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first — O(n + k log k) via argpartition."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.shape[0]:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.shape[0])
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
 # ─────────────────────────────────────────────
 # TF-IDF MODULE
 # ─────────────────────────────────────────────
@@ -77,22 +336,49 @@ class TFIDFMatcher:
             analyzer="word",
         )
         self.corpus_matrix = None
+        self.vocabulary: Dict[str, int] = {}
+        self.fit_id = 0
         self.fitted = False
 
     def fit(self, corpus: List[str]) -> "TFIDFMatcher":
         processed = [preprocess_text(t) for t in corpus]
         self.corpus_matrix = self.vectorizer.fit_transform(processed)
+        self.vocabulary: Dict[str, int] = self.vectorizer.vocabulary_
+        self.fit_id = next(_fit_ids)
         self.fitted = True
         logger.info(f"TF-IDF fitted on {len(corpus)} documents")
         return self
 
+    def append(self, text: str) -> None:
+        """Add one document using the already-fitted vocabulary and IDF weights."""
+        if not self.fitted:
+            raise RuntimeError("Call fit() before append()")
+        row = self.vectorizer.transform([preprocess_text(text)])
+        self.corpus_matrix = sparse.vstack([self.corpus_matrix, row], format="csr")
+
     def score(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        scores = self.score_vector(query)
+        return [(int(i), float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+    def transform_query(self, query: str):
+        """Sparse TF-IDF row for a query (valid until the next fit())."""
         if not self.fitted:
             raise RuntimeError("Call fit() before score()")
-        q_vec = self.vectorizer.transform([preprocess_text(query)])
-        scores = cosine_similarity(q_vec, self.corpus_matrix).flatten()
-        top_indices = np.argsort(scores)[::-1][:top_k]
-        return [(int(i), float(scores[i])) for i in top_indices]
+        return self.vectorizer.transform([preprocess_text(query)])
+
+    def score_vector(self, query: str, q_vec=None) -> np.ndarray:
+        """Cosine similarity of the query (or its precomputed row) against every corpus row."""
+        if q_vec is None:
+            q_vec = self.transform_query(query)
+        return cosine_similarity(q_vec, self.corpus_matrix).ravel()
+
+    def score_many(self, queries: List[str]) -> np.ndarray:
+        """Dense (len(queries) × corpus) cosine matrix from one sparse matmul."""
+        if not self.fitted:
+            raise RuntimeError("Call fit() before score_many()")
+        q_mat = self.vectorizer.transform([preprocess_text(q) for q in queries])
+        # Rows are L2-normalised by the vectorizer, so the dot product is the cosine
+        return (q_mat @ self.corpus_matrix.T).toarray()
 
 
 # ─────────────────────────────────────────────
@@ -104,42 +390,172 @@ class TransformerMatcher:
 
     DEFAULT_MODEL = "all-MiniLM-L6-v2"
 
-    def __init__(self, model_name: str = DEFAULT_MODEL):
-        self.corpus_embeddings: Optional[np.ndarray] = None
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        model=None,
+        ann_min_rows: int = 0,
+        ann_n_probe: int = 8,
+        embedding_dtype: str = "float32",
+    ):
+        """
+        `model` overrides the shared embedding backend (anything with SentenceTransformer.encode's signature).
+        With ann_min_rows > 0, corpora of at least that many rows are searched through an
+        IVF index (app/matching/ann.py) probing ann_n_probe lists instead of exactly.
+        embedding_dtype "float16" / "int8" keeps corpus_embeddings as a QuantizedMatrix
+        (app/matching/quantize.py) instead of float32.
+        """
+        from app.matching.quantize import EMBEDDING_DTYPES
+
+        if embedding_dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"embedding_dtype must be one of {EMBEDDING_DTYPES}")
+        self.corpus_embeddings = None   # float32 ndarray or QuantizedMatrix
         self.model_name = model_name
-        cached = _get_sbert_model(model_name)
+        self.ann_min_rows = ann_min_rows
+        self.ann_n_probe = ann_n_probe
+        self.embedding_dtype = embedding_dtype
+        self.ann = None
+        cached = model if model is not None else _get_sbert_model(model_name)
         if cached is not None:
             self.model = cached
             self.available = True
         else:
-            logger.warning("sentence-transformers not installed — SBERT disabled, TF-IDF only")
+            logger.warning("No embedding backend — SBERT disabled, TF-IDF only")
             self.model = None
             self.available = False
+        # Embedding/query caches are per backend: ONNX or static vectors differ from SBERT's
+        self.cache_name = getattr(self.model, "cache_key", model_name)
 
     def encode_corpus(self, corpus: List[str], batch_size: int = 32) -> "TransformerMatcher":
+        from app.matching.quantize import quantize
+
         if not self.available:
             return self
-        logger.info(f"Encoding {len(corpus)} documents with SBERT...")
-        self.corpus_embeddings = self.model.encode(
-            corpus,
-            batch_size=batch_size,
-            show_progress_bar=False,
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-        )
+        embeddings = self._encode_cached(corpus, batch_size, compact=True)
+        self.ann = None
+        if self.ann_min_rows and len(corpus) >= self.ann_min_rows:
+            from app.matching.ann import IVFIndex
+            self.ann = IVFIndex(n_probe=self.ann_n_probe).build(embeddings)
+        self.corpus_embeddings = quantize(embeddings, self.embedding_dtype)
         return self
 
-    def score(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+    def _encode_cached(self, texts: List[str], batch_size: int = 32, compact: bool = False) -> np.ndarray:
+        """
+        Encode texts, reusing rows from the on-disk embedding store when possible.
+        compact=True (a full corpus fit) lets the store drop rows of texts no longer in it.
+        """
+        from app.matching.embedding_store import get_embedding_store
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        store = get_embedding_store(self.cache_name)
+        if store is None:
+            keys, cached, missing = [], {}, list(range(len(texts)))
+        else:
+            keys = [store.key(t) for t in texts]
+            cached = store.get_many(keys)
+            missing = [i for i, k in enumerate(keys) if k not in cached]
+
+        encoded = None
+        if missing:
+            logger.info(f"Encoding {len(missing)} of {len(texts)} documents with SBERT...")
+            encoded = self.model.encode(
+                [texts[i] for i in missing],
+                batch_size=batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            ).astype(np.float32)
+            if store is not None:
+                try:
+                    store.put_many([keys[i] for i in missing], encoded)
+                except OSError as e:
+                    logger.warning(f"Could not persist embeddings: {e}")
+        if store is not None and compact:
+            try:
+                store.maybe_compact(keys)
+            except OSError as e:
+                logger.warning(f"Could not compact embedding store: {e}")
+        if len(missing) == len(texts):
+            return encoded
+
+        embeddings = np.empty((len(texts), next(iter(cached.values())).shape[0]), dtype=np.float32)
+        for i, k in enumerate(keys):
+            if k in cached:
+                embeddings[i] = cached[k]
+        if encoded is not None:
+            embeddings[missing] = encoded
+        return embeddings
+
+    def append(self, text: str) -> None:
+        """Encode one document and add it as the last corpus row."""
         if not self.available or self.corpus_embeddings is None:
+            return
+        from app.matching.quantize import append_rows
+
+        emb = self._encode_cached([text])
+        self.corpus_embeddings = append_rows(self.corpus_embeddings, emb)
+        if self.ann is not None:
+            self.ann.add(emb)
+
+    def score(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        if self.ann is not None and self.corpus_embeddings is not None:
+            rows, scores = self.ann.search(self._encode_query(query), self.corpus_embeddings, top_k)
+            return [(int(i), float(s)) for i, s in zip(rows, scores)]
+        scores = self.score_vector(query)
+        if scores is None:
             return []
-        q_emb = self.model.encode(
+        return [(int(i), float(scores[i])) for i in top_k_indices(scores, top_k)]
+
+    def score_vector(
+        self,
+        query: str,
+        rows: Optional[np.ndarray] = None,
+        q_emb: Optional[np.ndarray] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Cosine similarity of the query against every corpus row (None if SBERT is off).
+        With an ANN index only the probed candidate rows are scored; the rest are 0.
+        Passing `rows` scores exactly those rows (e.g. a pre-filter) and leaves the rest at 0.
+        `q_emb` skips encoding when the query embedding is already known.
+        """
+        if not self.available or self.corpus_embeddings is None:
+            return None
+        if q_emb is None:
+            q_emb = self._encode_query(query)
+        if rows is None and self.ann is None:
+            return self.corpus_embeddings @ q_emb
+        if rows is None:
+            rows = self.ann.candidates(q_emb)
+            # The IVF lists are shared with snapshots and may hold newer rows
+            rows = rows[rows < self.corpus_embeddings.shape[0]]
+        scores = np.zeros(self.corpus_embeddings.shape[0], dtype=self.corpus_embeddings.dtype)
+        scores[rows] = self.corpus_embeddings[rows] @ q_emb
+        return scores
+
+    def encode_query(self, query: str) -> Optional[np.ndarray]:
+        """Normalised query embedding (None if SBERT is off)."""
+        return self._encode_query(query) if self.available else None
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        return self.model.encode(
             [preprocess_text(query)],
             convert_to_numpy=True,
             normalize_embeddings=True,
+        )[0]
+
+    def score_many(self, queries: List[str], batch_size: int = 64) -> Optional[np.ndarray]:
+        """Encode all queries in SBERT batches and score them with one matmul."""
+        if not self.available or self.corpus_embeddings is None:
+            return None
+        q_emb = self.model.encode(
+            [preprocess_text(q) for q in queries],
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
         )
-        scores = (q_emb @ self.corpus_embeddings.T).flatten()
-        top_indices = np.argsort(scores)[::-1][:top_k]
-        return [(int(i), float(scores[i])) for i in top_indices]
+        return (self.corpus_embeddings @ q_emb.T).T
 
 
 # ─────────────────────────────────────────────
@@ -150,7 +566,7 @@ class HybridMatcher:
     """
     Combines TF-IDF (lexical) and SBERT (semantic) scores via weighted fusion.
     Default: 30% TF-IDF + 70% SBERT.
-    Falls back to 100% TF-IDF if sentence-transformers is unavailable.
+    Falls back to 100% TF-IDF if no embedding backend is available.
     """
 
     def __init__(
@@ -158,12 +574,27 @@ class HybridMatcher:
         tfidf_weight: float = 0.3,
         transformer_weight: float = 0.7,
         transformer_model: str = TransformerMatcher.DEFAULT_MODEL,
+        ann_min_rows: int = 0,
+        ann_n_probe: int = 8,
+        max_features: int = 10000,
+        ngram_range: Tuple = (1, 2),
+        embedding_dtype: str = "float32",
     ):
         self.tfidf_weight = tfidf_weight
         self.transformer_weight = transformer_weight
-        self.tfidf = TFIDFMatcher()
-        self.transformer = TransformerMatcher(transformer_model)
+        self.tfidf = TFIDFMatcher(max_features=max_features, ngram_range=ngram_range)
+        self.transformer = TransformerMatcher(
+            transformer_model,
+            ann_min_rows=ann_min_rows,
+            ann_n_probe=ann_n_probe,
+            embedding_dtype=embedding_dtype,
+        )
         self.internships: List[Dict] = []
+        self._tokens: List[Dict] = []   # per-row token sets for _explain_match
+        self._alive = np.zeros(0, dtype=bool)
+        self._row_of: Dict = {}
+        self._facets: Dict[str, Dict[str, List[int]]] = {}   # facet -> value -> rows
+        self._changes_since_fit = 0
         self.fitted = False
 
         if not self.transformer.available:
@@ -172,104 +603,319 @@ class HybridMatcher:
 
     def fit(self, internships: List[Dict]) -> "HybridMatcher":
         """Fit on internship corpus. Each dict needs: id, title, description, skills, requirements."""
-        self.internships = internships
-        corpus = [
-            (i.get("description", "") + " " +
-             i.get("title", "") + " " +
-             i.get("skills", "") + " " +
-             i.get("requirements", ""))
-            for i in internships
-        ]
+        self.internships = list(internships)
+        corpus = [self._internship_text(i) for i in self.internships]
         self.tfidf.fit(corpus)
         if self.transformer.available:
             self.transformer.encode_corpus(corpus)
+        self._tokens = [self._internship_tokens(i) for i in self.internships]
+        self._alive = np.ones(len(self.internships), dtype=bool)
+        self._row_of = {i.get("id"): row for row, i in enumerate(self.internships)}
+        self._facets = {facet: {} for facet in self.FILTER_FACETS}
+        for row, internship in enumerate(self.internships):
+            self._index_facets(row, internship)
+        self._changes_since_fit = 0
         self.fitted = True
         logger.info(f"HybridMatcher fitted on {len(internships)} internships")
         return self
 
-    def match(self, student_profile: Dict, top_k: int = 10) -> List[Dict]:
+    # ── Incremental updates ──────────────────────────────────────────────────
+    # Rows are append-only: an update retires the old row and appends a new one,
+    # a removal only retires the row. Retired rows are masked out of match()
+    # and dropped on the next full fit().
+
+    def upsert(self, internship: Dict) -> None:
+        """Add a new internship or replace an existing one (matched by id)."""
+        if not self.fitted:
+            raise RuntimeError("Call fit() before upsert()")
+        self.remove(internship.get("id"))
+        text = self._internship_text(internship)
+        self.tfidf.append(text)
+        if self.transformer.available:
+            self.transformer.append(text)
+        self._row_of[internship.get("id")] = len(self.internships)
+        self._index_facets(len(self.internships), internship)
+        self.internships.append(internship)
+        self._tokens.append(self._internship_tokens(internship))
+        self._alive = np.append(self._alive, True)
+        self._changes_since_fit += 1
+
+    def remove(self, internship_id) -> bool:
+        """Retire the row for internship_id. Returns False if it was not indexed."""
+        row = self._row_of.pop(internship_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._changes_since_fit += 1
+        return True
+
+    def snapshot(self) -> "HybridMatcher":
+        """
+        Copy of the current rows that match() can use while upserts continue.
+        Rows only ever get appended and the engines rebind (never resize) their
+        matrices, so sharing everything except the alive mask and the engine
+        objects is enough; lists and facet postings just grow past the copy.
+        """
+        view = copy.copy(self)
+        view.tfidf = copy.copy(self.tfidf)
+        view.transformer = copy.copy(self.transformer)
+        view._alive = self._alive.copy()
+        return view
+
+    def __contains__(self, internship_id) -> bool:
+        return internship_id in self._row_of
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    @property
+    def live_rows(self) -> int:
+        """Rows match() can return; unlike len(), exact for a snapshot() too."""
+        return int(np.count_nonzero(self._alive))
+
+    @property
+    def staleness(self) -> float:
+        """Share of rows touched since fit(); IDF weights drift as this grows."""
+        return self._changes_since_fit / max(len(self._row_of), 1)
+
+    # ── Pre-filters ──────────────────────────────────────────────────────────
+    # Each facet value maps to the rows carrying it, so a filter becomes a boolean
+    # mask over the score vector *before* top-k instead of a post-filter that
+    # can leave fewer than top_k results. Matching is case-insensitive; `skills`
+    # matches any whitespace-separated token of the internship's skills field.
+
+    FILTER_FACETS = ("major", "location", "skills")
+
+    @staticmethod
+    def _facet_values(facet: str, value) -> List[str]:
+        if facet == "skills":
+            return [w.lower() for w in _to_str(value).split()]
+        value = str(value or "").strip().lower()
+        return [value] if value else []
+
+    def _index_facets(self, row: int, internship: Dict) -> None:
+        for facet in self.FILTER_FACETS:
+            for value in set(self._facet_values(facet, internship.get(facet, ""))):
+                self._facets[facet].setdefault(value, []).append(row)
+
+    def filter_mask(self, filters: Optional[Dict] = None) -> np.ndarray:
+        """
+        Boolean mask of live rows passing every filter.
+        filters: {"major": str | [str], "location": str | [str], "skills": [str]};
+        a list means "any of these". Unknown keys are ignored.
+        """
+        mask = self._alive.copy()
+        n_rows = len(mask)   # a snapshot() may see postings for rows added after it
+        for facet in self.FILTER_FACETS:
+            wanted = (filters or {}).get(facet)
+            if not wanted:
+                continue
+            facet_mask = np.zeros(n_rows, dtype=bool)
+            for value in wanted if isinstance(wanted, (list, tuple, set)) else [wanted]:
+                for v in self._facet_values(facet, value):
+                    rows = np.asarray(self._facets[facet].get(v, []), dtype=np.intp)
+                    facet_mask[rows[rows < n_rows]] = True
+            mask &= facet_mask
+        return mask
+
+    @staticmethod
+    def _internship_text(internship: Dict) -> str:
+        return (
+            internship.get("description", "") + " " +
+            internship.get("title", "") + " " +
+            internship.get("skills", "") + " " +
+            internship.get("requirements", "")
+        )
+
+    def match(
+        self,
+        student_profile: Dict,
+        top_k: int = 10,
+        filters: Optional[Dict] = None,
+        min_score: Optional[float] = None,
+        cache_owner=None,
+    ) -> List[Dict]:
         """
         Match a student profile against all internships.
         Uses: skills, interests, bio, major, courses, projects from student_profile.
         Returns top_k internships ranked by match score (0-100).
+        `filters` (see filter_mask) and `min_score` (0-100) are applied before
+        top-k, so top_k qualifying results are returned whenever they exist.
+        Encoded queries are reused from the query cache; `cache_owner` (the
+        student id) lets invalidate_student_query() drop them on profile edits.
         """
         if not self.fitted:
             raise RuntimeError("Call fit() before match()")
 
         query = self._build_student_query(student_profile)
         logger.info(f"Student query built: {query[:200]}...")
+        student_tokens = self._student_tokens(student_profile, query)
 
-        tfidf_scores = dict(self.tfidf.score(query, top_k=len(self.internships)))
-        sbert_scores = dict(self.transformer.score(query, top_k=len(self.internships))) if self.transformer.available else {}
+        mask = self.filter_mask(filters) if filters else self._alive
+        candidates = np.flatnonzero(mask) if filters else None
+        if candidates is not None and len(candidates) == 0:
+            return []
 
-        all_indices = set(tfidf_scores) | set(sbert_scores)
-        fused = {
-            idx: self.tfidf_weight * tfidf_scores.get(idx, 0.0) +
-                 self.transformer_weight * sbert_scores.get(idx, 0.0)
-            for idx in all_indices
-        }
+        # Both engines return full score vectors; fuse with one weighted add
+        # and pull only the top_k rows instead of sorting every internship.
+        # A pre-filter restricts SBERT to the qualifying rows (exact, no ANN).
+        q_vec, q_emb = self._query_vectors(query, cache_owner)
+        tfidf_scores = self.tfidf.score_vector(query, q_vec=q_vec)
+        sbert_scores = self.transformer.score_vector(query, rows=candidates, q_emb=q_emb) \
+            if self.transformer.available else None
 
-        ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:top_k]
+        fused = self.tfidf_weight * tfidf_scores
+        if sbert_scores is not None:
+            fused += self.transformer_weight * sbert_scores
+        if min_score is not None:
+            mask = mask & (np.round(fused * 100, 2) >= min_score)
+        fused[~mask] = -np.inf
+
+        ranked = top_k_indices(fused, min(top_k, int(np.count_nonzero(mask))))
 
         results = []
-        for rank, (idx, score) in enumerate(ranked, 1):
+        for rank, idx in enumerate(ranked, 1):
             internship = self.internships[idx].copy()
-            tfidf_pct = round(tfidf_scores.get(idx, 0.0) * 100, 2)
-            sbert_pct = round(sbert_scores.get(idx, 0.0) * 100, 2)
-            internship["match_score"] = round(score * 100, 2)
+            tfidf_pct = round(float(tfidf_scores[idx]) * 100, 2)
+            sbert_pct = round(float(sbert_scores[idx]) * 100, 2) if sbert_scores is not None else 0.0
+            internship["match_score"] = round(float(fused[idx]) * 100, 2)
             internship["match_rank"] = rank
             internship["tfidf_score"] = tfidf_pct
             internship["sbert_score"] = sbert_pct
-            internship["explanation"] = self._explain_match(student_profile, idx, tfidf_pct, sbert_pct)
+            internship["explanation"] = self._explain_match(student_tokens, int(idx), tfidf_pct, sbert_pct)
             results.append(internship)
 
         return results
 
-    def _explain_match(self, student_profile: Dict, intern_idx: int, tfidf_score: float, sbert_score: float) -> Dict:
+    def _query_vectors(self, query: str, owner=None) -> Tuple:
+        """(TF-IDF row, SBERT embedding) for a query, encoded at most once per profile text."""
+        from app.matching.query_cache import get_query_cache
+
+        cache = get_query_cache()
+        key = cache.key(query)
+        q_vec = cache.get(key, "tfidf", self.tfidf.fit_id)
+        if q_vec is None:
+            q_vec = self.tfidf.transform_query(query)
+            cache.put(key, "tfidf", self.tfidf.fit_id, q_vec, owner=owner)
+
+        q_emb = None
+        if self.transformer.available:
+            q_emb = cache.get(key, "sbert", self.transformer.cache_name)
+            if q_emb is None:
+                q_emb = self.transformer.encode_query(query)
+                cache.put(key, "sbert", self.transformer.cache_name, q_emb, owner=owner)
+        return q_vec, q_emb
+
+    def match_batch(
+        self,
+        student_profiles: List[Dict],
+        top_k: int = 10,
+        chunk_size: int = 256,
+        explain: bool = False,
+    ) -> List[List[Dict]]:
         """
-        Generate XAI explanation for why a specific internship was recommended.
-        Returns matched skills, interests, major alignment, top TF-IDF keywords, and human-readable reasons.
+        Match many student profiles at once.
+        Scores each chunk of students with one TF-IDF and one SBERT matmul,
+        then takes the top_k per student with argpartition instead of a full sort.
+        Returns one result list per profile (same order); each result holds
+        id, match_score, match_rank, tfidf_score, sbert_score (0-100) and,
+        with explain=True, the XAI explanation.
         """
-        def to_str(val):
-            if isinstance(val, list):
-                return " ".join(str(v) for v in val if v)
-            return str(val) if val else ""
-
-        def normalize_words(text: str) -> set:
-            return {
-                w.lower().strip(".,;:()[]\"'")
-                for w in re.split(r"[\s,/|+\-]+", text)
-                if len(w) > 2
-            }
-
-        internship = self.internships[intern_idx]
-
-        # ── Student tokens ────────────────────────────────────────────────────
-        student_skill_words = normalize_words(to_str(student_profile.get("skills", "")))
-        student_interest_words = normalize_words(to_str(student_profile.get("interests", "")))
-        student_major = str(student_profile.get("major", "")).lower().strip()
-
-        # ── Internship tokens ─────────────────────────────────────────────────
-        intern_skills_text = internship.get("skills", "") + " " + internship.get("requirements", "")
-        intern_skill_words = normalize_words(intern_skills_text)
-        intern_full_text = (
+        if not self.fitted:
+            raise RuntimeError("Call fit() before match_batch()")
+
+        n_rows = len(self._alive)   # not len(self.internships): a snapshot's list keeps growing
+        k = min(top_k, self.live_rows)
+        all_results: List[List[Dict]] = []
+        if k <= 0:
+            return [[] for _ in student_profiles]
+
+        for start in range(0, len(student_profiles), chunk_size):
+            profiles = student_profiles[start:start + chunk_size]
+            queries = [self._build_student_query(p) for p in profiles]
+
+            tfidf = self.tfidf.score_many(queries)
+            sbert = self.transformer.score_many(queries) if self.transformer.available else None
+            fused = self.tfidf_weight * tfidf
+            if sbert is not None:
+                fused += self.transformer_weight * sbert
+            fused[:, ~self._alive] = -np.inf
+
+            top = np.argpartition(-fused, k - 1, axis=1)[:, :k] if k < n_rows else \
+                np.tile(np.arange(n_rows), (len(profiles), 1))
+            order = np.argsort(-np.take_along_axis(fused, top, axis=1), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+
+            for row, profile in enumerate(profiles):
+                student_tokens = self._student_tokens(profile, queries[row]) if explain else None
+                results = []
+                for rank, idx in enumerate(top[row], 1):
+                    if not self._alive[idx]:
+                        continue
+                    tfidf_pct = round(float(tfidf[row, idx]) * 100, 2)
+                    sbert_pct = round(float(sbert[row, idx]) * 100, 2) if sbert is not None else 0.0
+                    result = {
+                        "id": self.internships[idx].get("id"),
+                        "match_score": round(float(fused[row, idx]) * 100, 2),
+                        "match_rank": rank,
+                        "tfidf_score": tfidf_pct,
+                        "sbert_score": sbert_pct,
+                    }
+                    if explain:
+                        result["explanation"] = self._explain_match(student_tokens, int(idx), tfidf_pct, sbert_pct)
+                    results.append(result)
+                all_results.append(results)
+
+        return all_results
+
+    @staticmethod
+    def _internship_tokens(internship: Dict) -> Dict:
+        """Precompute (once per row) everything _explain_match reads from an internship."""
+        skills_text = internship.get("skills", "") + " " + internship.get("requirements", "")
+        full_text = (
             internship.get("title", "") + " " +
             internship.get("description", "") + " " +
-            intern_skills_text
+            skills_text
         )
-        intern_full_words = normalize_words(intern_full_text)
-        intern_major = str(internship.get("major", "")).lower().strip()
+        return {
+            "skill_words": normalize_words(skills_text),
+            "full_words": normalize_words(full_text),
+            "full_text": full_text.lower(),
+            "terms": set(preprocess_text(full_text).split()),
+            "major": str(internship.get("major", "")).lower().strip(),
+        }
+
+    @staticmethod
+    def _student_tokens(student_profile: Dict, query: str) -> Dict:
+        """Precompute (once per match() call) everything _explain_match reads from a student."""
+        return {
+            "skill_words": normalize_words(_to_str(student_profile.get("skills", ""))),
+            "interest_words": normalize_words(_to_str(student_profile.get("interests", ""))),
+            "major": str(student_profile.get("major", "")).lower().strip(),
+            "terms": set(preprocess_text(query).split()),
+        }
+
+    def _explain_match(self, student: Dict, intern_idx: int, tfidf_score: float, sbert_score: float) -> Dict:
+        """
+        Generate XAI explanation for why a specific internship was recommended.
+        `student` comes from _student_tokens(); internship tokens are cached at fit time,
+        so this is set intersections only.
+        Returns matched skills, interests, major alignment, top TF-IDF keywords, and human-readable reasons.
+        """
+        intern = self._tokens[intern_idx]
+        student_major = student["major"]
+        intern_major = intern["major"]
 
         # 1. Matched skills (student skills ∩ internship skills/requirements)
-        matched_skills = sorted(student_skill_words & intern_skill_words)[:6]
+        matched_skills = sorted(student["skill_words"] & intern["skill_words"])[:6]
 
         # 2. Matched interests (student interests ∩ full internship text)
-        matched_interests = sorted(student_interest_words & intern_full_words)[:4]
+        matched_interests = sorted(student["interest_words"] & intern["full_words"])[:4]
 
         # 3. Major alignment
         major_match = bool(
             student_major and (
-                student_major in intern_full_text.lower() or
+                student_major in intern["full_text"] or
                 (intern_major and (student_major in intern_major or intern_major in student_major))
             )
         )
@@ -277,18 +923,12 @@ class HybridMatcher:
         # 4. Top shared TF-IDF vocabulary terms
         top_keywords: List[str] = []
         if self.tfidf.fitted:
-            query = self._build_student_query(student_profile)
-            query_terms = set(preprocess_text(query).split())
-            intern_terms = set(preprocess_text(intern_full_text).split())
-            overlap = query_terms & intern_terms
-            try:
-                vocab = set(self.tfidf.vectorizer.get_feature_names_out().tolist())
-                top_keywords = sorted(
-                    [t for t in overlap if t in vocab],
-                    key=len, reverse=True
-                )[:6]
-            except Exception:
-                top_keywords = sorted(overlap, key=len, reverse=True)[:6]
+            overlap = student["terms"] & intern["terms"]
+            vocab = self.tfidf.vocabulary
+            top_keywords = sorted(
+                [t for t in overlap if t in vocab],
+                key=len, reverse=True
+            )[:6]
 
         # 5. Human-readable reasons
         reasons: List[str] = []
@@ -315,19 +955,14 @@ class HybridMatcher:
 
     def _build_student_query(self, profile: Dict) -> str:
         """Build a rich query string from all student profile fields."""
-        def to_str(val):
-            if isinstance(val, list):
-                return " ".join(str(v) for v in val if v)
-            return str(val) if val else ""
-
         parts = [
-            to_str(profile.get("skills", "")),
-            to_str(profile.get("interests", "")),
-            to_str(profile.get("bio", "")),
-            to_str(profile.get("major", "")),
-            to_str(profile.get("courses", "")),
-            to_str(profile.get("projects", "")),
-            to_str(profile.get("cv_text", "")),
+            _to_str(profile.get("skills", "")),
+            _to_str(profile.get("interests", "")),
+            _to_str(profile.get("bio", "")),
+            _to_str(profile.get("major", "")),
+            _to_str(profile.get("courses", "")),
+            _to_str(profile.get("projects", "")),
+            _to_str(profile.get("cv_text", "")),
         ]
         return " ".join(p for p in parts if p)
 
@@ -342,7 +977,12 @@ def get_matcher() -> HybridMatcher:
     """Return global HybridMatcher (creates once, reuses)."""
     global _matcher_instance
     if _matcher_instance is None:
-        _matcher_instance = HybridMatcher()
+        from config import Config
+        _matcher_instance = HybridMatcher(
+            ann_min_rows=getattr(Config, "MATCHING_ANN_MIN_ROWS", 0),
+            ann_n_probe=getattr(Config, "MATCHING_ANN_NPROBE", 8),
+            embedding_dtype=getattr(Config, "MATCHING_EMBEDDING_DTYPE", "float32"),
+        )
     return _matcher_instance
 
 def reset_matcher():
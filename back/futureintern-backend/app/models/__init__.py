@@ -3,7 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 from .user import User
-from .intern import Internship
+from .intern import Internship, InternshipFacetCount
 from .application import Application
 from .points import PointsTransaction, PointsPackage, ServicePricing
 from .pending_registration import PendingRegistration
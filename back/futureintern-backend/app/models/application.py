@@ -22,6 +22,9 @@ class Application(db.Model):
     # Unique constraint: student can apply only once per internship
     __table_args__ = (
         db.UniqueConstraint('student_id', 'internship_id', name='unique_student_internship'),
+        # student_id lookups use the unique constraint's index
+        db.Index('ix_applications_internship_status', 'internship_id', 'status'),
+        db.Index('ix_applications_status', 'status'),
     )
     
     # Relationships
@@ -3,6 +3,22 @@ from datetime import datetime
 
 import re
 
+_NUMBERED_TITLE = re.compile(r'^\d+\.\s*')
+
+
+def clean_title(title):
+    """Title without a leading list number ("1. title" -> "title")."""
+    return _NUMBERED_TITLE.sub('', title) if title else ''
+
+
+def derive_work_type(location, duration):
+    if location and 'remote' in location.lower():
+        return 'Remote'
+    if duration and 'part' in duration.lower():
+        return 'Part-time'
+    return 'Full-time'
+
+
 class Internship(db.Model):
     __tablename__ = 'internships'
     
@@ -10,16 +26,20 @@ class Internship(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     requirements = db.Column(db.Text)
-    location = db.Column(db.String(200))
+    location = db.Column(db.String(200), index=True)
     duration = db.Column(db.String(100))  # e.g., "3 months", "6 weeks"
-    stipend = db.Column(db.String(100))  # e.g., "Paid", "Unpaid", "5000 EGP/month"
+    stipend = db.Column(db.String(100), index=True)  # e.g., "Paid", "Unpaid", "5000 EGP/month"
     application_deadline = db.Column(db.Date)
     start_date = db.Column(db.Date)
     
     # Matching fields
-    major = db.Column(db.String(100)) # e.g. "Computer Science"
+    major = db.Column(db.String(100), index=True) # e.g. "Computer Science"
     required_skills = db.Column(db.Text) # JSON string of skills e.g. ["Python", "React"]
     
+    # Derived on write (see _set_display_fields) so listings don't recompute them per row
+    display_title = db.Column(db.String(200))
+    work_type = db.Column(db.String(20), index=True)  # Remote / Part-time / Full-time
+
     # Application link
     application_link = db.Column(db.String(500))  # External application form URL
     
@@ -31,50 +51,115 @@ class Internship(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Composite indexes for the hot filters (see tests/test_query_plans.py)
+    __table_args__ = (
+        db.Index('ix_internships_active_id', 'is_active', 'id'),                     # listing, keyset pages
+        db.Index('ix_internships_active_deadline', 'is_active', 'application_deadline'),  # expiry job
+        db.Index('ix_internships_deadline', 'application_deadline'),                 # /expired
+        db.Index('ix_internships_active_updated', 'is_active', 'updated_at'),        # index sync signature
+        db.Index('ix_internships_company_active', 'company_id', 'is_active'),        # company dashboards
+        db.Index('ix_internships_major_active', 'major', 'is_active'),               # ?major= facet filter
+    )
+
     # Relationships
     company = db.relationship('User', backref='internships', foreign_keys=[company_id])
     
-    def to_dict(self, include_company=True):
-        """Convert internship to dictionary"""
-        # Clean title by removing leading numbers (e.g. "1. title" -> "title")
-        clean_title = re.sub(r'^\d+\.\s*', '', self.title) if self.title else ''
-        
-        internship_dict = {
-            'id': self.id,
-            'title': clean_title,
-            'description': self.description,
-            'requirements': self.requirements,
-            'location': self.location,
-            'duration': self.duration,
-            'stipend': self.stipend,
-            'type': 'Remote' if (self.location and 'remote' in self.location.lower()) else ('Part-time' if (self.duration and 'part' in self.duration.lower()) else 'Full-time'),
-            'application_deadline': self.application_deadline.isoformat() if self.application_deadline else None,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'is_active': self.is_active,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'major': self.major,
-            'required_skills': self.required_skills,
-            'application_link': self.application_link
+    # Listing projection (?fields=): field -> columns it reads
+    FIELD_COLUMNS = {
+        'id': ('id',),
+        'title': ('title', 'display_title'),
+        'description': ('description',),
+        'requirements': ('requirements',),
+        'location': ('location',),
+        'duration': ('duration',),
+        'stipend': ('stipend',),
+        'type': ('work_type', 'location', 'duration'),
+        'application_deadline': ('application_deadline',),
+        'start_date': ('start_date',),
+        'is_active': ('is_active',),
+        'created_at': ('created_at',),
+        'updated_at': ('updated_at',),
+        'major': ('major',),
+        'required_skills': ('required_skills',),
+        'application_link': ('application_link',),
+        'company': ('company_id',),
+    }
+
+    def refresh_display_fields(self):
+        self.display_title = clean_title(self.title)
+        self.work_type = derive_work_type(self.location, self.duration)
+
+    def _field(self, name):
+        if name == 'title':
+            return self.display_title if self.display_title is not None else clean_title(self.title)
+        if name == 'type':
+            return self.work_type or derive_work_type(self.location, self.duration)
+        if name in ('application_deadline', 'start_date', 'created_at', 'updated_at'):
+            value = getattr(self, name)
+            return value.isoformat() if value else None
+        return getattr(self, name)
+
+    def _company_dict(self):
+        if self.company:
+            company_name = self.company.company_name or self.company.name or ''
+            return {
+                'id': self.company.id,
+                'name': company_name,
+                'location': self.company.company_location or '',
+                'profile_image': self.company.profile_image
+            }
+        return {
+            'id': self.company_id,
+            'name': '',
+            'location': ''
         }
-        
+
+    def to_dict(self, include_company=True, fields=None):
+        """Convert internship to dictionary (only `fields`, when given — see FIELD_COLUMNS)"""
+        if fields is not None:
+            return {f: self._company_dict() if f == 'company' else self._field(f) for f in fields}
+
+        internship_dict = {f: self._field(f) for f in self.FIELD_COLUMNS if f != 'company'}
         if include_company:
-            if self.company:
-                company_name = self.company.company_name or self.company.name or ''
-                internship_dict['company'] = {
-                    'id': self.company.id,
-                    'name': company_name,
-                    'location': self.company.company_location or '',
-                    'profile_image': self.company.profile_image
-                }
-            else:
-                internship_dict['company'] = {
-                    'id': self.company_id,
-                    'name': '',
-                    'location': ''
-                }
+            internship_dict['company'] = self._company_dict()
         else:
             internship_dict['company_id'] = self.company_id
-            
+
         return internship_dict
+
+
+class InternshipFacetCount(db.Model):
+    """Active internships per facet value, maintained by DB triggers (app/internships/facets.py)."""
+    __tablename__ = 'internship_facets'
+
+    facet = db.Column(db.String(20), primary_key=True)    # location / major / type / stipend / company
+    value = db.Column(db.String(200), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+@db.event.listens_for(Internship, 'before_insert')
+@db.event.listens_for(Internship, 'before_update')
+def _set_display_fields(mapper, connection, target):
+    target.refresh_display_fields()
+
+
+def backfill_display_fields(batch_size=500):
+    """Fill display_title / work_type for rows written before those columns existed."""
+    table = Internship.__table__
+    filled = 0
+    while True:
+        rows = db.session.query(Internship.id, Internship.title, Internship.location, Internship.duration)\
+            .filter(Internship.display_title.is_(None)).limit(batch_size).all()
+        if not rows:
+            return filled
+        for row in rows:
+            # Core UPDATE keeping updated_at, so the backfill doesn't look like an edit
+            db.session.execute(
+                table.update().where(table.c.id == row.id).values(
+                    display_title=clean_title(row.title),
+                    work_type=derive_work_type(row.location, row.duration),
+                    updated_at=table.c.updated_at,
+                )
+            )
+        db.session.commit()
+        filled += len(rows)
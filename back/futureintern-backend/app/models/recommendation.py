@@ -0,0 +1,40 @@
+"""
+Precomputed Recommendation Results
+Written by the batch matching job (app/matching/batch.py) so that most
+/api/recommendations calls can be served from storage instead of running
+the matcher. One row per (student, recommended internship).
+"""
+from app.models import db
+from datetime import datetime
+import json
+
+
+class RecommendationResult(db.Model):
+    __tablename__ = 'recommendation_results'
+
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'),
+                           nullable=False, index=True)
+    internship_id = db.Column(db.Integer, db.ForeignKey('internships.id', ondelete='CASCADE'),
+                              nullable=False)
+
+    rank = db.Column(db.Integer, nullable=False)
+    match_score = db.Column(db.Float, nullable=False)    # 0-100, fused
+    tfidf_score = db.Column(db.Float, nullable=False)    # 0-100
+    sbert_score = db.Column(db.Float, nullable=False)    # 0-100
+    explanation = db.Column(db.Text)                     # JSON from HybridMatcher._explain_match
+
+    # Fingerprint of the student profile the scores were computed from
+    profile_hash = db.Column(db.String(40), nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_match(self):
+        """Same shape as a HybridMatcher.match() result."""
+        return {
+            'id': self.internship_id,
+            'match_score': self.match_score,
+            'match_rank': self.rank,
+            'tfidf_score': self.tfidf_score,
+            'sbert_score': self.sbert_score,
+            'explanation': json.loads(self.explanation) if self.explanation else {},
+        }
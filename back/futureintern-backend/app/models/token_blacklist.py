@@ -14,8 +14,8 @@ class TokenBlacklist(db.Model):
     jti = db.Column(db.String(64), unique=True, nullable=False, index=True)  # JWT ID
     token_type = db.Column(db.String(10), nullable=False)  # "access" or "refresh"
     user_id = db.Column(db.Integer, nullable=True)
-    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=True)  # optional: for cleanup jobs
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # incremental cache sync
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # cleanup job (app/auth/revocation.py)
 
     @staticmethod
     def is_revoked(jti):
@@ -5,6 +5,9 @@ from datetime import datetime
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_verified', 'role', 'is_verified'),   # admin counts by role
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
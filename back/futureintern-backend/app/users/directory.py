@@ -0,0 +1,93 @@
+"""
+Public company directory
+One aggregated query per page: company users LEFT JOIN internships, grouped
+by company, ordered by internship count in the database and sliced with
+LIMIT/OFFSET, selecting only the columns the directory shows (no email,
+points or other account fields on this unauthenticated endpoint).
+
+Pages are kept in the shared cache (namespace 'company_directory') for
+COMPANY_DIRECTORY_TTL seconds together with a strong ETag of their JSON body,
+so repeat visitors revalidate with If-None-Match and get a 304 without the
+body being rebuilt or resent. Routes that change what the directory shows
+(company sign-up, profile and logo edits, verification, internship writes,
+any admin write) call clear_directory_cache() after committing; changes made
+elsewhere show up within the TTL.
+"""
+import hashlib
+import json
+from typing import Dict, Optional
+
+from sqlalchemy import func
+
+from app.models import db
+from app.utils.cache import get_cache
+
+MAX_PER_PAGE = 100
+
+# Columns exposed per company, in addition to internship_count
+DIRECTORY_COLUMNS = (
+    'id', 'name', 'role', 'profile_image', 'created_at', 'company_name',
+    'company_description', 'company_website', 'company_location', 'is_verified',
+)
+
+
+def _ttl() -> int:
+    from config import Config
+    return int(getattr(Config, 'COMPANY_DIRECTORY_TTL', 60))
+
+
+def _row_dict(row) -> Dict:
+    item = {name: getattr(row, name) for name in DIRECTORY_COLUMNS}
+    item['created_at'] = row.created_at.isoformat() if row.created_at else None
+    item['internship_count'] = row.internship_count
+    return item
+
+
+def build_directory(page: Optional[int] = None, per_page: int = 50) -> Dict:
+    """{'companies', 'total'} — every company, or one page of them (plus page/per_page/pages)."""
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    internship_count = func.count(Internship.id).label('internship_count')
+    query = db.session.query(*(getattr(User, c) for c in DIRECTORY_COLUMNS), internship_count)\
+        .outerjoin(Internship, Internship.company_id == User.id)\
+        .filter(User.role == 'company')\
+        .group_by(User.id)\
+        .order_by(internship_count.desc(), User.id)
+
+    if page is None:
+        companies = [_row_dict(row) for row in query]
+        return {'companies': companies, 'total': len(companies)}
+
+    total = User.query.filter(User.role == 'company').count()
+    rows = query.offset((page - 1) * per_page).limit(per_page)
+    return {
+        'companies': [_row_dict(row) for row in rows],
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page,
+    }
+
+
+def company_directory(page: Optional[int] = None, per_page: int = 50) -> Dict:
+    """{'body', 'etag'} for the requested page, from the cache when possible."""
+    if page is not None:
+        page = max(1, page)
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+    key = 'all' if page is None else f'{page}:{per_page}'
+    cache = get_cache('company_directory')
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    body = build_directory(page, per_page)
+    encoded = json.dumps(body, sort_keys=True, separators=(',', ':')).encode()
+    entry = {'body': body, 'etag': hashlib.sha1(encoded).hexdigest()}
+    if _ttl() > 0:
+        cache.set(key, entry, ttl=_ttl())
+    return entry
+
+
+def clear_directory_cache() -> None:
+    """Drop every cached page; call after committing a write the directory shows."""
+    get_cache('company_directory').clear()
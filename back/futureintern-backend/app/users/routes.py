@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.auth import role_required, get_current_user_role
 from app.models.user import User
 from app.models import db
+from app.users.directory import clear_directory_cache
 
 users_bp = Blueprint("users", __name__)
 
@@ -113,6 +114,12 @@ def update_profile():
                 user.company_location = data['company_location']
         
         db.session.commit()
+
+        if user.role == 'student':
+            from app.matching.query_cache import invalidate_student_query
+            invalidate_student_query(user.id)
+        elif user.role == 'company':
+            clear_directory_cache()
         
         return jsonify({
             'message': 'Profile updated successfully',
@@ -140,28 +147,20 @@ def all_users():
 
 @users_bp.route("/companies", methods=["GET"])
 def get_all_companies():
-    """Get all companies (public endpoint)"""
+    """Get all companies (public endpoint)
+
+    Optional ?page=N[&per_page=M] returns one page; responses carry an ETag and
+    a matching If-None-Match gets 304 Not Modified.
+    """
     try:
-        from app.models.intern import Internship
-        
-        # Get all users with role='company'
-        companies = User.query.filter_by(role='company').all()
-        
-        # For each company, count their internships
-        companies_data = []
-        for company in companies:
-            internship_count = Internship.query.filter_by(company_id=company.id).count()
-            company_dict = company.to_dict()
-            company_dict['internship_count'] = internship_count
-            companies_data.append(company_dict)
-        
-        # Sort by internship count (descending)
-        companies_data.sort(key=lambda x: x['internship_count'], reverse=True)
-        
-        return jsonify({
-            'companies': companies_data,
-            'total': len(companies_data)
-        }), 200
+        from app.users.directory import company_directory
+
+        entry = company_directory(request.args.get('page', type=int),
+                                  request.args.get('per_page', 50, type=int))
+        response = jsonify(entry['body'])
+        response.set_etag(entry['etag'])
+        response.headers['Cache-Control'] = 'public, no-cache'
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -304,6 +303,8 @@ def upload_logo():
         # The frontend will construct the full URL using the API base URL
         user.profile_image = logo_path
         db.session.commit()
+        if user.role == 'company':
+            clear_directory_cache()
         
         return jsonify({
             'message': 'Logo uploaded successfully',
@@ -337,6 +338,8 @@ def delete_logo_route():
         # Clear the profile_image from database
         user.profile_image = None
         db.session.commit()
+        if user.role == 'company':
+            clear_directory_cache()
         
         return jsonify({
             'message': 'Logo deleted successfully'
@@ -364,6 +367,7 @@ def verify_company(user_id):
         
         user.is_verified = True
         db.session.commit()
+        clear_directory_cache()
         
         return jsonify({
             'message': 'Company verified successfully',
@@ -0,0 +1,243 @@
+"""
+Asynchronous, batched audit log writer
+log_audit() (app/utils/logger.py) builds the row inside the request — time,
+IP and user agent are captured there — and hands it to this writer instead of
+adding it to the request's session and committing. A daemon thread drains the
+bounded queue every AUDIT_FLUSH_INTERVAL seconds (or as soon as
+AUDIT_BATCH_SIZE rows are waiting) with one multi-row INSERT on its own
+connection, so the request never waits on the audit write and never commits
+unrelated pending state.
+
+When the queue is full, AUDIT_OVERFLOW decides:
+  • sync   – write that entry inline on a separate connection (default, lossless)
+  • block  – wait up to one flush interval for room, then drop it
+  • drop   – drop it immediately (counted in stats())
+
+On graceful shutdown (atexit, and gunicorn's worker_exit hook) the queue is
+drained before the process exits. Set AUDIT_ASYNC=false to write every entry
+inline instead.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('api.audit')
+
+
+def _setting(name: str, default):
+    from config import Config
+    return getattr(Config, name, default)
+
+
+class AuditWriter:
+    """Bounded queue of audit rows plus the background thread that inserts them."""
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, overflow: str = 'sync'):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=maxsize)
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counts = {'enqueued': 0, 'written': 0, 'inline': 0, 'dropped': 0, 'failed': 0}
+
+    # ── Producer side ────────────────────────────────────────────────────────
+
+    def submit(self, row: Dict, app) -> None:
+        """Queue one audit_logs row (column -> value) written by `app`'s engine."""
+        self._app = app
+        if self._stopping.is_set():
+            # Shutting down: the writer thread may already be gone
+            self._write([row], inline=True)
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(row)
+            self._count('enqueued')
+            return
+        except queue.Full:
+            pass
+        if self.overflow == 'block':
+            try:
+                self._queue.put(row, timeout=self.flush_interval)
+                self._count('enqueued')
+                return
+            except queue.Full:
+                pass
+        if self.overflow == 'sync':
+            self._write([row], inline=True)
+        else:
+            self._count('dropped')
+            logger.warning('Audit queue full — dropped %s entry', row.get('action'))
+
+    def write_now(self, row: Dict, app) -> None:
+        """Write one row inline on a separate connection (AUDIT_ASYNC off)."""
+        self._app = app
+        self._write([row], inline=True)
+
+    def _ensure_thread(self) -> None:
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != pid:
+                # Forked: the parent's thread did not come along, nor should its queue
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    # ── Consumer side ────────────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._write_batch(self._take(block=True))
+        # Drain whatever is left on shutdown
+        while True:
+            batch = self._take(block=False)
+            if not batch:
+                break
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Dict]) -> None:
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    POLL = 0.1   # seconds; how quickly a waiting writer notices shutdown
+
+    def _take(self, block: bool) -> List[Dict]:
+        """Up to batch_size rows, waiting at most flush_interval to fill the batch."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if not block or remaining <= 0 or self._stopping.is_set():
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, self.POLL)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write(self, rows: List[Dict], inline: bool = False) -> None:
+        from app.models import db
+        from app.models.audit_log import AuditLog
+
+        app = self._app
+        if app is None:
+            return
+        try:
+            with app.app_context():
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(AuditLog.__table__.insert(), rows)
+                    self._count('inline' if inline else 'written', len(rows))
+                    return
+                except Exception as e:
+                    if len(rows) == 1:
+                        raise
+                    logger.warning('Audit batch of %d failed (%s) — retrying one by one', len(rows), e)
+                for row in rows:
+                    try:
+                        with db.engine.begin() as conn:
+                            conn.execute(AuditLog.__table__.insert(), [row])
+                        self._count('written')
+                    except Exception as e:
+                        self._count('failed')
+                        logger.warning('Could not write audit log %s: %s', row.get('action'), e)
+        except Exception as e:
+            self._count('failed', len(rows))
+            logger.warning('Could not write audit log: %s', e)
+
+    # ── Control ──────────────────────────────────────────────────────────────
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until every queued row has been written (True) or timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop the writer after draining the queue (graceful shutdown)."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning('Audit writer did not finish within %.0fs (%d entries left)',
+                               timeout, self._queue.qsize())
+        else:
+            # No writer thread in this process — write what is queued here
+            while not self._queue.empty():
+                self._write_batch(self._take(block=False))
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {**counts, 'queued': self._queue.qsize(), 'capacity': self._queue.maxsize,
+                'overflow': self.overflow}
+
+
+# ─────────────────────────────────────────────
+# SINGLETON
+# ─────────────────────────────────────────────
+
+_writer: Optional[AuditWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    maxsize=int(_setting('AUDIT_QUEUE_SIZE', 10000)),
+                    batch_size=int(_setting('AUDIT_BATCH_SIZE', 500)),
+                    flush_interval=float(_setting('AUDIT_FLUSH_INTERVAL', 1.0)),
+                    overflow=str(_setting('AUDIT_OVERFLOW', 'sync')).lower(),
+                )
+    return _writer
+
+
+def audit_async() -> bool:
+    return bool(_setting('AUDIT_ASYNC', True))
+
+
+def flush_audit_log(timeout: float = 5.0) -> bool:
+    """Wait until queued audit entries are in the database (tests, admin reads)."""
+    return _writer.flush(timeout) if _writer is not None else True
+
+
+def shutdown_audit_writer() -> None:
+    if _writer is not None:
+        _writer.shutdown()
+
+
+atexit.register(shutdown_audit_writer)
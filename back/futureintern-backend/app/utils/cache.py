@@ -0,0 +1,244 @@
+"""
+Shared key/value cache with TTL + LRU eviction
+Backends (selected by Config.CACHE_BACKEND):
+  • memory  – per-process OrderedDict (tests, single worker)
+  • sqlite  – one WAL-mode SQLite file shared by every gunicorn worker (default)
+  • redis   – optional; needs the `redis` package and CACHE_REDIS_URL
+If the configured backend cannot be opened, get_cache() logs a warning and
+falls back to memory so a cache outage never takes the API down.
+
+Every backend offers add(): an atomic "set if absent (or expired)" used to
+claim work, e.g. a pending recommendation run, across workers.
+Values must be JSON-serialisable.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """In-process cache; thread-safe, bounded by max_entries (LRU)."""
+
+    def __init__(self, namespace: str, max_entries: int = 10000):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        key = str(key)
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl: float) -> None:
+        with self._lock:
+            self._store(str(key), value, ttl)
+
+    def add(self, key, value, ttl: float) -> bool:
+        key = str(key)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > time.time():
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(str(key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def _store(self, key: str, value, ttl: float) -> None:
+        self._data[key] = (time.time() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+class SQLiteCache:
+    """
+    Cross-process cache in a single SQLite file (WAL, autocommit).
+    Expired rows are skipped on read and purged, together with the least
+    recently used rows beyond max_entries, every PRUNE_EVERY writes.
+    LRU order is approximate: a hit only rewrites accessed_at once it is
+    TOUCH_INTERVAL old, so most reads stay reads and don't queue for the
+    WAL write lock shared by every worker.
+    """
+
+    PRUNE_EVERY = 100
+    TOUCH_INTERVAL = 60   # seconds
+
+    def __init__(self, namespace: str, path: str, max_entries: int = 10000):
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key) -> Optional[Any]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, accessed_at FROM cache_entries WHERE namespace=? AND key=? AND expires_at>?",
+            (self.namespace, str(key), now),
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] >= self.TOUCH_INTERVAL:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at=? WHERE namespace=? AND key=? AND accessed_at<?",
+                (now, self.namespace, str(key), now - self.TOUCH_INTERVAL),
+            )
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl: float) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, str(key), json.dumps(value), now + ttl, now),
+        )
+        self._after_write()
+
+    def add(self, key, value, ttl: float) -> bool:
+        now = time.time()
+        # Single statement, so the check-and-set is atomic across processes
+        cur = self._conn().execute(
+            "INSERT INTO cache_entries (namespace, key, value, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT(namespace, key) DO UPDATE SET"
+            "  value=excluded.value, expires_at=excluded.expires_at, accessed_at=excluded.accessed_at"
+            " WHERE cache_entries.expires_at <= ?",
+            (self.namespace, str(key), json.dumps(value), now + ttl, now, now),
+        )
+        claimed = cur.rowcount == 1
+        if claimed:
+            self._after_write()
+        return claimed
+
+    def delete(self, key) -> None:
+        self._conn().execute(
+            "DELETE FROM cache_entries WHERE namespace=? AND key=?", (self.namespace, str(key))
+        )
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace=?", (self.namespace,))
+
+    def _after_write(self) -> None:
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self) -> None:
+        """Drop expired rows, then the least recently used rows beyond max_entries."""
+        conn = self._conn()
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace=? AND expires_at<=?", (self.namespace, time.time())
+        )
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace=? AND key IN ("
+            " SELECT key FROM cache_entries WHERE namespace=?"
+            " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries),
+        )
+
+
+class RedisCache:
+    """Redis adapter; size/LRU bound comes from the server's maxmemory-policy."""
+
+    def __init__(self, namespace: str, url: str):
+        import redis  # type: ignore[import]  # optional dependency
+
+        self.namespace = namespace
+        self._client = redis.Redis.from_url(url, socket_timeout=2)
+        self._client.ping()
+
+    def _key(self, key) -> str:
+        return f"futureintern:{self.namespace}:{key}"
+
+    def get(self, key) -> Optional[Any]:
+        raw = self._client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl: float) -> None:
+        self._client.set(self._key(key), json.dumps(value), px=int(ttl * 1000))
+
+    def add(self, key, value, ttl: float) -> bool:
+        return bool(self._client.set(self._key(key), json.dumps(value), px=int(ttl * 1000), nx=True))
+
+    def delete(self, key) -> None:
+        self._client.delete(self._key(key))
+
+    def clear(self) -> None:
+        for k in self._client.scan_iter(self._key("*")):
+            self._client.delete(k)
+
+
+# ─────────────────────────────────────────────
+# Factory — one cache object per namespace
+# ─────────────────────────────────────────────
+
+_caches: Dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str):
+    """Return the shared cache for `namespace`, built from Config on first use."""
+    with _caches_lock:
+        if namespace not in _caches:
+            _caches[namespace] = _build_cache(namespace)
+        return _caches[namespace]
+
+
+def _build_cache(namespace: str):
+    from config import Config
+
+    backend = (getattr(Config, "CACHE_BACKEND", "memory") or "memory").lower()
+    max_entries = getattr(Config, "CACHE_MAX_ENTRIES", 10000)
+    try:
+        if backend == "redis":
+            return RedisCache(namespace, Config.CACHE_REDIS_URL)
+        if backend == "sqlite":
+            return SQLiteCache(namespace, Config.CACHE_SQLITE_PATH, max_entries)
+    except Exception as e:
+        logger.warning(f"Cache backend '{backend}' unavailable ({type(e).__name__}: {e}) — using in-memory cache")
+    return MemoryCache(namespace, max_entries)
+
+
+def reset_caches() -> None:
+    """Forget all cache objects (tests / after changing Config)."""
+    with _caches_lock:
+        _caches.clear()
@@ -53,6 +53,9 @@ def log_audit(action, resource=None, resource_id=None, details=None, user_id=Non
     """
     Write an entry to the audit_logs table.
 
+    The row is captured here and written by the background audit writer
+    (app/utils/audit_writer.py) in batches, outside the request's session.
+
     Usage:
         log_audit('login_success', resource='user', resource_id=user.id, user_id=user.id)
         log_audit('login_failed', details={'email': email})
@@ -60,20 +63,26 @@ def log_audit(action, resource=None, resource_id=None, details=None, user_id=Non
                   resource_id=app.id, details={'new_status': 'accepted'}, user_id=admin_id)
     """
     try:
-        from app.models.audit_log import AuditLog
-        from app.models import db
+        from datetime import datetime
+        from flask import current_app
+        from app.utils.audit_writer import audit_async, get_audit_writer
 
-        entry = AuditLog(
-            user_id=user_id,
-            action=action,
-            resource=resource,
-            resource_id=resource_id,
-            details=json.dumps(details) if details and not isinstance(details, str) else details,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent', '')[:300],
-        )
-        db.session.add(entry)
-        db.session.commit()
+        row = {
+            'user_id': user_id,
+            'action': action,
+            'resource': resource,
+            'resource_id': resource_id,
+            'details': json.dumps(details) if details and not isinstance(details, str) else details,
+            'ip_address': request.remote_addr,
+            'user_agent': request.headers.get('User-Agent', '')[:300],
+            'created_at': datetime.utcnow(),
+        }
+        writer = get_audit_writer()
+        app = current_app._get_current_object()
+        if audit_async():
+            writer.submit(row, app)
+        else:
+            writer.write_now(row, app)
     except Exception as e:
         # Never let audit logging crash the main request
         logging.getLogger('api.audit').warning('Could not write audit log: %s', e)
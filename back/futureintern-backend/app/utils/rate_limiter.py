@@ -1,84 +1,266 @@
 """
 Rate limiting middleware for API endpoints
 Prevents brute force attacks and API abuse
+
+Limits use GCRA (generic cell rate algorithm — a token bucket expressed as one
+timestamp): each key stores only its "theoretical arrival time" (TAT), so
+memory per key is a single float however many requests it makes. A limit of
+N requests per W seconds allows a burst of N, then one request every W / N
+seconds.
+
+Stores (selected by Config.RATE_LIMIT_BACKEND):
+  • memory  – per-process dicts behind striped locks (tests, single worker)
+  • sqlite  – one table in the shared cache file, so the limit holds across
+              every gunicorn worker instead of scaling with their number (default)
+  • redis   – optional; needs the `redis` package and CACHE_REDIS_URL
+If the configured store cannot be opened the limiter falls back to memory,
+and a store error lets the request through (logged) — rate limiting never
+takes the API down.
+
+Allowed / limited counts per route are kept per process; see limiter_metrics().
 """
 from functools import wraps
 from flask import request, jsonify
-from datetime import datetime, timedelta
 from collections import defaultdict
+import logging
+import math
+import os
+import sqlite3
 import threading
+import time
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+EPSILON = 1e-6   # float slack so the N-th request of a full burst is never rejected by rounding
+
+
+def _gcra(tat: float, now: float, max_requests: int, window_seconds: float) -> Tuple[bool, float, float]:
+    """(allowed, new TAT, retry after) for a key whose stored TAT is `tat`."""
+    interval = window_seconds / max_requests
+    new_tat = max(tat, now) + interval
+    if new_tat - now > window_seconds + EPSILON:
+        return False, tat, new_tat - window_seconds - now
+    return True, new_tat, 0.0
+
+
+class MemoryStore:
+    """Per-process TATs, sharded over STRIPES dicts each with its own lock."""
+
+    name = 'memory'
+    STRIPES = 64
+    PRUNE_EVERY = 1000   # writes per stripe between dropping idle keys
 
-class RateLimiter:
-    """Simple in-memory rate limiter"""
-    
     def __init__(self):
-        self.requests = defaultdict(list)
-        self.lock = threading.Lock()
-        self.cleanup_interval = 300  # Clean up old entries every 5 minutes
-        self.last_cleanup = datetime.utcnow()
-    
+        self._stripes = [({}, threading.Lock()) for _ in range(self.STRIPES)]
+        self._writes = [0] * self.STRIPES
+
+    def hit(self, key: str, max_requests: int, window_seconds: float) -> Tuple[bool, float]:
+        index = hash(key) % self.STRIPES
+        tats, lock = self._stripes[index]
+        now = time.time()
+        with lock:
+            allowed, tat, retry_after = _gcra(tats.get(key, now), now, max_requests, window_seconds)
+            if allowed:
+                tats[key] = tat
+                self._writes[index] += 1
+                if self._writes[index] % self.PRUNE_EVERY == 0:
+                    # A TAT in the past means the key is back to a full burst — forget it
+                    for k in [k for k, t in tats.items() if t <= now]:
+                        del tats[k]
+        return allowed, retry_after
+
+    def __len__(self) -> int:
+        return sum(len(tats) for tats, _ in self._stripes)
+
+    def clear(self) -> None:
+        for tats, lock in self._stripes:
+            with lock:
+                tats.clear()
+
+
+class SQLiteStore:
+    """TATs in a table of the shared SQLite cache file; one atomic statement per hit."""
+
+    name = 'sqlite'
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, max_requests: int, window_seconds: float) -> Tuple[bool, float]:
+        now = time.time()
+        interval = window_seconds / max_requests
+        conn = self._conn()
+        # GCRA as a single upsert: the update only happens when the request fits
+        cur = conn.execute(
+            "INSERT INTO rate_limits (key, tat) VALUES (?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET tat = max(tat, ?) + ?"
+            " WHERE max(tat, ?) + ? - ? <= ?",
+            (key, now + interval, now, interval, now, interval, now, window_seconds + EPSILON),
+        )
+        if cur.rowcount == 1:
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+            return True, 0.0
+        row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        tat = row[0] if row else now
+        return False, max(0.0, tat + interval - window_seconds - now)
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM rate_limits")
+
+
+class RedisStore:
+    """GCRA in a Lua script, so check-and-update is atomic on the server."""
+
+    name = 'redis'
+    SCRIPT = """
+local now, interval, window = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then tat = now end
+local new_tat = tat + interval
+if new_tat - now > window + 1e-6 then return {0, tostring(new_tat - window - now)} end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+    def __init__(self, url: str):
+        import redis  # type: ignore[import]  # optional dependency
+
+        self._client = redis.Redis.from_url(url, socket_timeout=2)
+        self._client.ping()
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def hit(self, key: str, max_requests: int, window_seconds: float) -> Tuple[bool, float]:
+        allowed, retry_after = self._script(
+            keys=[f"futureintern:ratelimit:{key}"],
+            args=[time.time(), window_seconds / max_requests, window_seconds],
+        )
+        return bool(int(allowed)), float(retry_after)
+
+    def clear(self) -> None:
+        for k in self._client.scan_iter("futureintern:ratelimit:*"):
+            self._client.delete(k)
+
+
+def _build_store():
+    from config import Config
+
+    backend = (getattr(Config, "RATE_LIMIT_BACKEND", "memory") or "memory").lower()
+    try:
+        if backend == "redis":
+            return RedisStore(Config.CACHE_REDIS_URL)
+        if backend == "sqlite":
+            return SQLiteStore(Config.CACHE_SQLITE_PATH)
+    except Exception as e:
+        logger.warning(f"Rate limit store '{backend}' unavailable ({type(e).__name__}: {e}) — using in-memory store")
+    return MemoryStore()
+
+
+class RateLimiter:
+    """GCRA rate limiter over a pluggable store, with per-route metrics."""
+
+    def __init__(self, store=None):
+        self._store = store
+        self._store_lock = threading.Lock()
+        self._metrics = defaultdict(lambda: {'allowed': 0, 'limited': 0})
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = _build_store()
+        return self._store
+
+    def check(self, key, max_requests, window_seconds, route=None) -> Tuple[bool, float]:
+        """
+        Count a request against `key`
+
+        Returns:
+            (allowed, retry_after): retry_after is the seconds until the next
+            request would be allowed (0 when this one is)
+        """
+        try:
+            allowed, retry_after = self.store.hit(str(key), max_requests, window_seconds)
+        except Exception as e:
+            logger.warning(f"Rate limit check failed, allowing request: {e}")
+            allowed, retry_after = True, 0.0
+        if route:
+            with self._metrics_lock:
+                self._metrics[route]['allowed' if allowed else 'limited'] += 1
+        return allowed, retry_after
+
     def is_allowed(self, key, max_requests, window_seconds):
         """
         Check if request is allowed based on rate limit
-        
+
         Args:
             key: Unique identifier (e.g., IP address, user ID)
             max_requests: Maximum number of requests allowed
             window_seconds: Time window in seconds
-        
+
         Returns:
             bool: True if request is allowed, False otherwise
         """
-        now = datetime.utcnow()
-        cutoff = now - timedelta(seconds=window_seconds)
-        
-        with self.lock:
-            # Cleanup old entries periodically
-            if (now - self.last_cleanup).total_seconds() > self.cleanup_interval:
-                self._cleanup()
-                self.last_cleanup = now
-            
-            # Remove old requests outside the window
-            self.requests[key] = [req_time for req_time in self.requests[key] if req_time > cutoff]
-            
-            # Check if limit exceeded
-            if len(self.requests[key]) >= max_requests:
-                return False
-            
-            # Add current request
-            self.requests[key].append(now)
-            return True
-    
-    def _cleanup(self):
-        """Remove old entries to prevent memory leak"""
-        now = datetime.utcnow()
-        keys_to_delete = []
-        
-        for key, requests in self.requests.items():
-            # Remove requests older than 1 hour
-            cutoff = now - timedelta(hours=1)
-            recent_requests = [req for req in requests if req > cutoff]
-            
-            if not recent_requests:
-                keys_to_delete.append(key)
-            else:
-                self.requests[key] = recent_requests
-        
-        for key in keys_to_delete:
-            del self.requests[key]
+        return self.check(key, max_requests, window_seconds)[0]
+
+    def metrics(self) -> Dict:
+        with self._metrics_lock:
+            routes = {route: dict(counts) for route, counts in self._metrics.items()}
+        return {'backend': self.store.name, 'pid': os.getpid(), 'routes': routes}
+
+    def reset(self, store=None) -> None:
+        """Forget counters and metrics; optionally switch store (tests / after changing Config)."""
+        with self._store_lock:
+            if store is not None:
+                self._store = store
+            elif self._store is not None:
+                self._store.clear()
+        with self._metrics_lock:
+            self._metrics.clear()
+
 
 # Global rate limiter instance
 _limiter = RateLimiter()
 
+
+def get_limiter() -> RateLimiter:
+    return _limiter
+
+
+def limiter_metrics() -> Dict:
+    """Allowed / limited request counts per route in this worker."""
+    return _limiter.metrics()
+
+
 def rate_limit(max_requests=100, window_seconds=60, key_func=None):
     """
     Decorator to rate limit API endpoints
-    
+
     Args:
         max_requests: Maximum number of requests allowed in the window
         window_seconds: Time window in seconds
         key_func: Optional function to generate rate limit key (default: IP address)
-    
+
     Usage:
         @rate_limit(max_requests=5, window_seconds=60)
         def login():
@@ -93,15 +275,22 @@ def rate_limit(max_requests=100, window_seconds=60, key_func=None):
             else:
                 # Default to IP address
                 key = request.remote_addr or 'unknown'
-            
+            # Routes with the same limit share the key's budget, as before
+            key = f'{max_requests}/{window_seconds}:{key}'
+
             # Check rate limit
-            if not _limiter.is_allowed(key, max_requests, window_seconds):
-                return jsonify({
+            allowed, retry_after = _limiter.check(key, max_requests, window_seconds,
+                                                  route=request.endpoint or f.__name__)
+            if not allowed:
+                retry_after = max(1, math.ceil(retry_after))
+                response = jsonify({
                     'error': 'Rate limit exceeded',
-                    'message': f'Too many requests. Please try again later.',
-                    'retry_after': window_seconds
-                }), 429
-            
+                    'message': 'Too many requests. Please try again later.',
+                    'retry_after': retry_after
+                })
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+
             return f(*args, **kwargs)
         return wrapped
     return decorator
@@ -0,0 +1,98 @@
+"""
+ANN vs exact semantic search benchmark.
+
+Embeds the internship corpus (internships.csv), optionally replicated with
+small perturbations to simulate a large scraped catalogue, then compares
+IVFIndex search at several n_probe settings against exact `q @ corpus.T`:
+recall@k and per-query latency (p50 / p95).
+
+Uses the real SBERT model when sentence-transformers is installed, otherwise
+a deterministic TF-IDF + random-projection embedding so it runs anywhere.
+
+Run with: python benchmarks/bench_ann.py [--scale 50000] [--k 10] [--nprobe 1 4 8 16 32]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.matching.ann import IVFIndex  # noqa: E402
+from app.matching.service import _get_sbert_model, preprocess_text, TransformerMatcher  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_corpus():
+    with open(os.path.join(BASE_DIR, 'internships.csv'), encoding='utf-8-sig') as f:
+        return [' '.join([r.get('Type', ''), r.get('Description', ''), r.get('Requirements', '')])
+                for r in csv.DictReader(f)]
+
+
+def embed(texts, dim=384):
+    model = _get_sbert_model(TransformerMatcher.DEFAULT_MODEL)
+    if model is not None:
+        return model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True), 'sbert'
+    from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore[import-untyped]
+    tfidf = TfidfVectorizer().fit_transform([preprocess_text(t) for t in texts])
+    proj = np.random.default_rng(0).normal(size=(tfidf.shape[1], dim)).astype(np.float32)
+    emb = np.asarray(tfidf @ proj, dtype=np.float32)
+    return emb / (np.linalg.norm(emb, axis=1, keepdims=True) + 1e-12), 'tfidf-projection'
+
+
+def scale_up(emb, n, noise=0.35, seed=0):
+    """Replicate base embeddings with gaussian noise to n unit vectors."""
+    rng = np.random.default_rng(seed)
+    rows = emb[rng.integers(0, emb.shape[0], size=n)]
+    rows = rows + noise * rng.normal(size=rows.shape).astype(np.float32) / np.sqrt(emb.shape[1])
+    return (rows / np.linalg.norm(rows, axis=1, keepdims=True)).astype(np.float32)
+
+
+def pct(values, p):
+    return float(np.percentile(values, p) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='IVF ANN vs exact search benchmark')
+    parser.add_argument('--scale', type=int, default=50000, help='corpus size after replication')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    base, backend = embed(load_corpus())
+    corpus = scale_up(base, args.scale) if args.scale > base.shape[0] else base
+    queries = scale_up(base, args.queries, seed=1)
+    print(f"corpus={corpus.shape[0]} dim={corpus.shape[1]} embeddings={backend} k={args.k}")
+
+    exact_times, truth = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        scores = corpus @ q
+        top = np.argpartition(-scores, args.k - 1)[:args.k]
+        exact_times.append(time.perf_counter() - t0)
+        truth.append(set(top.tolist()))
+    print(f"{'exact':>10}  recall@{args.k}=1.000  p50={pct(exact_times, 50):.3f}ms  p95={pct(exact_times, 95):.3f}ms")
+
+    t0 = time.perf_counter()
+    index = IVFIndex().build(corpus)
+    print(f"IVF build: {index.n_lists} lists in {time.perf_counter() - t0:.2f}s")
+
+    for n_probe in args.nprobe:
+        times, hits = [], 0
+        for q, expected in zip(queries, truth):
+            t0 = time.perf_counter()
+            rows, _ = index.search(q, corpus, args.k, n_probe=n_probe)
+            times.append(time.perf_counter() - t0)
+            hits += len(expected & set(rows.tolist()))
+        recall = hits / (len(truth) * args.k)
+        print(f"{'nprobe=' + str(n_probe):>10}  recall@{args.k}={recall:.3f}  "
+              f"p50={pct(times, 50):.3f}ms  p95={pct(times, 95):.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
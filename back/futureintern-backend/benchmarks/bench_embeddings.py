@@ -0,0 +1,99 @@
+"""
+Embedding backend comparison: load time, throughput and ranking quality.
+
+For every backend in --backends that can be loaded here (see
+EMBEDDING_BACKENDS in config.py) it reports:
+  load s        time to load the model
+  1 text ms     p50 latency of encoding one student query
+  texts/s       batch throughput over the corpus
+  agree@k       top-k overlap with the reference backend (first one loaded)
+  mrr / ndcg@5  offline ranking quality (benchmarks/eval_matching.py, proxy profiles)
+so the cheapest backend that still meets quality on CPU-only hosts can be picked.
+
+--export-static PATH distils a static-vector file (for the `static` backend)
+from the reference backend by encoding every word of the corpus vocabulary.
+
+Run with: python benchmarks/bench_embeddings.py [--backends sbert onnx static] [--scale 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('EMBEDDING_CACHE_DIR', '')
+os.environ['MATCHING_QUERY_CACHE_SIZE'] = '0'
+
+import app.matching.service as service  # noqa: E402
+from app.matching.evaluation import evaluate_rankings  # noqa: E402
+from app.matching.matching_loader import MatchingLoader  # noqa: E402
+from benchmarks.eval_matching import load_csv_corpus, proxy_profiles, run_config  # noqa: E402
+from benchmarks.synthetic import make_internships, make_students  # noqa: E402
+
+
+def export_static(backend, texts, path):
+    words = sorted({w for t in texts for w in service.preprocess_text(t).split()})
+    vectors = backend.encode(words, batch_size=256, normalize_embeddings=True)
+    np.savez_compressed(path, words=np.array(words), vectors=vectors.astype(np.float32))
+    print(f"Wrote {len(words)} static vectors ({vectors.shape[1]} dims) to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embedding backend comparison')
+    parser.add_argument('--backends', nargs='+', default=['sbert', 'onnx', 'static'])
+    parser.add_argument('--scale', type=int, default=2000, help='corpus texts for the throughput run')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--export-static', help='write static vectors distilled from the reference backend')
+    args = parser.parse_args()
+
+    docs, company_of = load_csv_corpus()
+    corpus_docs = docs + make_internships(max(0, args.scale - len(docs)))
+    texts = [service.HybridMatcher._internship_text(d) for d in corpus_docs]
+    queries = [service.HybridMatcher()._build_student_query(p) for p in make_students(100)]
+    loader = MatchingLoader()
+    truth, profiles = loader.ground_truth(), proxy_profiles(loader)
+
+    print(f"{'backend':>8} {'load s':>8} {'dim':>5} {'1 text ms':>10} {'texts/s':>9} "
+          f"{'agree@k':>8} {'mrr':>7} {'ndcg@5':>7}")
+    reference = None
+    for name in args.backends:
+        try:
+            backend = service.load_embedding_backend(name, service.TransformerMatcher.DEFAULT_MODEL)
+        except Exception as e:
+            print(f"{name:>8}  unavailable ({type(e).__name__}: {e})")
+            continue
+
+        single = []
+        for q in queries:
+            t0 = time.perf_counter()
+            backend.encode([q])
+            single.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        corpus = backend.encode(texts, batch_size=64)
+        throughput = len(texts) / (time.perf_counter() - t0)
+        q_emb = backend.encode(queries)
+        top = np.argsort(-(corpus @ q_emb.T), axis=0)[:args.k].T
+
+        if reference is None:
+            reference = (backend, top)
+        agree = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, reference[1])])
+
+        service._cached_sbert_model = backend
+        run = run_config({'name': name}, docs, company_of, profiles)
+        metrics = evaluate_rankings(run['rankings'], truth, ks=(5,))
+
+        print(f"{name:>8} {backend.load_seconds:>8.2f} {corpus.shape[1]:>5} "
+              f"{np.median(single) * 1000:>10.2f} {throughput:>9.0f} {agree:>8.3f} "
+              f"{metrics['mrr']:>7.3f} {metrics['ndcg@5']:>7.3f}")
+
+    if args.export_static:
+        if reference is None:
+            print("No backend loaded — nothing to export.")
+        else:
+            export_static(reference[0], texts, args.export_static)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+HybridMatcher benchmark on synthetic corpora.
+
+Times each stage of the recommendation hot path separately, per corpus size:
+  fit           full TF-IDF + SBERT fit
+  match         single-student HybridMatcher.match (p50/p95/p99)
+  match_batch   all students at once (total + per-student)
+  explain       HybridMatcher._explain_match per result (p50/p95/p99)
+and reports peak RSS after each scale. SBERT is replaced by the deterministic
+StubEncoder (benchmarks/synthetic.py) so numbers are comparable run to run;
+the embedding and query caches are disabled so every call does the real work.
+
+Run with:
+  python benchmarks/bench_matching.py --internships 100 1000 10000 --students 500
+  python benchmarks/bench_matching.py --internships 100000 --students 1000 --json before.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['EMBEDDING_CACHE_DIR'] = ''
+os.environ['MATCHING_QUERY_CACHE_SIZE'] = '0'
+
+import app.matching.service as service  # noqa: E402
+from benchmarks.synthetic import StubEncoder, make_internships, make_students  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def percentiles(samples):
+    ms = np.asarray(samples) * 1000
+    return {
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def bench_scale(n_internships, students, n_queries, top_k, chunk_size):
+    internships = make_internships(n_internships)
+    matcher = service.HybridMatcher()
+
+    t0 = time.perf_counter()
+    matcher.fit(internships)
+    fit_s = time.perf_counter() - t0
+
+    match_times = []
+    for profile in students[:n_queries]:
+        t0 = time.perf_counter()
+        matcher.match(profile, top_k=top_k)
+        match_times.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    matcher.match_batch(students, top_k=top_k, chunk_size=chunk_size)
+    batch_s = time.perf_counter() - t0
+
+    explain_times = []
+    for profile in students[:n_queries]:
+        query = matcher._build_student_query(profile)
+        tokens = matcher._student_tokens(profile, query)
+        for idx in service.top_k_indices(matcher.tfidf.score_vector(query), top_k):
+            t0 = time.perf_counter()
+            matcher._explain_match(tokens, int(idx), 50.0, 50.0)
+            explain_times.append(time.perf_counter() - t0)
+
+    return {
+        'internships': n_internships,
+        'students': len(students),
+        'fit_s': round(fit_s, 3),
+        'match': percentiles(match_times),
+        'match_batch_s': round(batch_s, 3),
+        'match_batch_per_student_ms': round(batch_s * 1000 / len(students), 3),
+        'explain': percentiles(explain_times),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HybridMatcher benchmark on synthetic data')
+    parser.add_argument('--internships', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='corpus sizes to benchmark')
+    parser.add_argument('--students', type=int, default=500, help='profiles for match_batch')
+    parser.add_argument('--queries', type=int, default=200, help='single match() calls per scale')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+
+    # Every TransformerMatcher picks up the stub instead of loading a real model
+    service._cached_sbert_model = StubEncoder()
+    students = make_students(args.students)
+
+    results = []
+    header = f"{'internships':>11} {'fit s':>8} {'match p50/p95/p99 ms':>24} " \
+             f"{'batch s':>8} {'ms/stud':>8} {'explain p50/p99 ms':>20} {'RSS MB':>8}"
+    print(header)
+    for n in args.internships:
+        r = bench_scale(n, students, min(args.queries, args.students), args.top_k, args.chunk_size)
+        results.append(r)
+        m, e = r['match'], r['explain']
+        match_col = f"{m['p50_ms']}/{m['p95_ms']}/{m['p99_ms']}"
+        explain_col = f"{e['p50_ms']}/{e['p99_ms']}"
+        print(f"{n:>11} {r['fit_s']:>8} {match_col:>24} {r['match_batch_s']:>8} "
+              f"{r['match_batch_per_student_ms']:>8} {explain_col:>20} {r['peak_rss_mb']:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+float32 vs float16 vs int8 corpus embeddings.
+
+Embeds our internships (internships.csv, topped up with synthetic postings to
+--scale) and synthetic student queries, then compares each quantised matrix
+against float32: memory, score error, top-k agreement (recall@k vs the
+float32 ranking) and scoring latency for one query and for a batch.
+
+Uses the real SBERT model when sentence-transformers is installed, otherwise
+(or with --stub-sbert) the deterministic benchmark encoder.
+
+Run with: python benchmarks/bench_quantization.py [--scale 50000] [--k 10] [--stub-sbert]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.matching.quantize import quantize  # noqa: E402
+from app.matching.service import HybridMatcher, TransformerMatcher, _get_sbert_model  # noqa: E402
+from benchmarks.eval_matching import load_csv_corpus  # noqa: E402
+from benchmarks.synthetic import StubEncoder, make_internships, make_students  # noqa: E402
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantised embedding accuracy/memory benchmark')
+    parser.add_argument('--scale', type=int, default=50000, help='corpus rows (real rows + synthetic)')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--stub-sbert', action='store_true')
+    args = parser.parse_args()
+
+    model = None if args.stub_sbert else _get_sbert_model(TransformerMatcher.DEFAULT_MODEL)
+    encoder, backend = (model, 'sbert') if model is not None else (StubEncoder(), 'stub')
+
+    docs, _ = load_csv_corpus()
+    docs += make_internships(max(0, args.scale - len(docs)))
+    texts = [HybridMatcher._internship_text(d) for d in docs]
+    queries = [HybridMatcher()._build_student_query(p) for p in make_students(args.queries)]
+
+    corpus = encoder.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+    corpus = np.asarray(corpus, dtype=np.float32)
+    q = np.asarray(encoder.encode(queries, convert_to_numpy=True, normalize_embeddings=True), dtype=np.float32)
+    print(f"corpus={corpus.shape[0]}x{corpus.shape[1]} queries={len(queries)} embeddings={backend} k={args.k}")
+
+    exact = corpus @ q.T
+    exact_top = np.argsort(-exact, axis=0)[:args.k].T
+
+    print(f"{'dtype':>8} {'MB':>8} {'max err':>9} {'mean err':>9} {'recall@k':>9} {'1 query ms':>11} {'batch ms':>9}")
+    for dtype in ('float32', 'float16', 'int8'):
+        matrix = quantize(corpus, dtype)
+        scores = matrix @ q.T
+        top = np.argsort(-scores, axis=0)[:args.k].T
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top, exact_top)])
+        err = np.abs(scores - exact)
+        mb = matrix.nbytes / 2**20
+        one = timed(lambda: matrix @ q[0], 20)
+        batch = timed(lambda: matrix @ q.T, 3)
+        print(f"{dtype:>8} {mb:>8.1f} {err.max():>9.5f} {err.mean():>9.6f} {recall:>9.3f} {one:>11.2f} {batch:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Offline ranking-quality evaluation of HybridMatcher configurations.
+
+Replays the students in app/matching/data/final_matching_results.csv through
+HybridMatcher under several configurations (TF-IDF/SBERT weights, n-gram
+range, max_features, ANN) and reports recall@k, NDCG@k and MRR against the
+historical student → company scores, plus fit time and per-query latency.
+
+The CSV holds emails and scores only, so student profiles come from:
+  --from-db            users with those emails in the app database
+                       (the corpus is then the active internships too)
+  --profiles FILE      JSON {email: {skills, interests, bio, major, cv_text}}
+  neither              proxy profiles built from the student's historical
+                       internship categories (CATEGORY_TERMS) — useful to compare
+                       configurations with each other, not as absolute quality
+By default the corpus is internships.csv, SBERT is the real model if
+installed, and --stub-sbert swaps in the deterministic benchmark encoder.
+
+Run with: python benchmarks/eval_matching.py [--stub-sbert] [--k 1 3 5] [--json eval.json]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('EMBEDDING_CACHE_DIR', '')
+os.environ['MATCHING_QUERY_CACHE_SIZE'] = '0'
+
+import app.matching.service as service  # noqa: E402
+from app.matching.evaluation import companies_in_rank_order, evaluate_rankings  # noqa: E402
+from app.matching.matching_loader import MatchingLoader  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGS = [
+    {'name': 'default (0.3/0.7, 1-2gram, 10k)'},
+    {'name': 'balanced (0.5/0.5)', 'tfidf_weight': 0.5, 'transformer_weight': 0.5},
+    {'name': 'sbert-heavy (0.1/0.9)', 'tfidf_weight': 0.1, 'transformer_weight': 0.9},
+    {'name': 'tfidf only', 'tfidf_weight': 1.0, 'transformer_weight': 0.0},
+    {'name': 'unigrams', 'ngram_range': (1, 1)},
+    {'name': 'max_features=500', 'max_features': 500},
+    {'name': 'max_features=2000', 'max_features': 2000},
+    {'name': 'ANN n_probe=1', 'ann_min_rows': 1, 'ann_n_probe': 1},
+    {'name': 'ANN n_probe=2', 'ann_min_rows': 1, 'ann_n_probe': 2},
+]
+
+
+def load_csv_corpus():
+    with open(os.path.join(BASE_DIR, 'internships.csv'), encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    docs, company_of = [], {}
+    for i, r in enumerate(rows, 1):
+        docs.append({
+            'id': i,
+            'title': r.get('Type', ''),
+            'description': r.get('Description', ''),
+            'skills': '',
+            'requirements': r.get('Requirements', ''),
+            'major': '',
+            'location': r.get('Location', ''),
+        })
+        company_of[i] = r.get('Company Name', '')
+    return docs, company_of
+
+
+def load_db_corpus_and_profiles(emails):
+    from sqlalchemy import func
+    from sqlalchemy.orm import joinedload
+    from app import create_app
+    from app.matching.index import internship_to_document
+    from app.matching.profiles import build_student_profile
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    app = create_app()
+    with app.app_context():
+        internships = Internship.query.options(joinedload(Internship.company))\
+            .filter_by(is_active=True).all()
+        docs = [internship_to_document(i) for i in internships]
+        company_of = {
+            i.id: (i.company.company_name or i.company.name) if i.company else '' for i in internships
+        }
+        students = User.query.filter(func.lower(User.email).in_(list(emails))).all()
+        profiles = {s.email.strip().lower(): build_student_profile(s) for s in students}
+    return docs, company_of, profiles
+
+
+# Historical category codes → the words a student in that track would list
+CATEGORY_TERMS = {
+    't': ['information technology', 'software', 'programming'],
+    'it': ['information technology', 'technical support', 'networks', 'hardware'],
+    'cyber': ['cybersecurity', 'network security', 'penetration testing'],
+    'cybersecurity': ['cybersecurity', 'security operations', 'ethical hacking'],
+    'ai': ['artificial intelligence', 'machine learning', 'test automation'],
+}
+
+
+def proxy_profiles(loader):
+    profiles = {}
+    for email, group in loader.df.groupby('student_email'):
+        categories = {str(c).strip().lower() for c in group['internship_category']}
+        terms = sorted({t for c in categories for t in CATEGORY_TERMS.get(c, [c])})
+        profiles[email] = {'interests': terms, 'skills': terms[:3]}
+    return profiles
+
+
+def run_config(config, docs, company_of, profiles):
+    params = {k: v for k, v in config.items() if k != 'name'}
+    matcher = service.HybridMatcher(**params)
+    uses_sbert = params.get('transformer_weight', 0) > 0 or 'ann_min_rows' in params
+    if not matcher.transformer.available and uses_sbert:
+        return None   # only changes the SBERT side, which is off
+
+    t0 = time.perf_counter()
+    matcher.fit(docs)
+    fit_s = time.perf_counter() - t0
+
+    rankings, latencies = {}, []
+    for email, profile in profiles.items():
+        t0 = time.perf_counter()
+        matches = matcher.match(profile, top_k=len(docs))
+        latencies.append(time.perf_counter() - t0)
+        rankings[email] = companies_in_rank_order(matches, company_of)
+
+    return {
+        'fit_s': fit_s,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'rankings': rankings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline ranking-quality evaluation')
+    parser.add_argument('--from-db', action='store_true', help='profiles + corpus from the app database')
+    parser.add_argument('--profiles', help='JSON file {email: profile}')
+    parser.add_argument('--stub-sbert', action='store_true', help='use the deterministic stub encoder')
+    parser.add_argument('--k', type=int, nargs='+', default=[1, 3, 5])
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+
+    loader = MatchingLoader()
+    truth = loader.ground_truth()
+
+    if args.stub_sbert:
+        from benchmarks.synthetic import StubEncoder
+        service._cached_sbert_model = StubEncoder()
+
+    if args.from_db:
+        docs, company_of, profiles = load_db_corpus_and_profiles(truth)
+        source = 'database'
+    else:
+        docs, company_of = load_csv_corpus()
+        if args.profiles:
+            with open(args.profiles) as f:
+                profiles = {e.strip().lower(): p for e, p in json.load(f).items()}
+            source = args.profiles
+        else:
+            profiles = proxy_profiles(loader)
+            source = 'proxy (historical categories)'
+    profiles = {e: p for e, p in profiles.items() if e in truth}
+
+    print(f"students={len(profiles)}/{len(truth)} internships={len(docs)} profiles={source}")
+    if not profiles or not docs:
+        print("Nothing to evaluate.")
+        return
+
+    metric_names = [f'{m}@{k}' for k in args.k for m in ('recall', 'ndcg')] + ['mrr']
+    print(f"{'config':<34}" + ''.join(f'{m:>10}' for m in metric_names) + f"{'fit s':>8}{'p50 ms':>8}{'p95 ms':>8}")
+    results = []
+    for config in CONFIGS:
+        run = run_config(config, docs, company_of, profiles)
+        if run is None:
+            print(f"{config['name']:<34}  (skipped: SBERT not available)")
+            continue
+        metrics = evaluate_rankings(run['rankings'], truth, args.k)
+        results.append({'config': config['name'], **metrics,
+                        'fit_s': run['fit_s'], 'p50_ms': run['p50_ms'], 'p95_ms': run['p95_ms']})
+        print(f"{config['name']:<34}" + ''.join(f'{metrics[m]:>10.3f}' for m in metric_names) +
+              f"{run['fit_s']:>8.3f}{run['p50_ms']:>8.2f}{run['p95_ms']:>8.2f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'profiles': source, 'results': results}, f, indent=2, default=str)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Synthetic corpora and a stub SBERT encoder for the matching benchmarks.
+
+Internships are shaped like internships.csv (type, location, free-text
+description, comma-separated requirements) and are assembled from sentences,
+types and locations taken from that file plus a fixed skill vocabulary, so
+text lengths and vocabulary overlap stay realistic at any scale.
+Everything is seeded: the same arguments always give the same corpus.
+"""
+import csv
+import os
+import re
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SKILLS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Vue', 'Node.js', 'Flask',
+    'Django', 'Spring', 'SQL', 'PostgreSQL', 'MongoDB', 'Docker', 'Kubernetes', 'AWS', 'Azure',
+    'Git', 'Linux', 'C++', 'C#', '.NET', 'Flutter', 'Kotlin', 'Swift', 'Figma', 'Photoshop',
+    'Illustrator', 'Excel', 'Power BI', 'Tableau', 'pandas', 'TensorFlow', 'PyTorch',
+    'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision', 'Networking', 'Cybersecurity',
+    'SEO', 'Content Writing', 'Social Media', 'Marketing', 'Sales', 'Accounting', 'Communication',
+    'Problem Solving', 'Teamwork', 'Testing', 'Selenium', 'REST APIs', 'HTML', 'CSS',
+]
+MAJORS = [
+    'Computer Science', 'Computer Engineering', 'Information Systems', 'Data Science',
+    'Business Administration', 'Marketing', 'Graphic Design', 'Electrical Engineering',
+    'Mechanical Engineering', 'Accounting', 'Statistics', 'Mass Communication',
+]
+INTERESTS = [
+    'web development', 'mobile apps', 'artificial intelligence', 'data analysis', 'cloud',
+    'startups', 'fintech', 'ui ux design', 'cybersecurity', 'e-commerce', 'gaming',
+    'digital marketing', 'open source', 'robotics', 'healthcare', 'education',
+]
+
+
+def _load_seed_rows() -> List[Dict]:
+    with open(os.path.join(BASE_DIR, 'internships.csv'), encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f))
+
+
+def _seed_pools():
+    rows = _load_seed_rows()
+    sentences = [
+        s.strip() + '.'
+        for r in rows
+        for s in re.split(r'(?<=[.!?])\s+', r.get('Description') or '')
+        if len(s.strip()) > 30
+    ]
+    types = sorted({(r.get('Type') or '').strip() for r in rows if (r.get('Type') or '').strip()})
+    locations = sorted({
+        (r.get('Location') or '').strip() for r in rows
+        if (r.get('Location') or '').strip().strip('-')
+    })
+    return sentences, types, locations
+
+
+def make_internships(n: int, seed: int = 0) -> List[Dict]:
+    """n internship dicts in the shape HybridMatcher.fit expects."""
+    rng = np.random.default_rng(seed)
+    sentences, types, locations = _seed_pools()
+    internships = []
+    for i in range(n):
+        kind = types[rng.integers(len(types))]
+        skills = list(rng.choice(SKILLS, size=rng.integers(3, 8), replace=False))
+        description = ' '.join(rng.choice(sentences, size=rng.integers(2, 5), replace=False))
+        internships.append({
+            'id': i + 1,
+            'title': f'{kind.title()} Intern',
+            'description': f'{description} You will work with {", ".join(skills[:3])}.',
+            'skills': ' '.join(skills),
+            'requirements': ', '.join(skills[:4]),
+            'major': MAJORS[rng.integers(len(MAJORS))],
+            'location': locations[rng.integers(len(locations))],
+        })
+    return internships
+
+
+def make_students(n: int, seed: int = 1) -> List[Dict]:
+    """n student profiles in the shape build_student_profile returns."""
+    rng = np.random.default_rng(seed)
+    sentences, _, _ = _seed_pools()
+    students = []
+    for _ in range(n):
+        skills = list(rng.choice(SKILLS, size=rng.integers(2, 9), replace=False))
+        students.append({
+            'skills': skills,
+            'interests': list(rng.choice(INTERESTS, size=rng.integers(1, 4), replace=False)),
+            'bio': f'Student interested in {" and ".join(skills[:2])}.',
+            'major': MAJORS[rng.integers(len(MAJORS))],
+            'cv_text': ' '.join(rng.choice(sentences, size=rng.integers(0, 3), replace=False)),
+        })
+    return students
+
+
+class StubEncoder:
+    """
+    Deterministic stand-in for SentenceTransformer.encode: a normalised sum of
+    per-token random vectors (seeded by crc32 of the token). Similar texts get
+    similar vectors, and no model download or GPU is needed.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._token_vectors: Dict[str, np.ndarray] = {}
+
+    def _token(self, token: str) -> np.ndarray:
+        vec = self._token_vectors.get(token)
+        if vec is None:
+            vec = np.random.default_rng(zlib.crc32(token.encode('utf-8'))).standard_normal(self.dim)
+            vec = vec.astype(np.float32)
+            self._token_vectors[token] = vec
+        return vec
+
+    def encode(self, texts, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = True, **kwargs):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in re.findall(r'[a-z0-9+#]+', text.lower()):
+                out[i] += self._token(token)
+        if normalize_embeddings:
+            out /= np.linalg.norm(out, axis=1, keepdims=True) + 1e-12
+        return out
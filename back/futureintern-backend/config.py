@@ -81,6 +81,56 @@ class Config:
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o-mini')
 
+    # AI matching: on-disk SBERT embedding cache shared by all gunicorn workers
+    # (set EMBEDDING_CACHE_DIR to an empty string to disable)
+    EMBEDDING_CACHE_DIR = os.environ.get('EMBEDDING_CACHE_DIR', os.path.join(basedir, 'instance', 'embeddings'))
+    # Switch SBERT scoring to the approximate IVF index once the catalogue reaches
+    # this many internships (0 = always exact). NPROBE: more lists = better recall, slower.
+    MATCHING_ANN_MIN_ROWS = int(os.environ.get('MATCHING_ANN_MIN_ROWS', 20000))
+    MATCHING_ANN_NPROBE = int(os.environ.get('MATCHING_ANN_NPROBE', 8))
+    # Encoded student queries kept per worker (LRU, keyed by profile text hash)
+    MATCHING_QUERY_CACHE_SIZE = int(os.environ.get('MATCHING_QUERY_CACHE_SIZE', 2048))
+    # Background threads per worker for POST /api/recommendations/jobs
+    MATCHING_JOB_WORKERS = int(os.environ.get('MATCHING_JOB_WORKERS', 2))
+    MATCHING_JOB_TIMEOUT = int(os.environ.get('MATCHING_JOB_TIMEOUT', 300))
+    # In-memory corpus embedding precision: float32 | float16 (½ memory) | int8 (¼ memory)
+    MATCHING_EMBEDDING_DTYPE = os.environ.get('MATCHING_EMBEDDING_DTYPE', 'float32')
+    # Embedding backends tried in order: sbert (torch) | onnx (onnxruntime + tokenizers) | static (numpy)
+    EMBEDDING_BACKENDS = os.environ.get('EMBEDDING_BACKENDS', 'sbert,onnx,static')
+    EMBEDDING_ONNX_DIR = os.environ.get('EMBEDDING_ONNX_DIR', os.path.join(basedir, 'instance', 'onnx', 'all-MiniLM-L6-v2'))
+    EMBEDDING_STATIC_PATH = os.environ.get('EMBEDDING_STATIC_PATH', os.path.join(basedir, 'instance', 'static_vectors.npz'))
+    # Load the embedding backend and fit the internship index in create_app() (set by
+    # gunicorn.conf.py so it happens once in the master and is shared copy-on-write)
+    MATCHING_PRELOAD = os.environ.get('MATCHING_PRELOAD', 'false').lower() in ['true', '1']
+
+    # Internship keyword search (app/internships/search.py): auto | fts5 | postgres | python
+    # auto = fts5 on SQLite, tsvector on PostgreSQL; python is the in-process fallback
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+
+    # Shared result cache (app/utils/cache.py): memory | sqlite | redis
+    # sqlite shares one file between gunicorn workers; redis needs the `redis` package.
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
+    CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', os.path.join(basedir, 'instance', 'cache.sqlite3'))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 10000))
+
+    # Rate limit counters (app/utils/rate_limiter.py): memory | sqlite | redis
+    # sqlite/redis share the limit between gunicorn workers (sqlite uses CACHE_SQLITE_PATH)
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'sqlite')
+
+    # Audit log writer (app/utils/audit_writer.py): entries are queued and bulk-inserted
+    # by a background thread. AUDIT_OVERFLOW (queue full): sync | block | drop
+    AUDIT_ASYNC = os.environ.get('AUDIT_ASYNC', 'true').lower() in ['true', '1']
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 500))
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+    AUDIT_OVERFLOW = os.environ.get('AUDIT_OVERFLOW', 'sync')
+
+    # Admin dashboard stats are cached this many seconds (0 = always recompute)
+    ADMIN_STATS_TTL = int(os.environ.get('ADMIN_STATS_TTL', 30))
+    # Public company directory pages are cached this many seconds (0 = no cache)
+    COMPANY_DIRECTORY_TTL = int(os.environ.get('COMPANY_DIRECTORY_TTL', 60))
+
     # Hugging Face (primary AI chatbot)
     # Qwen2.5-7B is fast on free tier while still highly capable
     HUGGINGFACE_API_KEY = os.environ.get('HUGGINGFACE_API_KEY')
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings (picked up automatically from the working directory, so the
+Procfile / start.sh command lines only need the worker count and bind address).
+
+preload_app builds the Flask app once in the master. With MATCHING_PRELOAD set,
+create_app() also loads the embedding backend and fits the internship index
+there (app/matching/preload.py), and every worker — including ones restarted
+later — is forked with those pages already in memory, shared copy-on-write.
+Set MATCHING_PRELOAD=0 to go back to one app, model and index per worker.
+
+Per-worker memory: GET /api/matching/health
+
+worker_exit stops the recommendation job pool (app/matching/jobs.py; jobs that
+cannot finish are refunded) and drains the background audit log queue
+(app/utils/audit_writer.py) before a worker stops.
+"""
+import os
+
+os.environ.setdefault('MATCHING_PRELOAD', '1')
+
+preload_app = os.environ['MATCHING_PRELOAD'].lower() in ('true', '1')
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app.matching.preload import after_fork
+        after_fork()
+
+
+def worker_exit(server, worker):
+    from app.matching.jobs import shutdown_jobs
+    from app.utils.audit_writer import shutdown_audit_writer
+    shutdown_jobs()
+    shutdown_audit_writer()
@@ -0,0 +1,27 @@
+"""
+Precompute AI internship recommendations for all students.
+Intended to run nightly (cron / Railway scheduled job); results are stored in
+the recommendation_results table and served by /api/recommendations until the
+student's profile or the internship catalogue changes.
+
+Run with: python precompute_recommendations.py [--top-k 10] [--csv results.csv]
+"""
+import argparse
+
+from app import create_app
+from app.matching.batch import precompute_recommendations
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument('--top-k', type=int, default=10, help='recommendations stored per student')
+parser.add_argument('--chunk-size', type=int, default=256, help='students scored per matrix multiply')
+parser.add_argument('--csv', dest='csv_path', help='also export results to this CSV file')
+args = parser.parse_args()
+
+app = create_app()
+
+with app.app_context():
+    summary = precompute_recommendations(top_k=args.top_k, chunk_size=args.chunk_size, csv_path=args.csv_path)
+    print(f"✅ Stored {summary['results_written']} recommendations for {summary['students']} students "
+          f"over {summary['internships']} internships in {summary['total_seconds']}s")
+    if args.csv_path:
+        print(f"   CSV written to {args.csv_path}")
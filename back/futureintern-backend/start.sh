@@ -71,6 +71,6 @@ else:
         print(f'Admin verify error (non-fatal): {e}')
 "
 
-# Start Gunicorn with the PORT variable
-exec gunicorn -w 2 -b "0.0.0.0:$PORT" --timeout 120 --access-logfile - --error-logfile - run:app
+# Start Gunicorn with the PORT variable (gunicorn.conf.py preloads the matching models once)
+exec gunicorn -c gunicorn.conf.py -w 2 -b "0.0.0.0:$PORT" --timeout 120 --access-logfile - --error-logfile - run:app
 
@@ -1,4 +1,16 @@
+import os
+import tempfile
+
 import pytest
+
+# Point the app at a throwaway SQLite file, embedding cache and result cache before config.py
+# is imported, so tests never touch the local development data.
+_db_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_db_fd)
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{_db_path}')
+os.environ.setdefault('EMBEDDING_CACHE_DIR', tempfile.mkdtemp(prefix='embeddings-'))
+os.environ.setdefault('CACHE_SQLITE_PATH', os.path.join(tempfile.mkdtemp(prefix='cache-'), 'cache.sqlite3'))
+
 from app import create_app
 
 
@@ -0,0 +1,142 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def test_admin_listings_use_a_constant_number_of_queries(app, client):
+    from flask_jwt_extended import create_access_token
+    from app.models import db
+    from app.models.application import Application
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    with app.app_context():
+        admin = User(email='n1-admin@example.com', name='Admin', role='admin')
+        company = User(email='n1-co@example.com', name='Co', role='company', company_name='N1 Co')
+        db.session.add_all([admin, company])
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'admin', 'email': admin.email})
+        company_id, created_users = company.id, [admin.id, company.id]
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def add_rows(n):
+        with app.app_context():
+            for k in range(n):
+                student = User(email=f'n1-student-{len(created_users)}-{k}@example.com', name='S', role='student')
+                internship = Internship(title='N1 Intern', description='d', company_id=company_id)
+                db.session.add_all([student, internship])
+                db.session.flush()
+                db.session.add(Application(student_id=student.id, internship_id=internship.id))
+                created_users.append(student.id)
+            db.session.commit()
+
+    def queries_for(path):
+        with app.app_context():
+            with count_queries(db.engine) as statements:
+                resp = client.get(path, headers=headers)
+        assert resp.status_code == 200
+        return len(statements), resp
+
+    try:
+        add_rows(2)
+        queries_for('/api/admin/ping')   # the first authenticated request syncs the revocation cache
+        small = {p: queries_for(p)[0] for p in ('/api/admin/applications', '/api/admin/internships')}
+        add_rows(10)
+        for path, count in small.items():
+            assert queries_for(path)[0] == count, path
+
+        count, resp = queries_for('/api/admin/applications')
+        rows = [r for r in resp.get_json() if r['company_name'] == 'N1 Co']
+        assert len(rows) == 12 and rows[0]['student_name'] == 'S' and rows[0]['internship_title'] == 'N1 Intern'
+
+        _, page = queries_for('/api/admin/internships?page=2&per_page=5')
+        assert len(page.get_json()) == 5 and page.headers['X-Page'] == '2'
+        assert int(page.headers['X-Total-Count']) >= 12
+    finally:
+        with app.app_context():
+            intern_ids = [i.id for i in Internship.query.filter_by(company_id=company_id)]
+            Application.query.filter(Application.internship_id.in_(intern_ids)).delete()
+            Internship.query.filter_by(company_id=company_id).delete()
+            User.query.filter(User.id.in_(created_users)).delete()
+            db.session.commit()
+
+
+def test_admin_stats_are_grouped_and_cached(app, client):
+    from flask_jwt_extended import create_access_token
+    from app.admin.stats import clear_stats_cache
+    from app.models import db
+    from app.models.application import Application
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    with app.app_context():
+        admin = User(email='stats-admin@example.com', name='Admin', role='admin')
+        company = User(email='stats-co@example.com', name='Co', role='company', company_name='Stats Co')
+        student = User(email='stats-student@example.com', name='S', role='student', points=7)
+        db.session.add_all([admin, company, student])
+        db.session.flush()
+        internship = Internship(title='Stats Intern', description='d', company_id=company.id)
+        db.session.add(internship)
+        db.session.flush()
+        db.session.add(Application(student_id=student.id, internship_id=internship.id, status='accepted'))
+        db.session.commit()
+        token = create_access_token(identity=str(admin.id), additional_claims={'role': 'admin', 'email': admin.email})
+        user_ids, company_id = [admin.id, company.id, student.id], company.id
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def get(path):
+        with app.app_context():
+            with count_queries(db.engine) as statements:
+                resp = client.get(path, headers=headers)
+        assert resp.status_code == 200, resp.get_json()
+        return len(statements), resp.get_json()
+
+    try:
+        clear_stats_cache()
+        with app.app_context():
+            expected = {
+                'total_users': User.query.count(),
+                'total_internships': Internship.query.count(),
+                'total_applications': Application.query.count(),
+                'pending_verifications': User.query.filter_by(role='company', is_verified=False).count(),
+            }
+            accepted = Application.query.filter_by(status='accepted').count()
+            points = db.session.query(db.func.sum(User.points)).filter(User.role == 'student').scalar()
+
+        queries, body = get('/api/admin/stats')
+        assert {k: body[k] for k in expected} == expected
+        assert body['applications']['accepted'] == accepted
+        assert queries <= 8   # previously one COUNT(*) per number
+        cached_queries, cached = get('/api/admin/stats')
+        assert cached == body and cached_queries <= queries - 5   # only the auth lookups remain
+
+        _, analytics = get('/api/admin/analytics?fresh=1')
+        assert analytics['overview']['total_applications'] == expected['total_applications']
+        _, points_body = get('/api/admin/points/stats')
+        assert points_body['total_points_in_circulation'] == points
+
+        # A write through the admin API invalidates the cached numbers
+        resp = client.post(f'/api/admin/companies/{company_id}/verify', headers=headers)
+        assert resp.status_code == 200
+        assert get('/api/admin/stats')[1]['pending_verifications'] == expected['pending_verifications'] - 1
+    finally:
+        clear_stats_cache()
+        with app.app_context():
+            Application.query.filter(Application.student_id.in_(user_ids)).delete()
+            Internship.query.filter_by(company_id=company_id).delete()
+            User.query.filter(User.id.in_(user_ids)).delete()
+            db.session.commit()
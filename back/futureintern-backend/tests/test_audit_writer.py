@@ -0,0 +1,85 @@
+def _rows(n, action):
+    from datetime import datetime
+    return [{'user_id': None, 'action': action, 'resource': 'test', 'resource_id': i, 'details': None,
+             'ip_address': '127.0.0.1', 'user_agent': 'pytest', 'created_at': datetime.utcnow()}
+            for i in range(n)]
+
+
+def _count(app, action):
+    from app.models.audit_log import AuditLog
+    with app.app_context():
+        return AuditLog.query.filter_by(action=action).count()
+
+
+def _cleanup(app, action):
+    from app.models import db
+    from app.models.audit_log import AuditLog
+    with app.app_context():
+        AuditLog.query.filter_by(action=action).delete()
+        db.session.commit()
+
+
+def test_writer_batches_in_background_and_drains_on_shutdown(app):
+    from app.utils.audit_writer import AuditWriter
+
+    writer = AuditWriter(maxsize=100, batch_size=50, flush_interval=0.05)
+    try:
+        for row in _rows(120, 'audit_batch_test'):
+            writer.submit(row, app)
+        assert writer.flush(timeout=5)
+        assert _count(app, 'audit_batch_test') == 120
+        stats = writer.stats()
+        assert stats['written'] + stats['inline'] == 120 and stats['dropped'] == 0
+
+        # Queued entries still reach the table on graceful shutdown
+        slow = AuditWriter(maxsize=100, batch_size=10, flush_interval=30)
+        for row in _rows(25, 'audit_shutdown_test'):
+            slow.submit(row, app)
+        slow.shutdown()
+        assert _count(app, 'audit_shutdown_test') == 25
+    finally:
+        writer.shutdown()
+        _cleanup(app, 'audit_batch_test')
+        _cleanup(app, 'audit_shutdown_test')
+
+
+def test_full_queue_follows_the_overflow_policy(app):
+    from app.utils.audit_writer import AuditWriter
+
+    dropping = AuditWriter(maxsize=5, batch_size=5, flush_interval=30, overflow='drop')
+    inline = AuditWriter(maxsize=5, batch_size=5, flush_interval=30, overflow='sync')
+    try:
+        # At most 10 rows fit: 5 in the queue plus 5 in the batch the writer is waiting to fill
+        for row in _rows(12, 'audit_overflow_drop'):
+            dropping.submit(row, app)
+        for row in _rows(12, 'audit_overflow_sync'):
+            inline.submit(row, app)
+        assert dropping.stats()['dropped'] >= 2
+        assert inline.stats()['dropped'] == 0 and inline.stats()['inline'] >= 2
+    finally:
+        dropping.shutdown()
+        inline.shutdown()
+        assert _count(app, 'audit_overflow_sync') == 12
+        assert _count(app, 'audit_overflow_drop') == 12 - dropping.stats()['dropped']
+        _cleanup(app, 'audit_overflow_drop')
+        _cleanup(app, 'audit_overflow_sync')
+
+
+def test_log_audit_does_not_commit_the_request_session(app, client):
+    from app.models import db
+    from app.models.user import User
+    from app.utils.audit_writer import flush_audit_log
+    from app.utils.logger import log_audit
+
+    with app.test_request_context('/'):
+        pending = User(email='audit-pending@example.com', name='P', role='student')
+        db.session.add(pending)
+        log_audit('audit_session_test', resource='user')
+        db.session.rollback()
+    assert flush_audit_log(timeout=5)
+    try:
+        with app.app_context():
+            assert User.query.filter_by(email='audit-pending@example.com').count() == 0
+        assert _count(app, 'audit_session_test') == 1
+    finally:
+        _cleanup(app, 'audit_session_test')
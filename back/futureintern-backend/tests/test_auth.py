@@ -1,3 +1,6 @@
+import time
+
+
 def test_login_invalid(client):
     # Attempt to login with invalid credentials -> expect 401 or error message
     resp = client.post('/api/auth/login', json={'email': 'noone@test', 'password': 'wrong'})
@@ -5,3 +8,92 @@ def test_login_invalid(client):
     data = resp.get_json()
     assert data is not None
     assert 'error' in data or resp.status_code != 200
+
+
+
+def test_revocation_signal_is_read_at_most_once_per_interval(app, monkeypatch):
+    import app.auth.revocation as revocation
+
+    reads = []
+
+    class Signal:
+        def get(self, key):
+            reads.append(key)
+            return 'gen-1'
+
+        def add(self, key, value, ttl):
+            return False
+
+    monkeypatch.setattr(revocation, '_signal', Signal)
+    cache = revocation.RevocationCache()
+    with app.app_context():
+        for _ in range(5):
+            assert not cache.is_revoked('unknown-jti')
+        assert reads == ['generation']
+
+        cache.SIGNAL_INTERVAL = 0
+        cache.is_revoked('unknown-jti')
+        assert len(reads) == 2
+
+def test_revoked_tokens_are_checked_without_db_queries(app, client):
+    from datetime import datetime, timedelta
+    from flask_jwt_extended import create_access_token, decode_token
+    from sqlalchemy import event
+    from app.auth.revocation import RevocationCache, get_revocation_cache, prune_expired
+    from app.models import db
+    from app.models.token_blacklist import TokenBlacklist
+    from app.models.user import User
+
+    with app.app_context():
+        user = User(email='revoke@example.com', name='R', role='student')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token = create_access_token(identity=str(user_id), additional_claims={'role': 'student', 'email': user.email})
+        jti = decode_token(token)['jti']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    blacklist_queries = []
+
+    def count(conn, cursor, statement, *args):
+        if 'token_blacklist' in statement:
+            blacklist_queries.append(statement)
+
+    try:
+        assert client.get('/api/users/me', headers=headers).status_code == 200
+        other_worker = RevocationCache()
+        other_worker.SIGNAL_INTERVAL = 0.05
+        with app.app_context():
+            assert not other_worker.is_revoked(jti)
+
+        assert client.post('/api/auth/logout', headers=headers).status_code == 200
+        with app.app_context():
+            row = TokenBlacklist.query.filter_by(jti=jti).one()
+            assert row.expires_at > datetime.utcnow()
+            # Another worker sees the revocation through the shared generation signal
+            # once its last read of that signal is SIGNAL_INTERVAL old
+            time.sleep(0.06)
+            assert other_worker.is_revoked(jti)
+            # This worker syncs once after its own revocation, then answers from memory
+            assert client.get('/api/users/me', headers=headers).status_code == 401
+
+            event.listen(db.engine, 'before_cursor_execute', count)
+            try:
+                for _ in range(3):
+                    assert client.get('/api/users/me', headers=headers).status_code == 401
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count)
+        assert blacklist_queries == []
+
+        with app.app_context():
+            db.session.add(TokenBlacklist(jti='expired-jti', token_type='access', user_id=user_id,
+                                          expires_at=datetime.utcnow() - timedelta(minutes=1)))
+            db.session.commit()
+            assert prune_expired() == 1
+            assert TokenBlacklist.query.filter_by(jti=jti).count() == 1
+    finally:
+        with app.app_context():
+            TokenBlacklist.query.filter_by(user_id=user_id).delete()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+            get_revocation_cache().reset()
@@ -0,0 +1,60 @@
+import time
+
+from app.utils.cache import MemoryCache, SQLiteCache
+
+
+def test_memory_cache_ttl_and_lru_bound():
+    cache = MemoryCache('t', max_entries=2)
+    cache.set('a', 1, ttl=60)
+    cache.set('b', 2, ttl=60)
+    cache.get('a')                  # 'b' is now least recently used
+    cache.set('c', 3, ttl=60)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    cache.set('short', 'x', ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('short') is None
+
+
+def test_sqlite_claim_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    worker_a, worker_b = SQLiteCache('recs', path), SQLiteCache('recs', path)
+
+    assert worker_a.add(7, {'pending': True}, ttl=60)
+    assert not worker_b.add(7, {'pending': True}, ttl=60)
+    assert worker_b.get(7) == {'pending': True}
+
+    worker_a.set(7, {'result': [1, 2]}, ttl=60)
+    assert worker_b.get(7) == {'result': [1, 2]}
+
+    # Expired claims can be taken over; other namespaces are independent
+    worker_a.set(8, {'pending': True}, ttl=-1)
+    assert worker_b.add(8, {'pending': True}, ttl=60)
+    assert SQLiteCache('other', path).get(7) is None
+
+
+def test_sqlite_prune_keeps_most_recently_used(tmp_path):
+    cache = SQLiteCache('recs', str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    cache.TOUCH_INTERVAL = 0
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key, ttl=60)
+        time.sleep(0.01)
+    cache.get('a')
+    cache.prune()
+    assert cache.get('b') is None
+    assert cache.get('a') == 'a' and cache.get('c') == 'c'
+
+
+def test_sqlite_hits_only_touch_entries_once_per_interval(tmp_path):
+    cache = SQLiteCache('recs', str(tmp_path / 'cache.sqlite3'))
+    cache.set('a', 1, ttl=60)
+    conn = cache._conn()
+    writes = conn.total_changes
+    for _ in range(5):
+        assert cache.get('a') == 1
+    assert conn.total_changes == writes
+
+    cache.TOUCH_INTERVAL = 0
+    cache.get('a')
+    assert conn.total_changes == writes + 1
@@ -0,0 +1,217 @@
+import os
+
+import pytest
+
+
+def test_listing_cursor_pages_and_field_projection(app, client):
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    with app.app_context():
+        company = User(name='Listing Co', email='listing@acme.test', role='company')
+        db.session.add(company)
+        db.session.commit()
+        company_id = company.id
+        rows = [
+            Internship(title=f'{n}. Intern {n}', description='d', location='Remote' if n % 2 else 'Cairo',
+                       company_id=company_id)
+            for n in range(1, 6)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        ours = {r.id for r in rows}
+
+        # Derived fields are stored on write and follow edits
+        assert rows[0].display_title == 'Intern 1' and rows[0].work_type == 'Remote'
+        rows[1].title = '9. Renamed'
+        db.session.commit()
+        assert rows[1].display_title == 'Renamed'
+
+    try:
+        seen, cursor = [], ''
+        while cursor is not None:
+            data = client.get(f'/api/internships/?cursor={cursor}&per_page=2&fields=id,title,type').get_json()
+            assert len(data['internships']) <= 2
+            seen += data['internships']
+            cursor = data['next_cursor']
+        ids = [i['id'] for i in seen]
+        assert ids == sorted(set(ids)) and ours <= set(ids)
+        assert set(seen[0]) == {'id', 'title', 'type'}
+        titles = {i['title'] for i in seen if i['id'] in ours}
+        assert 'Renamed' in titles and 'Intern 1' in titles
+
+        full = client.get('/api/internships/?page=1&per_page=100').get_json()
+        assert full['total'] >= 5 and 'company' in full['internships'][0]
+
+        assert client.get('/api/internships/?fields=id,password').status_code == 400
+        assert client.get('/api/internships/?cursor=not-a-cursor').status_code == 400
+    finally:
+        with app.app_context():
+            Internship.query.filter(Internship.company_id == company_id).delete()
+            User.query.filter_by(id=company_id).delete()
+            db.session.commit()
+
+
+def test_search_ranks_and_follows_writes(app, client, monkeypatch):
+    import app.internships.search as search
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+    from config import Config
+
+    with app.app_context():
+        company = User(name='Search Co', email='search@acme.test', role='company')
+        db.session.add(company)
+        db.session.commit()
+        company_id = company.id
+        title_hit = Internship(title='Zylophone Developer Intern', description='Build APIs', company_id=company_id)
+        body_hit = Internship(title='Backend Intern', description='Some zylophone tooling',
+                              location='Remote', company_id=company_id)
+        # Unrelated rows so the term is rare enough for BM25's IDF to count
+        filler = [Internship(title=f'Filler {n}', description='Nothing relevant', company_id=company_id)
+                  for n in range(4)]
+        db.session.add_all([title_hit, body_hit] + filler)
+        db.session.commit()
+        title_id, body_id = title_hit.id, body_hit.id
+
+    try:
+        backends = {}
+        for backend in ('fts5', 'python'):
+            monkeypatch.setattr(Config, 'SEARCH_BACKEND', backend, raising=False)
+            with app.app_context():
+                backends[backend] = search.init_search()
+                assert backends[backend].name == backend
+
+            data = client.get('/api/internships/search?q=zylo').get_json()
+            assert [i['id'] for i in data['internships']] == [title_id, body_id]
+            assert data['internships'][0]['score'] > data['internships'][1]['score']
+            assert [i['id'] for i in client.get('/api/internships/search?q=zylo devel').get_json()['internships']] \
+                == [title_id]
+            assert [i['id'] for i in client.get('/api/internships/search?q=zylo&type=Remote').get_json()
+                    ['internships']] == [body_id]
+
+        with app.app_context():
+            db.session.get(Internship, title_id).title = 'Marimba Intern'
+            db.session.delete(db.session.get(Internship, body_id))
+            db.session.commit()
+        # Same instances as before the writes: FTS5 follows through its triggers,
+        # the python index through its incremental sync()
+        monkeypatch.setattr(search.PythonSearch, 'SYNC_INTERVAL', 0)
+        for backend in ('fts5', 'python'):
+            search._backend = backends[backend]
+            assert client.get('/api/internships/search?q=zylophone').get_json()['total'] == 0
+            assert [i['id'] for i in client.get('/api/internships/search?q=marimba').get_json()['internships']] \
+                == [title_id]
+        assert body_id not in backends['python']._versions
+        assert client.get('/api/internships/search').status_code == 400
+    finally:
+        with app.app_context():
+            Internship.query.filter(Internship.company_id == company_id).delete()
+            User.query.filter_by(id=company_id).delete()
+            db.session.commit()
+            search._backend = None
+
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason='set TEST_POSTGRES_URL to check the tsvector backend')
+def test_postgres_search_ranks_and_follows_writes(monkeypatch):
+    from app import create_app
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+    import app.internships.search as search
+    from config import Config
+
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', os.environ['TEST_POSTGRES_URL'])
+    monkeypatch.setattr(Config, 'SEARCH_BACKEND', 'postgres', raising=False)
+    monkeypatch.setattr(search, '_backend', None)
+    pg_app = create_app()
+    client = pg_app.test_client()
+
+    with pg_app.app_context():
+        assert search.get_search_backend().name == 'postgres'
+        company = User(name='PG Search Co', email='pg-search@acme.test', role='company')
+        db.session.add(company)
+        db.session.commit()
+        company_id = company.id
+        title_hit = Internship(title='Zylophone Developer Intern', description='Build APIs', company_id=company_id)
+        body_hit = Internship(title='Backend Intern', description='Some zylophone tooling', company_id=company_id)
+        db.session.add_all([title_hit, body_hit])
+        db.session.commit()
+        title_id, body_id = title_hit.id, body_hit.id
+
+    try:
+        data = client.get('/api/internships/search?q=zylo').get_json()
+        assert [i['id'] for i in data['internships']] == [title_id, body_id]
+        assert data['internships'][0]['score'] > data['internships'][1]['score']
+
+        with pg_app.app_context():
+            db.session.get(Internship, title_id).title = 'Marimba Intern'
+            db.session.delete(db.session.get(Internship, body_id))
+            db.session.commit()
+        assert client.get('/api/internships/search?q=zylophone').get_json()['total'] == 0
+        assert [i['id'] for i in client.get('/api/internships/search?q=marimba').get_json()['internships']] \
+            == [title_id]
+    finally:
+        with pg_app.app_context():
+            Internship.query.filter(Internship.company_id == company_id).delete()
+            User.query.filter_by(id=company_id).delete()
+            db.session.commit()
+
+
+def test_facet_counts_follow_writes_and_filter_the_listing(app, client):
+    import sqlalchemy as sa
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    def counts(query=''):
+        facets = client.get(f'/api/internships/facets?limit=0{query}').get_json()['facets']
+        return {f: {i['value']: i['count'] for i in items} for f, items in facets.items()}
+
+    with app.app_context():
+        company = User(name='Facet Co', email='facets@acme.test', role='company', company_name='Facet Co')
+        db.session.add(company)
+        db.session.commit()
+        company_id = company.id
+        rows = [
+            Internship(title='A', description='d', location='Facetville', major='Physics', company_id=company_id),
+            Internship(title='B', description='d', location='Facetville', duration='Part time', company_id=company_id),
+            Internship(title='C', description='d', location='Otherburg', major='Physics', company_id=company_id),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        ids = [r.id for r in rows]
+
+    try:
+        c = counts()
+        assert c['location']['Facetville'] == 2 and c['location']['Otherburg'] == 1
+        assert c['company'][str(company_id)] == 3
+        company_facet = client.get('/api/internships/facets?limit=0').get_json()['facets']['company']
+        assert {'value': str(company_id), 'count': 3, 'label': 'Facet Co'} in company_facet
+
+        # Drill-down: the location facet ignores its own filter, the others narrow
+        c = counts('&location=Facetville')
+        assert c['location']['Otherburg'] == 1 and c['type'] == {'Full-time': 1, 'Part-time': 1}
+
+        listed = client.get(f'/api/internships/?location=Facetville&location=Otherburg&major=Physics'
+                            f'&company={company_id}&fields=id').get_json()
+        assert sorted(i['id'] for i in listed['internships']) == [ids[0], ids[2]]
+
+        with app.app_context():
+            db.session.get(Internship, ids[0]).location = 'Otherburg'
+            db.session.get(Internship, ids[1]).is_active = False
+            db.session.commit()
+            db.session.execute(sa.text('DELETE FROM internships WHERE id = :id'), {'id': ids[2]})
+            db.session.commit()
+        c = counts()
+        assert 'Facetville' not in c['location'] and c['location']['Otherburg'] == 1
+        assert c['company'][str(company_id)] == 1
+
+        assert client.get('/api/internships/?company=acme').status_code == 400
+    finally:
+        with app.app_context():
+            Internship.query.filter(Internship.company_id == company_id).delete()
+            User.query.filter_by(id=company_id).delete()
+            db.session.commit()
@@ -0,0 +1,603 @@
+import os
+
+from app.matching.service import HybridMatcher
+
+
+INTERNSHIPS = [
+    {'id': 1, 'title': 'Backend Developer Intern', 'description': 'Build Flask APIs and SQL databases',
+     'skills': 'Python Flask SQL', 'requirements': 'Python, Flask', 'major': 'Computer Science'},
+    {'id': 2, 'title': 'Graphic Design Intern', 'description': 'Create brand visuals and social media posts',
+     'skills': 'Photoshop Illustrator', 'requirements': 'Adobe Photoshop', 'major': 'Design'},
+    {'id': 3, 'title': 'Data Analyst Intern', 'description': 'Analyse data with pandas and build dashboards',
+     'skills': 'Python pandas SQL', 'requirements': 'Excel, SQL', 'major': 'Statistics'},
+]
+
+STUDENT = {'skills': ['Python', 'Flask'], 'interests': ['APIs'], 'major': 'Computer Science'}
+
+
+def test_upsert_and_remove_without_refit():
+    matcher = HybridMatcher().fit(INTERNSHIPS[:2])
+    matcher.upsert(INTERNSHIPS[2])
+    assert len(matcher) == 3
+    assert {m['id'] for m in matcher.match(STUDENT, top_k=10)} == {1, 2, 3}
+
+    matcher.remove(1)
+    assert 1 not in matcher
+    assert 1 not in {m['id'] for m in matcher.match(STUDENT, top_k=10)}
+
+    # Re-adding an updated row replaces the retired one
+    matcher.upsert(dict(INTERNSHIPS[0], title='Senior Backend Intern'))
+    results = matcher.match(STUDENT, top_k=10)
+    assert [m['id'] for m in results].count(1) == 1
+    assert matcher.staleness > 0
+
+
+
+def test_snapshot_is_unaffected_by_later_writes():
+    matcher = HybridMatcher().fit(INTERNSHIPS[:2])
+    view = matcher.snapshot()
+    matcher.upsert(INTERNSHIPS[2])
+    matcher.remove(2)
+
+    assert {m['id'] for m in view.match(STUDENT, top_k=10)} == {1, 2}
+    assert {m['id'] for m in view.match(STUDENT, top_k=10, filters={'skills': ['sql']})} == {1}
+    assert {m['id'] for m in matcher.match(STUDENT, top_k=10)} == {1, 3}
+
+def test_index_follows_internship_writes(app):
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+    from app.matching.index import get_index, notify_internship_changed, notify_internship_removed
+
+    with app.app_context():
+        company = User(name='Acme', email='index-test@acme.test', role='company')
+        db.session.add(company)
+        db.session.commit()
+        rows = [
+            Internship(title=i['title'], description=i['description'],
+                       requirements=i['requirements'], major=i['major'], company_id=company.id)
+            for i in INTERNSHIPS
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+
+        index = get_index()
+        index.build()
+        assert len(index) >= 3
+
+        rows[1].is_active = False
+        db.session.commit()
+        notify_internship_changed(rows[1])
+        assert rows[1].id not in index.matcher
+
+        removed_id = rows[2].id
+        db.session.delete(rows[2])
+        db.session.commit()
+        notify_internship_removed(removed_id)
+        ids = {m['id'] for m in index.match(STUDENT, top_k=50)}
+        assert rows[0].id in ids and rows[1].id not in ids and removed_id not in ids
+
+        Internship.query.filter(Internship.company_id == company.id).delete()
+        db.session.delete(company)
+        db.session.commit()
+
+
+class CountingEncoder:
+    """Deterministic stand-in for SentenceTransformer that records what it encodes."""
+
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.seen = []
+
+    def encode(self, texts, **kwargs):
+        import numpy as np
+        self.seen.extend(texts)
+        rows = [np.random.default_rng(abs(hash(t)) % 2**32).normal(size=self.dim) for t in texts]
+        out = np.array(rows, dtype=np.float32).reshape(len(texts), self.dim)
+        return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+def test_embedding_store_encodes_each_text_once(tmp_path):
+    from app.matching.embedding_store import EmbeddingStore
+    from app.matching.service import TransformerMatcher
+    import app.matching.embedding_store as store_module
+
+    store_module._stores['stub-model'] = EmbeddingStore(str(tmp_path), 'stub-model')
+    encoder = CountingEncoder()
+    first = TransformerMatcher('stub-model', model=encoder).encode_corpus(['a', 'b'])
+    second = TransformerMatcher('stub-model', model=encoder).encode_corpus(['b', 'c', 'a'])
+
+    assert encoder.seen == ['a', 'b', 'c']
+    assert (second.corpus_embeddings[0] == first.corpus_embeddings[1]).all()
+
+    # A fresh store (another worker / restart) reads the same rows from disk
+    reopened = EmbeddingStore(str(tmp_path), 'stub-model')
+    assert len(reopened) == 3
+    store_module._stores.pop('stub-model')
+
+
+
+def test_embedding_store_compacts_rows_no_longer_in_the_corpus(tmp_path):
+    import numpy as np
+    from app.matching.embedding_store import EmbeddingStore
+
+    store = EmbeddingStore(str(tmp_path), 'stub-compact')
+    store.COMPACT_MIN_ROWS = 2
+    keys = [store.key(t) for t in 'abcde']
+    emb = CountingEncoder().encode(list('abcde'))
+    store.put_many(keys, emb)
+    reader = EmbeddingStore(str(tmp_path), 'stub-compact')   # another worker
+    assert len(reader.get_many(keys)) == 5
+
+    assert store.maybe_compact(keys[:3]) == 0          # 2 of 5 stale: under COMPACT_RATIO
+    assert store.maybe_compact(keys[3:]) == 3
+    assert store.generation == 1 and len(store) == 2
+    assert os.path.getsize(store._matrix_path) == 2 * 4 * emb.shape[1]
+
+    # The other worker re-opens the new generation and keeps appending to it
+    assert set(reader.get_many(keys)) == set(keys[3:])
+    assert np.allclose(reader.get_many([keys[4]])[keys[4]], emb[4])
+    reader.put_many([keys[0]], emb[:1])
+    assert set(store.get_many(keys)) == {keys[0], keys[3], keys[4]}
+
+def test_match_batch_agrees_with_single_match():
+    matcher = HybridMatcher().fit(INTERNSHIPS)
+    students = [STUDENT, {'skills': ['Photoshop'], 'interests': ['branding'], 'major': 'Design'}]
+    batch = matcher.match_batch(students, top_k=2, chunk_size=1)
+    for profile, results in zip(students, batch):
+        single = matcher.match(profile, top_k=2)
+        assert [r['id'] for r in results] == [r['id'] for r in single]
+        assert [r['match_score'] for r in results] == [r['match_score'] for r in single]
+
+
+def test_precomputed_recommendations_are_served_until_profile_changes(app):
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.recommendation import RecommendationResult
+    from app.models.user import User
+    from app.matching.batch import precompute_recommendations, load_stored_matches
+    from app.matching.profiles import build_student_profile
+
+    with app.app_context():
+        company = User(name='Batch Co', email='batch@co.test', role='company')
+        student = User(name='Sara', email='sara@batch.test', role='student',
+                       skills='Python, Flask', major='Computer Science')
+        db.session.add_all([company, student])
+        db.session.commit()
+        company_id, student_id = company.id, student.id
+        try:
+            db.session.add_all([
+                Internship(title=i['title'], description=i['description'], requirements=i['requirements'],
+                           major=i['major'], company_id=company.id)
+                for i in INTERNSHIPS
+            ])
+            db.session.commit()
+
+            summary = precompute_recommendations(top_k=2)
+            assert summary['results_written'] >= 2
+
+            profile = build_student_profile(student)
+            stored = load_stored_matches(student.id, profile, limit=2)
+            assert stored and stored[0]['match_rank'] == 1 and 'explanation' in stored[0]
+
+            # Deleting a stored internship leaves max(updated_at) as it was
+            db.session.delete(db.session.get(Internship, stored[1]['id']))
+            db.session.commit()
+            assert load_stored_matches(student.id, profile, limit=2) is None
+            assert load_stored_matches(student.id, profile, limit=1) is not None
+
+            student.skills = 'Photoshop'
+            db.session.commit()
+            assert load_stored_matches(student.id, build_student_profile(student), limit=2) is None
+        finally:
+            db.session.rollback()
+            RecommendationResult.query.delete()
+            Internship.query.filter_by(company_id=company_id).delete()
+            User.query.filter(User.id.in_([company_id, student_id])).delete()
+            db.session.commit()
+
+
+
+def test_precompute_scores_against_one_snapshot_while_the_index_changes(app, monkeypatch):
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.recommendation import RecommendationResult
+    from app.models.user import User
+    from app.matching.batch import precompute_recommendations
+    from app.matching.index import get_index
+    from app.matching.service import TFIDFMatcher
+
+    with app.app_context():
+        company = User(name='Snapshot Co', email='snapshot@co.test', role='company')
+        students = [User(name=f'S{i}', email=f's{i}@snapshot.test', role='student', skills='Python, SQL')
+                    for i in range(3)]
+        db.session.add_all([company, *students])
+        db.session.commit()
+        user_ids = [company.id] + [s.id for s in students]
+        try:
+            db.session.add_all([
+                Internship(title=i['title'], description=i['description'], requirements=i['requirements'],
+                           major=i['major'], company_id=company.id)
+                for i in INTERNSHIPS
+            ])
+            db.session.commit()
+            known = {i.id for i in Internship.query.filter_by(is_active=True)}
+
+            # A write served by another thread between the TF-IDF and SBERT scoring of a chunk
+            score_many = TFIDFMatcher.score_many
+            added = []
+
+            def score_and_write(self, queries):
+                scores = score_many(self, queries)
+                phantom = Internship(id=10_000 + len(added), title='Python SQL Intern', description='Python',
+                                     requirements='SQL', is_active=True, company_id=company.id)
+                get_index().upsert(phantom)
+                added.append(phantom.id)
+                return scores
+
+            monkeypatch.setattr(TFIDFMatcher, 'score_many', score_and_write)
+            summary = precompute_recommendations(top_k=2, chunk_size=1)
+
+            assert len(added) == 3 and summary['results_written'] == 6
+            assert {r.internship_id for r in RecommendationResult.query} <= known
+        finally:
+            for internship_id in added:
+                get_index().remove(internship_id)
+            db.session.rollback()
+            RecommendationResult.query.delete()
+            Internship.query.filter_by(company_id=company.id).delete()
+            User.query.filter(User.id.in_(user_ids)).delete()
+            db.session.commit()
+
+def test_admin_precompute_runs_as_a_job(app, client):
+    import time
+    from flask_jwt_extended import create_access_token
+    from app.models import db
+    from app.models.recommendation import RecommendationResult
+    from app.models.user import User
+
+    with app.app_context():
+        admin = User(name='Admin', email='precompute-admin@example.com', role='admin')
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+        token = create_access_token(identity=str(admin_id), additional_claims={'role': 'admin', 'email': admin.email})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    try:
+        started = client.post('/api/admin/recommendations/precompute', headers=headers, json={'top_k': 3})
+        assert started.status_code == 202
+        job_id = started.get_json()['job_id']
+
+        deadline = time.time() + 10
+        while True:
+            job = client.get(f'/api/admin/recommendations/precompute/{job_id}', headers=headers).get_json()
+            if job['status'] in ('done', 'failed') or time.time() > deadline:
+                break
+            time.sleep(0.05)
+        assert job['status'] == 'done' and job['result']['top_k'] == 3
+
+        # Finished: the next request starts a new run; student job ids are not served here
+        again = client.post('/api/admin/recommendations/precompute', headers=headers).get_json()
+        assert again['job_id'] != job_id
+        assert client.get('/api/admin/recommendations/precompute/unknown', headers=headers).status_code == 404
+    finally:
+        with app.app_context():
+            from app.matching.jobs import PRECOMPUTE_CLAIM
+            from app.utils.cache import get_cache
+            deadline = time.time() + 10
+            while get_cache('recommendation_jobs').get(PRECOMPUTE_CLAIM) and time.time() < deadline:
+                time.sleep(0.05)
+            RecommendationResult.query.delete()
+            User.query.filter_by(id=admin_id).delete()
+            db.session.commit()
+
+
+def test_top_k_indices_matches_full_sort():
+    import numpy as np
+    from app.matching.service import top_k_indices
+
+    scores = np.random.default_rng(0).random(500)
+    assert list(top_k_indices(scores, 10)) == list(np.argsort(-scores)[:10])
+    assert len(top_k_indices(scores, 1000)) == 500
+    assert len(top_k_indices(scores, 0)) == 0
+
+
+def test_ivf_index_full_probe_is_exact():
+    import numpy as np
+    from app.matching.ann import IVFIndex
+
+    rng = np.random.default_rng(0)
+    corpus = rng.normal(size=(400, 16)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    index = IVFIndex(n_lists=8).build(corpus[:300])
+    index.add(corpus[300:])
+
+    query = corpus[7]
+    rows, _ = index.search(query, corpus, top_k=5, n_probe=8)
+    assert list(rows) == list(np.argsort(-(corpus @ query))[:5])
+    assert len(index.search(query, corpus, top_k=5, n_probe=1)[0]) == 5
+
+
+def test_filters_are_applied_before_top_k():
+    matcher = HybridMatcher().fit(INTERNSHIPS)
+
+    # Design is the worst match for this student; a post-filter on top_k=1 would drop it
+    results = matcher.match(STUDENT, top_k=1, filters={'major': 'design'})
+    assert [m['id'] for m in results] == [2]
+
+    results = matcher.match(STUDENT, top_k=5, filters={'skills': ['SQL']})
+    assert {m['id'] for m in results} == {1, 3}
+
+    matcher.remove(3)
+    assert [m['id'] for m in matcher.match(STUDENT, top_k=5, filters={'skills': ['sql']})] == [1]
+    assert matcher.match(STUDENT, top_k=5, filters={'location': 'Cairo'}) == []
+
+    best = matcher.match(STUDENT, top_k=1)[0]['match_score']
+    assert [m['id'] for m in matcher.match(STUDENT, top_k=5, min_score=best)] == [1]
+
+
+def test_student_query_is_encoded_once_until_profile_changes():
+    from app.matching.query_cache import get_query_cache, invalidate_student_query
+    from app.matching.service import TransformerMatcher
+
+    matcher = HybridMatcher()
+    matcher.transformer = TransformerMatcher('stub-query', model=CountingEncoder())
+    matcher.tfidf_weight, matcher.transformer_weight = 0.3, 0.7
+    matcher.fit(INTERNSHIPS)
+    encoder = matcher.transformer.model
+    encoder.seen.clear()
+
+    first = matcher.match(STUDENT, top_k=3, cache_owner=42)
+    second = matcher.match(STUDENT, top_k=3, cache_owner=42)
+    assert len(encoder.seen) == 1
+    assert [m['match_score'] for m in first] == [m['match_score'] for m in second]
+
+    # A re-fit invalidates the TF-IDF row but keeps the SBERT embedding
+    matcher.fit(INTERNSHIPS)
+    encoder.seen.clear()
+    assert [m['match_score'] for m in matcher.match(STUDENT, top_k=3)] == [m['match_score'] for m in first]
+    assert encoder.seen == []
+
+    invalidate_student_query(42)
+    matcher.match(STUDENT, top_k=3)
+    assert len(encoder.seen) == 1
+
+    matcher.match(dict(STUDENT, bio='Loves databases'), top_k=3)
+    assert len(encoder.seen) == 2
+    get_query_cache().clear()
+
+
+
+def test_query_cache_owner_links_stay_bounded():
+    from app.matching.query_cache import QueryVectorCache
+
+    cache = QueryVectorCache(max_entries=3)
+    for student_id in range(100):
+        cache.put(cache.key(f'profile {student_id}'), 'tfidf', 1, [student_id], owner=student_id)
+    assert len(cache) == 3
+    assert set(cache._owners) == {97, 98, 99}
+    assert set(cache._key_owners) == set(cache._entries)
+
+    # Two students with the same profile share one entry; invalidating one drops both links
+    shared = cache.key('same profile')
+    cache.put(shared, 'tfidf', 1, [0], owner='a')
+    cache.put(shared, 'tfidf', 1, [0], owner='b')
+    cache.invalidate_owner('a')
+    assert shared not in cache._entries and 'a' not in cache._owners and 'b' not in cache._owners
+    cache.invalidate_owner(0)   # evicted long ago: a no-op
+
+def test_recommendation_job_runs_in_background_and_charges_once(app, client):
+    import time
+    from flask_jwt_extended import create_access_token
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    with app.app_context():
+        company = User(email='jobs-co@example.com', name='Co', role='company')
+        student = User(email='jobs-student@example.com', name='Stu', role='student',
+                       skills='Python, Flask', major='Computer Science', points=100)
+        db.session.add_all([company, student])
+        db.session.commit()
+        db.session.add(Internship(title='Backend Developer Intern', description='Flask APIs',
+                                  requirements='Python', company_id=company.id))
+        db.session.commit()
+        # Inserted behind the routes' notify hooks: don't wait out SYNC_INTERVAL
+        from app.matching.index import get_index
+        get_index().sync(force=True)
+        student_id = student.id
+        token = create_access_token(identity=str(student_id),
+                                    additional_claims={'role': 'student', 'email': student.email})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    started = client.post('/api/recommendations/jobs', headers=headers, json={'limit': 5})
+    assert started.status_code == 202
+    job_id = started.get_json()['job_id']
+
+    deadline = time.time() + 10
+    while True:
+        job = client.get(f'/api/recommendations/jobs/{job_id}', headers=headers).get_json()
+        if job['status'] in ('done', 'failed') or time.time() > deadline:
+            break
+        time.sleep(0.05)
+    assert job['status'] == 'done' and job['progress'] == 100
+    assert job['result']['recommendations'][0]['internship']['title'] == 'Backend Developer Intern'
+
+    # The finished result is cached: a second request is free
+    again = client.post('/api/recommendations/jobs', headers=headers)
+    assert again.status_code == 200 and again.get_json()['cached']
+    with app.app_context():
+        assert db.session.get(User, student_id).points < 100
+        charged = 100 - db.session.get(User, student_id).points
+    assert client.get('/api/recommendations', headers=headers).get_json()['cached']
+    with app.app_context():
+        assert 100 - db.session.get(User, student_id).points == charged
+
+    assert client.get('/api/recommendations/jobs/unknown', headers=headers).status_code == 404
+
+
+
+def test_lost_recommendation_job_is_refunded_and_releases_the_claim(app, client):
+    import time
+    from flask_jwt_extended import create_access_token
+    from app.matching import jobs
+    from app.models import db
+    from app.models.user import User
+    from app.utils.cache import get_cache
+
+    with app.app_context():
+        student = User(email='lost-job@example.com', name='Stu', role='student', skills='Python', points=90)
+        db.session.add(student)
+        db.session.commit()
+        student_id = student.id
+        token = create_access_token(identity=str(student_id),
+                                    additional_claims={'role': 'student', 'email': student.email})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # A job whose worker died mid-run: charged 10 points, claim still held
+    stale = time.time() - jobs.job_timeout() - 1
+    get_cache('recommendations').set(student_id, {'pending': True, 'job_id': 'lost', 'claimed_at': stale}, 300)
+    get_cache('recommendation_jobs').set('lost', {
+        'job_id': 'lost', 'student_id': student_id, 'cost': 10, 'status': 'running',
+        'progress': 30, 'stage': 'matching', 'created_at': stale, 'updated_at': stale,
+    }, 300)
+    try:
+        job = client.get('/api/recommendations/jobs/lost', headers=headers).get_json()
+        assert job['status'] == 'failed' and job['refunded']
+        assert get_cache('recommendations').get(student_id) is None
+        # Polling again (or from another worker) does not refund twice
+        assert client.get('/api/recommendations/jobs/lost', headers=headers).get_json()['status'] == 'failed'
+        with app.app_context():
+            assert db.session.get(User, student_id).points == 100
+
+        # A claim without a job (synchronous run) is released once it is too old
+        get_cache('recommendations').set(student_id, {'pending': True, 'claimed_at': stale}, 300)
+        assert client.get('/api/recommendations', headers=headers).status_code != 503
+    finally:
+        get_cache('recommendations').delete(student_id)
+        with app.app_context():
+            from app.models.points import PointsTransaction
+            from app.models.recommendation import RecommendationResult
+            RecommendationResult.query.filter_by(student_id=student_id).delete()
+            PointsTransaction.query.filter_by(user_id=student_id).delete()
+            User.query.filter_by(id=student_id).delete()
+            db.session.commit()
+
+def test_ranking_metrics():
+    from app.matching.evaluation import (
+        companies_in_rank_order, evaluate_rankings, ndcg_at_k, recall_at_k, reciprocal_rank,
+    )
+
+    ranked = companies_in_rank_order(
+        [{'id': 1}, {'id': 2}, {'id': 3}, {'id': 4}], {1: 'PWC ', 2: 'pwc', 3: 'Vodafone', 4: 'e&'}
+    )
+    assert ranked == ['pwc', 'vodafone', 'e&']
+
+    gains = {'vodafone': 40.0, 'e&': 20.0}
+    assert recall_at_k(ranked, gains, 2) == 0.5
+    assert reciprocal_rank(ranked, gains) == 0.5
+    assert ndcg_at_k(['vodafone', 'e&'], gains, 2) == 1.0
+    assert 0 < ndcg_at_k(ranked, gains, 3) < 1
+
+    metrics = evaluate_rankings({'a@x.com': ranked}, {'a@x.com': gains}, ks=(1,))
+    assert metrics['recall@1'] == 0.0 and metrics['mrr'] == 0.5 and metrics['students'] == 1
+
+
+def test_quantized_embeddings_track_float32():
+    import numpy as np
+    from app.matching.quantize import QuantizedMatrix
+    from app.matching.service import TransformerMatcher
+
+    rng = np.random.default_rng(0)
+    emb = rng.normal(size=(50, 16)).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    q = emb[3]
+    for dtype in ('float16', 'int8'):
+        matrix = QuantizedMatrix.from_float(emb, dtype)
+        assert np.allclose(matrix @ q, emb @ q, atol=0.02)
+        assert np.allclose(matrix @ emb[:4].T, emb @ emb[:4].T, atol=0.02)
+        assert np.allclose(matrix[[1, 2]], emb[[1, 2]], atol=0.01)
+        assert matrix.append(emb[:2]).shape == (52, 16)
+    assert QuantizedMatrix.from_float(emb, 'int8').nbytes < emb.nbytes / 3
+
+    texts = ['python flask api', 'graphic design', 'data analysis sql']
+    exact = TransformerMatcher('stub-q', model=CountingEncoder()).encode_corpus(texts)
+    int8 = TransformerMatcher('stub-q', model=CountingEncoder(), embedding_dtype='int8').encode_corpus(texts)
+    int8.append('mobile apps')
+    exact.append('mobile apps')
+    assert [i for i, _ in int8.score('python api', top_k=4)] == [i for i, _ in exact.score('python api', top_k=4)]
+
+
+def test_embedding_backend_chain_falls_back_to_static_vectors(tmp_path, monkeypatch):
+    import numpy as np
+    import app.matching.service as service
+    from config import Config
+
+    glove = tmp_path / 'vectors.txt'
+    glove.write_text('python 1 0 0\nflask 0.8 0.2 0\ndesign 0 0 1\n', encoding='utf-8')
+    monkeypatch.setattr(Config, 'EMBEDDING_BACKENDS', 'missing,static', raising=False)
+    monkeypatch.setattr(Config, 'EMBEDDING_STATIC_PATH', str(glove), raising=False)
+    monkeypatch.setattr(service, '_cached_sbert_model', None)
+
+    backend = service._get_sbert_model('any-model')
+    assert backend.name == 'static' and backend.cache_key == 'static-vectors'
+
+    emb = backend.encode(['Python and Flask', 'design', 'unknown words'])
+    assert emb.shape == (3, 3)
+    assert emb[0] @ emb[1] < 0.5 and np.allclose(emb[2], 0)
+    assert backend.stats()['encoded_texts'] == 3
+
+    matcher = service.TransformerMatcher('any-model').encode_corpus(['flask python apis', 'brand design'])
+    assert matcher.cache_name == 'static-vectors'
+    assert matcher.score('python', top_k=1)[0][0] == 0
+
+
+def test_preload_fits_index_before_fork_and_reports_worker_memory(app, client, tmp_path, monkeypatch):
+    import gc
+    import os
+    import app.matching.preload as preload
+    import app.matching.service as service
+    from app.matching.index import get_index
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+    from config import Config
+
+    glove = tmp_path / 'vectors.txt'
+    glove.write_text('python 1 0 0\nflask 0.8 0.2 0\ndesign 0 0 1\n', encoding='utf-8')
+    monkeypatch.setattr(Config, 'EMBEDDING_BACKENDS', 'static', raising=False)
+    monkeypatch.setattr(Config, 'EMBEDDING_STATIC_PATH', str(glove), raising=False)
+    monkeypatch.setattr(service, '_cached_sbert_model', None)
+    monkeypatch.setattr(preload, '_preloaded_pid', None)
+
+    with app.app_context():
+        company = User(name='Preload Co', email='preload@acme.test', role='company')
+        db.session.add(company)
+        db.session.commit()
+        company_id = company.id
+        db.session.add(Internship(title='Flask Intern', description='Python APIs', company_id=company_id))
+        db.session.commit()
+
+    try:
+        preload.preload_matching(app)
+        assert service._cached_sbert_model.name == 'static'
+        assert len(get_index()) >= 1 and get_index().matcher.transformer.available
+        assert not preload.is_preloaded()   # still the "master"
+
+        # As seen from a forked worker
+        monkeypatch.setattr(preload, '_preloaded_pid', os.getpid() + 1)
+        preload.after_fork()
+        report = client.get('/api/matching/health').get_json()
+        assert report['preloaded'] and report['pid'] == os.getpid()
+        assert report['index']['internships'] >= 1 and report['index']['embeddings_mb'] >= 0
+        assert report['embedding_backend']['backend'] == 'static'
+        assert report['memory_mb']['rss'] > 0
+    finally:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+        with app.app_context():
+            Internship.query.filter(Internship.company_id == company_id).delete()
+            User.query.filter_by(id=company_id).delete()
+            db.session.commit()
+        service.reset_matcher()
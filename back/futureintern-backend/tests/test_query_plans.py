@@ -0,0 +1,84 @@
+import os
+from datetime import date
+
+import pytest
+
+
+def hot_queries():
+    """(name, ORM query, index expected in the plan) for the filters the API runs most."""
+    from sqlalchemy import func
+    from app.models import db
+    from app.models.application import Application
+    from app.models.intern import Internship
+    from app.models.user import User
+
+    active = Internship.is_active == True  # noqa: E712
+    return [
+        ('listing keyset page', Internship.query.filter(active, Internship.id > 10).order_by(Internship.id).limit(20),
+         'ix_internships_active_id'),
+        ('expiry job', Internship.query.filter(active, Internship.application_deadline < date.today()),
+         'ix_internships_active_deadline'),
+        ('expired list', Internship.query.filter(Internship.application_deadline < date.today())
+         .order_by(Internship.application_deadline.desc()), 'ix_internships_deadline'),
+        ('index signature', db.session.query(func.count(Internship.id), func.max(Internship.updated_at))
+         .filter(active), 'ix_internships_active_updated'),
+        ('company internships', Internship.query.filter(Internship.company_id == 1), 'ix_internships_company_active'),
+        ('facet filter', Internship.query.filter(active, Internship.major == 'Physics'),
+         'ix_internships_major_active'),
+        ('applications by internship', Application.query.filter(
+            Application.internship_id.in_([1, 2]), Application.status == 'accepted'),
+         'ix_applications_internship_status'),
+        ('applications by status', Application.query.filter(Application.status == 'pending'),
+         'ix_applications_status'),
+        ('applications by student', Application.query.filter(Application.student_id == 1),
+         'sqlite_autoindex_applications_1|unique_student_internship'),
+        ('companies pending verification', User.query.filter(User.role == 'company', User.is_verified == False),  # noqa: E712
+         'ix_users_role_verified'),
+    ]
+
+
+def explain(engine, query):
+    compiled = query.statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    if compiled.positional:
+        params = [compiled.params[k] for k in compiled.positiontup]
+    else:
+        params = compiled.params
+    prefix = 'EXPLAIN QUERY PLAN ' if engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == 'postgresql':
+            # Test tables are tiny, so make the planner show whether an index *can* be used
+            cursor.execute('SET enable_seqscan = off')
+        cursor.execute(prefix + str(compiled), params)
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    finally:
+        raw.close()
+
+
+def assert_plans_use_indexes(engine):
+    import re
+    for name, query, index in hot_queries():
+        plan = explain(engine, query)
+        assert re.search(index, plan), f'{name}: expected {index}, got\n{plan}'
+        assert not re.search(r'SCAN (internships|applications|users)\b(?! USING)', plan), f'{name}: full scan\n{plan}'
+        assert 'Seq Scan' not in plan, f'{name}: full scan\n{plan}'
+
+
+def test_hot_queries_use_indexes_on_sqlite(app):
+    from app.models import db
+
+    with app.app_context():
+        assert_plans_use_indexes(db.engine)
+
+
+@pytest.mark.skipif(not os.environ.get('TEST_POSTGRES_URL'), reason='set TEST_POSTGRES_URL to check PostgreSQL plans')
+def test_hot_queries_use_indexes_on_postgres(app):
+    import sqlalchemy as sa
+    from app.models import db
+
+    engine = sa.create_engine(os.environ['TEST_POSTGRES_URL'])
+    with app.app_context():
+        db.metadata.create_all(engine)
+        assert_plans_use_indexes(engine)
+    engine.dispose()
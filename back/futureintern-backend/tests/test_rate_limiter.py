@@ -0,0 +1,73 @@
+import threading
+
+from app.utils.rate_limiter import MemoryStore, RateLimiter, SQLiteStore
+
+
+def test_gcra_allows_a_burst_then_one_request_per_interval(monkeypatch):
+    import app.utils.rate_limiter as rl
+
+    clock = [1000.0]
+    monkeypatch.setattr(rl.time, 'time', lambda: clock[0])
+    limiter = RateLimiter(MemoryStore())
+
+    assert [limiter.is_allowed('ip', 5, 60) for _ in range(6)] == [True] * 5 + [False]
+    allowed, retry_after = limiter.check('ip', 5, 60)
+    assert not allowed and retry_after == 12
+    assert limiter.is_allowed('other-ip', 5, 60)
+
+    clock[0] += 12
+    assert limiter.is_allowed('ip', 5, 60)
+    assert not limiter.is_allowed('ip', 5, 60)
+    clock[0] += 60
+    assert [limiter.is_allowed('ip', 5, 60) for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_sqlite_store_shares_the_limit_between_workers(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    workers = [RateLimiter(SQLiteStore(path)) for _ in range(3)]
+
+    results = []
+
+    def hammer(limiter):
+        for _ in range(10):
+            results.append(limiter.is_allowed('shared', 10, 60))
+
+    threads = [threading.Thread(target=hammer, args=(w,)) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results.count(True) == 10 and len(results) == 30
+
+
+def test_decorator_returns_429_with_retry_after_and_counts_per_route(app, client):
+    from flask_jwt_extended import create_access_token
+    from app.models import db
+    from app.models.user import User
+    from app.utils.rate_limiter import get_limiter
+
+    previous = get_limiter().store
+    get_limiter().reset(MemoryStore())
+    try:
+        statuses = [client.post('/api/auth/login', json={'email': 'x@test', 'password': 'x'}).status_code
+                    for _ in range(6)]
+        assert 429 not in statuses[:5] and statuses[5] == 429
+        limited = client.post('/api/auth/login', json={'email': 'x@test', 'password': 'x'})
+        assert int(limited.headers['Retry-After']) >= 1 and limited.get_json()['retry_after'] >= 1
+
+        with app.app_context():
+            admin = User(email='rl-admin@example.com', name='Admin', role='admin')
+            db.session.add(admin)
+            db.session.commit()
+            token = create_access_token(identity=str(admin.id), additional_claims={'role': 'admin', 'email': admin.email})
+            admin_id = admin.id
+        try:
+            metrics = client.get('/api/admin/rate-limits', headers={'Authorization': f'Bearer {token}'}).get_json()
+            assert metrics['backend'] == 'memory'
+            assert metrics['routes']['auth.login'] == {'allowed': 5, 'limited': 2}
+        finally:
+            with app.app_context():
+                User.query.filter_by(id=admin_id).delete()
+                db.session.commit()
+    finally:
+        get_limiter().reset(previous)
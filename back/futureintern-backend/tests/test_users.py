@@ -0,0 +1,56 @@
+def test_company_directory_aggregates_pages_and_revalidates(app, client):
+    from app.models import db
+    from app.models.intern import Internship
+    from app.models.user import User
+    from flask_jwt_extended import create_access_token
+    from app.users.directory import clear_directory_cache
+
+    with app.app_context():
+        companies = [User(email=f'dir-co-{k}@example.com', name=f'Dir {k}', role='company',
+                          company_name=f'Dir Co {k}', email_verified=True) for k in range(3)]
+        db.session.add_all(companies)
+        db.session.flush()
+        for company, n in zip(companies, (1, 3, 0)):
+            db.session.add_all([Internship(title='Dir Intern', description='d', company_id=company.id)
+                                for _ in range(n)])
+        db.session.commit()
+        ids = [c.id for c in companies]
+
+    try:
+        clear_directory_cache()
+        resp = client.get('/api/users/companies')
+        assert resp.status_code == 200 and resp.headers['ETag']
+        body = resp.get_json()
+        mine = [c for c in body['companies'] if c['id'] in ids]
+        assert [(c['id'], c['internship_count']) for c in mine] == [(ids[1], 3), (ids[0], 1), (ids[2], 0)]
+        assert body['total'] == len(body['companies'])
+        assert 'email' not in mine[0] and mine[0]['company_name'] == 'Dir Co 1'
+        counts = [c['internship_count'] for c in body['companies']]
+        assert counts == sorted(counts, reverse=True)
+
+        again = client.get('/api/users/companies', headers={'If-None-Match': resp.headers['ETag']})
+        assert again.status_code == 304 and not again.data
+
+        page = client.get('/api/users/companies?page=2&per_page=1').get_json()
+        assert page['companies'] == body['companies'][1:2]
+        assert page['total'] == body['total'] and page['pages'] == body['total']
+
+        # A company's own writes show up at once, with a new ETag
+        with app.app_context():
+            token = create_access_token(identity=str(ids[2]),
+                                        additional_claims={'role': 'company', 'email': 'dir-co-2@example.com'})
+        headers = {'Authorization': f'Bearer {token}'}
+        assert client.put('/api/users/profile', headers=headers,
+                          json={'company_name': 'Renamed Co'}).status_code == 200
+        assert client.post('/api/internships/', headers=headers,
+                           json={'title': 'New Dir Intern', 'description': 'd'}).status_code == 201
+        fresh = client.get('/api/users/companies', headers={'If-None-Match': resp.headers['ETag']})
+        assert fresh.status_code == 200
+        renamed = next(c for c in fresh.get_json()['companies'] if c['id'] == ids[2])
+        assert renamed['company_name'] == 'Renamed Co' and renamed['internship_count'] == 1
+    finally:
+        clear_directory_cache()
+        with app.app_context():
+            Internship.query.filter(Internship.company_id.in_(ids)).delete()
+            User.query.filter(User.id.in_(ids)).delete()
+            db.session.commit()